@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Move old chat messages into compressed cold blocks
+
+Messages older than --days are written per chat and per month as
+compressed NDJSON blocks into an archive store, then deleted from the
+hot messages table. Each block gets a row in message_archive_blocks
+(migrations/0016) with its key, id range, count and checksum.
+
+The store is a directory laid out like an R2 bucket
+(messages/<chat_id>/<YYYY-MM>/<first_id>-<last_id>.ndjson.<codec>).
+Blocks are compressed with zstd when the zstandard module is installed
+and with zlib otherwise; the codec is recorded per block.
+
+Reactions travel inside their message. A message with a reply newer
+than the cutoff stays hot until that reply ages out too, so live replies
+keep their reply_to_message_id.
+
+A block is written to the store before its messages are deleted, and
+block keys are deterministic, so an interrupted run is simply repeated.
+If the repeat groups messages differently, the objects it superseded
+(unindexed, overlapping the new block) are deleted after the index
+commit.
+
+Block id ranges of a chat can overlap (a message kept hot by a reply is
+archived later in its own block), so reads merge blocks by message id.
+
+Usage:
+    python3 archive_messages.py --db PATH [--days 180]
+    python3 archive_messages.py --db PATH --read CHAT_ID [--before ID]
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import time
+import zlib
+
+from local_db import connect_readonly, connect_shared
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DIR = os.path.join(ROOT_DIR, 'archive')
+
+ARCHIVE_AFTER_DAYS = 180
+MAX_BLOCK_ROWS = 5000
+PAGE_ROWS = 1000
+PAGE_SIZE = 50
+
+CODEC = 'zstd' if zstandard is not None else 'zlib'
+
+
+def compress(data, codec=CODEC):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 9)
+
+
+def decompress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Block is zstd-compressed but the zstandard module is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class LocalStore:
+    """Directory with R2-style object keys"""
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def get(self, key):
+        with open(self._path(key), 'rb') as f:
+            return f.read()
+
+    def list(self, prefix):
+        """Keys under a directory-style prefix ending in '/'"""
+        path = self._path(prefix.rstrip('/'))
+        if not os.path.isdir(path):
+            return []
+        return [prefix + name for name in sorted(os.listdir(path))
+                if not name.endswith('.tmp') and os.path.isfile(os.path.join(path, name))]
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+def _key_range(key):
+    """(first_id, last_id) encoded in a block key"""
+    first, last = key.rsplit('/', 1)[1].split('.', 1)[0].split('-')
+    return int(first), int(last)
+
+
+def _candidates_sql(days):
+    cutoff = f"datetime('now', '-{int(days)} days')"
+    return (
+        "SELECT m.*, strftime('%Y-%m', m.created_at) AS archive_month FROM messages m "
+        f"WHERE m.chat_id = ? AND m.id > ? AND m.created_at < {cutoff} "
+        "AND NOT EXISTS (SELECT 1 FROM messages r WHERE r.reply_to_message_id = m.id "
+        f"AND r.created_at >= {cutoff}) "
+        "ORDER BY m.id LIMIT ?"
+    )
+
+
+def iter_candidates(conn, chat_id, days, page_rows=PAGE_ROWS):
+    """Archivable messages of one chat in id order, keyset-paginated"""
+    sql = _candidates_sql(days)
+    last_id = 0
+    while True:
+        cursor = conn.execute(sql, (chat_id, last_id, page_rows))
+        columns = [d[0] for d in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor]
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1]['id']
+
+
+def _attach_reactions(conn, messages):
+    ids = [m['id'] for m in messages]
+    reactions = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        cursor = conn.execute(
+            f"SELECT message_id, user_id, reaction, created_at FROM message_reactions "
+            f"WHERE message_id IN ({', '.join('?' for _ in chunk)}) ORDER BY id", chunk)
+        for message_id, user_id, reaction, created_at in cursor:
+            reactions.setdefault(message_id, []).append(
+                {'user_id': user_id, 'reaction': reaction, 'created_at': created_at})
+    for message in messages:
+        message['reactions'] = reactions.get(message['id'], [])
+
+
+def archive_block(conn, store, chat_id, month, messages):
+    """Store one block, then index it and delete its messages in one transaction"""
+    _attach_reactions(conn, messages)
+    for message in messages:
+        del message['archive_month']
+    body = ''.join(json.dumps(m, ensure_ascii=False) + '\n' for m in messages).encode('utf-8')
+    data = compress(body)
+    first_id, last_id = messages[0]['id'], messages[-1]['id']
+    key = f"messages/{chat_id}/{month}/{first_id}-{last_id}.ndjson.{CODEC}"
+    store.put(key, data)
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute(
+            'INSERT OR REPLACE INTO message_archive_blocks '
+            '(chat_id, month, block_key, codec, first_id, last_id, message_count, bytes, checksum) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (chat_id, month, key, CODEC, first_id, last_id, len(messages), len(data),
+             hashlib.blake2b(data, digest_size=16).hexdigest()),
+        )
+        conn.executemany('DELETE FROM message_reactions WHERE message_id = ?',
+                         [(m['id'],) for m in messages])
+        conn.executemany('DELETE FROM messages WHERE id = ?', [(m['id'],) for m in messages])
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+    _drop_superseded(conn, store, chat_id, month, key, first_id, last_id)
+    return len(body), len(data)
+
+
+def _drop_superseded(conn, store, chat_id, month, key, first_id, last_id):
+    """Delete unindexed objects an interrupted run left over this block's range"""
+    prefix = f"messages/{chat_id}/{month}/"
+    indexed = {row[0] for row in conn.execute(
+        'SELECT block_key FROM message_archive_blocks WHERE chat_id = ? AND month = ?',
+        (chat_id, month))}
+    for other in store.list(prefix):
+        if other == key or other in indexed:
+            continue
+        other_first, other_last = _key_range(other)
+        if other_first <= last_id and other_last >= first_id:
+            store.delete(other)
+
+
+def archive(conn, store, days=ARCHIVE_AFTER_DAYS, max_block_rows=MAX_BLOCK_ROWS):
+    """Archive every chat's old messages; returns stats"""
+    stats = {'chats': 0, 'blocks': 0, 'messages': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+    chat_ids = [row[0] for row in conn.execute(
+        f"SELECT DISTINCT chat_id FROM messages WHERE created_at < datetime('now', '-{int(days)} days') "
+        "ORDER BY chat_id")]
+
+    def flush(chat_id, month, block):
+        raw, stored = archive_block(conn, store, chat_id, month, block)
+        stats['blocks'] += 1
+        stats['messages'] += len(block)
+        stats['raw_bytes'] += raw
+        stats['stored_bytes'] += stored
+
+    for chat_id in chat_ids:
+        stats['chats'] += 1
+        # Keyset paging is unaffected by the deletes behind it, and a block
+        # is flushed as soon as the month changes, so memory stays one block
+        block, month = [], None
+        for message in iter_candidates(conn, chat_id, days):
+            if block and (message['archive_month'] != month or len(block) >= max_block_rows):
+                flush(chat_id, month, block)
+                block = []
+            month = message['archive_month']
+            block.append(message)
+        if block:
+            flush(chat_id, month, block)
+    return stats
+
+
+def iter_archived(conn, store, chat_id, before=None, page_size=PAGE_SIZE, include_deleted=False):
+    """Yield pages of archived messages of a chat, newest first
+
+    Pages hold up to `page_size` messages with id < `before`, matching
+    the before/limit paging of GET /api/chats/:id/messages. Blocks are
+    merged by message id since their ranges can overlap; a block is only
+    decompressed once the merge reaches its last_id, so only blocks with
+    overlapping ranges are held at the same time.
+    """
+    sql = ('SELECT block_key, codec, last_id FROM message_archive_blocks WHERE chat_id = ? '
+           + ('AND first_id < ? ' if before is not None else '')
+           + 'ORDER BY last_id DESC')
+    params = (chat_id, before) if before is not None else (chat_id,)
+    blocks = conn.execute(sql, params).fetchall()
+
+    def newest_first(key, codec):
+        lines = decompress(store.get(key), codec).decode('utf-8').splitlines()
+        for line in reversed(lines):
+            message = json.loads(line)
+            if before is None or message['id'] < before:
+                yield message
+
+    def push(messages):
+        message = next(messages, None)
+        if message is not None:
+            heapq.heappush(heap, (-message['id'], id(messages), message, messages))
+
+    heap, opened, page = [], 0, []
+    while True:
+        # Open every block that may hold an id above the current head
+        while opened < len(blocks) and (not heap or blocks[opened][2] > -heap[0][0]):
+            key, codec, _ = blocks[opened]
+            push(newest_first(key, codec))
+            opened += 1
+        if not heap:
+            break
+        _, _, message, messages = heapq.heappop(heap)
+        push(messages)
+        if message.get('is_deleted') and not include_deleted:
+            continue
+        page.append(message)
+        if len(page) == page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive old chat messages into compressed blocks')
+    parser.add_argument('--db', metavar='PATH',
+                        help='SQLite file (default: auto-detect under .wrangler/state)')
+    parser.add_argument('--store', default=ARCHIVE_DIR, help='archive directory (R2 stand-in)')
+    parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS,
+                        help='archive messages older than this many days')
+    parser.add_argument('--block-rows', type=int, default=MAX_BLOCK_ROWS)
+    parser.add_argument('--read', type=int, metavar='CHAT_ID',
+                        help='print archived history of a chat instead of archiving')
+    parser.add_argument('--before', type=int, metavar='ID', help='with --read: start below this id')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    args = parser.parse_args()
+
+    store = LocalStore(args.store)
+    # Reading only needs a snapshot; archiving commits next to the Worker's
+    # writes, so neither may hold the file exclusively
+    conn = connect_readonly(args.db) if args.read is not None else connect_shared(args.db)
+    try:
+        if args.read is not None:
+            pages = iter_archived(conn, store, args.read, args.before, args.page_size)
+            page = next(pages, [])
+            for message in page:
+                print(f"💬 {message['id']:>8} {message['created_at']}  "
+                      f"{message['sender_id']}: {(message.get('content') or '')[:60]}")
+            if page:
+                print(f"\n   next page: --before {page[-1]['id']}")
+            return
+
+        start = time.perf_counter()
+        stats = archive(conn, store, args.days, args.block_rows)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+    ratio = stats['raw_bytes'] / stats['stored_bytes'] if stats['stored_bytes'] else 0
+    print(f"🗄️  Archived {stats['messages']} messages from {stats['chats']} chats "
+          f"into {stats['blocks']} {CODEC} blocks in {elapsed:.2f}s")
+    print(f"   {stats['raw_bytes']} bytes NDJSON -> {stats['stored_bytes']} bytes ({ratio:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Streaming export and restore of the whole D1 database
+
+Export walks every table created in migrations/ (FTS and R*Tree indexes
+excepted, they are derived) with keyset pagination on its primary key,
+so each page is one short read and the source is never held locked; a
+--db/--direct export opens the file read-only with default locking. Rows
+are written as gzip-compressed NDJSON chunks of --chunk-rows rows, and
+manifest.json records columns, row counts and a blake2b checksum per
+chunk.
+
+Restore creates the schema from migrations/ when the target is empty,
+verifies every checksum, then loads the tables in foreign-key order.
+Chunks are decompressed and parsed in a process pool while the main
+process writes, with the FTS triggers suspended; events_fts and
+documents_fts are rebuilt once at the end (fts_bulk). Materialized
+stats are recounted from the restored events in the same transaction.
+
+Usage:
+    python3 backup_db.py export --db PATH --out DIR   (or without --db via wrangler)
+    python3 backup_db.py restore --db PATH --from DIR
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+from event_loader import PROJECT_DIR, inline_params, query_json
+from fts_bulk import FTS_TABLES, deferred_fts, print_timings
+from local_db import LOAD_PRAGMAS, connect_readonly, create_database, migration_files
+from materialized_stats import refresh_sqlite as refresh_stats_sqlite
+
+CHUNK_ROWS = 10_000
+FORMAT_VERSION = 1
+
+CREATE_TABLE = re.compile(r'CREATE\s+TABLE\s+IF\s+NOT\s+EXISTS\s+(\w+)', re.IGNORECASE)
+
+
+def migration_tables():
+    """Plain tables created by the migrations, in migration order"""
+    tables = []
+    for path in migration_files():
+        with open(path, encoding='utf-8') as f:
+            for name in CREATE_TABLE.findall(f.read()):
+                if name not in tables:
+                    tables.append(name)
+    return tables
+
+
+class SqliteSource:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def query(self, sql, params=()):
+        cursor = self.conn.execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+
+class WranglerSource:
+    """Read-only queries through wrangler; parameters are inlined literals"""
+
+    def __init__(self, local=True, cwd=PROJECT_DIR):
+        self.local = local
+        self.cwd = cwd
+
+    def query(self, sql, params=()):
+        return query_json(inline_params(sql, params), self.local, self.cwd)
+
+
+def table_key(source, table):
+    """(columns, key columns) where the key orders rows for keyset paging"""
+    info = source.query(f"SELECT name, pk FROM pragma_table_info('{table}') ORDER BY cid")
+    columns = [row['name'] for row in info]
+    pk = [row['name'] for row in sorted(info, key=lambda r: r['pk']) if row['pk']]
+    if not pk:
+        # Plain rowid table without a declared key
+        return columns, ['rowid']
+    return columns, pk
+
+
+def _page_sql(table, columns, key, first):
+    select = ', '.join(dict.fromkeys(key + columns)) if key == ['rowid'] else ', '.join(columns)
+    order = ', '.join(key)
+    if first:
+        return f"SELECT {select} FROM {table} ORDER BY {order} LIMIT ?"
+    placeholders = ', '.join('?' for _ in key)
+    if len(key) == 1:
+        return f"SELECT {select} FROM {table} WHERE {key[0]} > ? ORDER BY {order} LIMIT ?"
+    return (f"SELECT {select} FROM {table} WHERE ({order}) > ({placeholders}) "
+            f"ORDER BY {order} LIMIT ?")
+
+
+def iter_pages(source, table, columns, key, page_rows):
+    last = None
+    while True:
+        if last is None:
+            rows = source.query(_page_sql(table, columns, key, True), (page_rows,))
+        else:
+            rows = source.query(_page_sql(table, columns, key, False), (*last, page_rows))
+        if not rows:
+            return
+        last = tuple(rows[-1][k] for k in key)
+        yield [[row[col] for col in columns] for row in rows]
+
+
+def _checksum(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def export_table(source, table, out_dir, chunk_rows=CHUNK_ROWS):
+    columns, key = table_key(source, table)
+    chunks = []
+    total = 0
+    for index, rows in enumerate(iter_pages(source, table, columns, key, chunk_rows)):
+        name = f"{table}.{index:05d}.ndjson.gz"
+        body = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+        data = gzip.compress(body, compresslevel=6, mtime=0)
+        with open(os.path.join(out_dir, name), 'wb') as f:
+            f.write(data)
+        chunks.append({'file': name, 'rows': len(rows), 'bytes': len(data), 'checksum': _checksum(data)})
+        total += len(rows)
+    return {'columns': columns, 'key': key, 'rows': total, 'chunks': chunks}
+
+
+def export(source, out_dir, tables=None, chunk_rows=CHUNK_ROWS):
+    """Export `tables` (default: all migration tables) into out_dir"""
+    os.makedirs(out_dir, exist_ok=True)
+    existing = {row['name'] for row in source.query(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")}
+    manifest = {
+        'format': FORMAT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'migrations': [os.path.basename(p) for p in migration_files()],
+        'tables': {},
+    }
+    for table in tables or migration_tables():
+        if table not in existing:
+            print(f"⏭️  {table}: not in the source database, skipped")
+            continue
+        start = time.perf_counter()
+        manifest['tables'][table] = export_table(source, table, out_dir, chunk_rows)
+        info = manifest['tables'][table]
+        print(f"📤 {table:<24} {info['rows']:>9} rows in {len(info['chunks'])} chunks "
+              f"({time.perf_counter() - start:.2f}s)")
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _decode_chunk(path, checksum):
+    """Worker: verify and parse one chunk into row lists"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if _checksum(data) != checksum:
+        raise ValueError(f"Checksum mismatch in {os.path.basename(path)}")
+    return [json.loads(line) for line in gzip.decompress(data).decode('utf-8').splitlines()]
+
+
+def fk_order(conn, tables):
+    """Tables ordered so every table comes after the tables it references"""
+    deps = {}
+    for table in tables:
+        refs = {row[2] for row in conn.execute(f"PRAGMA foreign_key_list('{table}')")}
+        deps[table] = {ref for ref in refs if ref in tables and ref != table}
+    ordered = []
+    while deps:
+        ready = sorted(t for t, refs in deps.items() if not refs - set(ordered))
+        if not ready:
+            # Reference cycle: fall back to manifest order for the rest
+            ready = [t for t in tables if t in deps]
+        for table in ready:
+            ordered.append(table)
+            del deps[table]
+    return ordered
+
+
+def restore(db_path, in_dir, jobs=None):
+    """Load a backup into db_path (created from migrations if missing)"""
+    with open(os.path.join(in_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported backup format {manifest.get('format')!r}")
+    if not os.path.exists(db_path):
+        create_database(db_path)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for pragma in LOAD_PRAGMAS:
+        conn.execute(pragma)
+    conn.execute('PRAGMA foreign_keys = OFF')
+    timings = {}
+    stats = {}
+    try:
+        order = fk_order(conn, list(manifest['tables']))
+        for table in order:
+            if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                raise RuntimeError(f"Target table {table} is not empty; restore into a fresh database")
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                with ExitStack() as stack:
+                    for table in FTS_TABLES:
+                        if table in order:
+                            stack.enter_context(deferred_fts(conn, table, timings))
+                    for table in order:
+                        info = manifest['tables'][table]
+                        columns = info['columns']
+                        sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                               f"VALUES ({', '.join('?' for _ in columns)})")
+                        start = time.perf_counter()
+                        futures = [pool.submit(_decode_chunk, os.path.join(in_dir, c['file']), c['checksum'])
+                                   for c in info['chunks']]
+                        loaded = 0
+                        for future in futures:
+                            rows = future.result()
+                            conn.executemany(sql, rows)
+                            loaded += len(rows)
+                        if loaded != info['rows']:
+                            raise RuntimeError(f"{table}: expected {info['rows']} rows, loaded {loaded}")
+                        stats[table] = (loaded, time.perf_counter() - start)
+                        print(f"📥 {table:<24} {loaded:>9} rows ({stats[table][1]:.2f}s)")
+                # Counters restored from a backup (or left from before) are
+                # recounted against the restored events
+                refresh_stats_sqlite(conn, in_transaction=True)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+    finally:
+        conn.close()
+    print_timings(timings)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export or restore the whole D1 database')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    exp = sub.add_parser('export', help='stream all tables into compressed NDJSON chunks')
+    exp.add_argument('--db', metavar='PATH', help='read this SQLite file directly (no wrangler)')
+    exp.add_argument('--direct', action='store_true',
+                     help='read the local D1 SQLite file directly (auto-detected)')
+    exp.add_argument('--remote', action='store_true', help='export the remote D1 database')
+    exp.add_argument('--out', required=True, help='backup directory')
+    exp.add_argument('--tables', nargs='+', help='only these tables')
+    exp.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+
+    res = sub.add_parser('restore', help='load a backup into a fresh SQLite database')
+    res.add_argument('--db', metavar='PATH', required=True,
+                     help='target SQLite file (created from migrations if missing)')
+    res.add_argument('--from', dest='source', required=True, help='backup directory')
+    res.add_argument('--jobs', type=int, help='decoder processes (default: CPU count)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'export':
+        if args.db or args.direct:
+            conn = connect_readonly(args.db)
+            try:
+                manifest = export(SqliteSource(conn), args.out, args.tables, args.chunk_rows)
+            finally:
+                conn.close()
+        else:
+            manifest = export(WranglerSource(not args.remote), args.out, args.tables, args.chunk_rows)
+        rows = sum(t['rows'] for t in manifest['tables'].values())
+        print(f"\n✅ Exported {rows} rows from {len(manifest['tables'])} tables to {args.out} "
+              f"in {time.perf_counter() - start:.2f}s")
+    else:
+        stats = restore(args.db, args.source, args.jobs)
+        rows = sum(count for count, _ in stats.values())
+        print(f"\n✅ Restored {rows} rows into {args.db} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
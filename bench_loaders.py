@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Benchmark every event ingest strategy against a scratch SQLite database
+
+Each (strategy, size) run happens in a fresh process on a database built
+from migrations/*.sql, and reports rows/sec, p50/p99 batch latency, peak
+RSS and the resulting file size. Results are written as JSON so runs can
+be compared between commits.
+
+The wrangler-based paths are measured with a Python subprocess standing in
+for `npx wrangler d1 execute`, so the numbers show the per-process cost
+structure without needing Node; real wrangler startup is slower still.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from event_loader import event_params, insert_sql, iter_chunks, render_insert, render_row
+from fts_bulk import deferred_fts
+from local_db import LOAD_PRAGMAS, create_database
+from sync_events import sync_sqlite
+
+DEFAULT_SIZES = (100, 10_000, 1_000_000)
+DEFAULT_BATCH_ROWS = 500
+
+# Stand-in for one wrangler process: open the database, run stdin, exit
+SPAWN_SCRIPT = 'import sqlite3, sys; c = sqlite3.connect(sys.argv[1]); c.executescript(sys.stdin.read()); c.close()'
+
+EVENT_TYPES = ('ancient', 'ufo', 'mystery', 'conspiracy', 'cryptid', 'experiment')
+EVIDENCE_LEVELS = ('speculative', 'documented', 'proven')
+CATEGORIES = ('Alte Zivilisationen', 'UFO Sichtungen', 'Mystische Orte', 'Geheimdienste', 'Kryptozoologie')
+
+
+def synthetic_events(count, seed=42):
+    """Yield `count` deterministic events shaped like the real corpus"""
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        keywords = [f'Stichwort{rng.randrange(500)}' for _ in range(5)]
+        yield {
+            'id': i,
+            'title': f'Ereignis {i}',
+            'description': f"Beschreibung des Ereignisses {i} mit einem 'Zitat'.",
+            'latitude': round(rng.uniform(-85, 85), 4),
+            'longitude': round(rng.uniform(-180, 180), 4),
+            'category': rng.choice(CATEGORIES),
+            'event_type': rng.choice(EVENT_TYPES),
+            'year': rng.randrange(-10000, 2025),
+            'date_text': str(rng.randrange(1, 2025)),
+            'icon_type': 'marker',
+            'full_description': ' '.join(f'Wort{rng.randrange(5000)}' for _ in range(80)),
+            'sources': json.dumps([{'title': f'Quelle {i}', 'year': 2000}], ensure_ascii=False),
+            'keywords': json.dumps(keywords, ensure_ascii=False),
+            'evidence_level': rng.choice(EVIDENCE_LEVELS),
+        }
+
+
+def _spawn(db_path, sql):
+    result = subprocess.run([sys.executable, '-c', SPAWN_SCRIPT, db_path],
+                            input=sql, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+
+
+def bench_per_event(db_path, batches):
+    """Current insert_event() path: one process and one statement per event"""
+    for batch in batches:
+        start = time.perf_counter()
+        for event in batch:
+            _spawn(db_path, render_insert([render_row(event)]))
+        yield time.perf_counter() - start
+
+
+def bench_batched(db_path, batches):
+    """--batch: one process per multi-row INSERT"""
+    for batch in batches:
+        start = time.perf_counter()
+        _spawn(db_path, render_insert([render_row(event) for event in batch]))
+        yield time.perf_counter() - start
+
+
+def _bench_direct(db_path, batches, bulk):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for pragma in LOAD_PRAGMAS:
+        conn.execute(pragma)
+    sql = insert_sql()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if bulk:
+            with deferred_fts(conn, 'events'):
+                for batch in batches:
+                    start = time.perf_counter()
+                    conn.executemany(sql, [event_params(event) for event in batch])
+                    yield time.perf_counter() - start
+        else:
+            for batch in batches:
+                start = time.perf_counter()
+                conn.executemany(sql, [event_params(event) for event in batch])
+                yield time.perf_counter() - start
+        conn.execute('COMMIT')
+    finally:
+        conn.close()
+
+
+def bench_direct(db_path, batches):
+    """--direct: executemany into SQLite in one transaction"""
+    return _bench_direct(db_path, batches, bulk=False)
+
+
+def bench_direct_bulk(db_path, batches):
+    """--direct --bulk: FTS triggers suspended, index rebuilt once"""
+    return _bench_direct(db_path, batches, bulk=True)
+
+
+def bench_sync(db_path, batches):
+    """sync_events.py --direct into an empty database, one sync per batch"""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        for batch in batches:
+            start = time.perf_counter()
+            sync_sqlite(batch, conn)
+            yield time.perf_counter() - start
+    finally:
+        conn.close()
+
+
+STRATEGIES = {
+    'per_event': bench_per_event,
+    'batched': bench_batched,
+    'direct': bench_direct,
+    'direct_bulk': bench_direct_bulk,
+    'sync': bench_sync,
+}
+
+# Strategies that spawn one process per row are capped to keep runs sane
+SPAWN_PER_ROW = {'per_event'}
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _run_one(strategy, rows, batch_rows, seed, queue):
+    with tempfile.TemporaryDirectory(prefix='bench_') as tmp:
+        db_path = os.path.join(tmp, 'bench.sqlite')
+        create_database(db_path)
+        batches = iter_chunks(synthetic_events(rows, seed), batch_rows)
+
+        start = time.perf_counter()
+        latencies = list(STRATEGIES[strategy](db_path, batches))
+        elapsed = time.perf_counter() - start
+
+        queue.put({
+            'strategy': strategy,
+            'rows': rows,
+            'batch_rows': batch_rows,
+            'seconds': round(elapsed, 6),
+            'rows_per_sec': round(rows / elapsed, 1) if elapsed else None,
+            'batch_p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'batch_p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'db_bytes': os.path.getsize(db_path),
+        })
+
+
+def run_benchmark(strategy, rows, batch_rows=DEFAULT_BATCH_ROWS, seed=42):
+    """Run one strategy at one size in a fresh process and return its result"""
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_one, args=(strategy, rows, batch_rows, seed, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark event ingest strategies')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS)
+    parser.add_argument('--max-spawn-rows', type=int, default=1000,
+                        help='skip one-process-per-row strategies above this size')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench_results.json')
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.sizes:
+        for strategy in args.strategies:
+            if strategy in SPAWN_PER_ROW and rows > args.max_spawn_rows:
+                print(f"⏭️  {strategy:<12} {rows:>9} rows: skipped (--max-spawn-rows)")
+                results.append({'strategy': strategy, 'rows': rows, 'skipped': True})
+                continue
+            result = run_benchmark(strategy, rows, args.batch_rows, args.seed)
+            results.append(result)
+            print(f"⏱️  {strategy:<12} {rows:>9} rows: {result['rows_per_sec']:>12} rows/s  "
+                  f"p50 {result['batch_p50_ms']} ms  p99 {result['batch_p99_ms']} ms  "
+                  f"rss {result['peak_rss_kb']} KiB  db {result['db_bytes']} B")
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Precomputed marker-cluster pyramid for the map
+
+Greedy supercluster-style clustering: events are projected to web
+mercator, then for every zoom from MAX_ZOOM down to MIN_ZOOM the clusters
+of the zoom above are merged with every unclaimed neighbour within RADIUS
+pixels. Neighbours are found through a grid with one cell per radius, so
+each level is linear in the number of clusters.
+
+Every cluster is written to event_clusters (migrations/0013) with its
+tile, weighted centroid, point count and dominant event_type. A zoomed
+out map then reads a few rows per visible tile instead of every event.
+
+Clusters only ever merge on the way down, so an event that is on its own
+at some zoom stays on its own at every zoom above. Such single events
+are stored once, at the lowest zoom where they are single: a map at
+zoom z shows the multi-point clusters of zoom z plus the single events
+of every zoom <= z (their tile at zoom z' is the viewport tile shifted
+right by z - z'). The table is therefore about N rows plus the clusters,
+not N rows per zoom.
+
+Above CELL_ZOOM the pyramid is computed per CELL_ZOOM tile ("cell"), and
+clusters do not merge across cells there. CELL_ZOOM and below are
+computed from the CELL_ZOOM clusters of all cells, which are kept in the
+table (multi-point ones with their full type_counts).
+An update therefore re-clusters only the cells holding the old and new
+positions of the changed events, plus the few levels below CELL_ZOOM,
+and gives the same rows as a full rebuild.
+
+Usage:
+    python3 cluster_pyramid.py --db PATH      rebuild from the local SQLite file
+    python3 cluster_pyramid.py [--remote]     rebuild through wrangler
+"""
+import argparse
+import json
+import math
+import time
+from collections import Counter
+
+from event_loader import (
+    DEFAULT_BATCH_BYTES, DEFAULT_BATCH_ROWS, PROJECT_DIR, execute_sql_file, iter_batches,
+    iter_chunks, query_json, sql_literal,
+)
+from local_db import connect_local
+from load_metrics import metrics
+
+MIN_ZOOM = 0
+MAX_ZOOM = 18
+CELL_ZOOM = 6
+RADIUS = 40  # pixels
+EXTENT = 256  # tile size in pixels
+
+CLUSTER_COLUMNS = ('zoom', 'tile_x', 'tile_y', 'seq', 'latitude', 'longitude',
+                   'point_count', 'dominant_type', 'event_id', 'type_counts')
+
+POINTS_SQL = 'SELECT id, latitude, longitude, event_type FROM events ORDER BY id'
+POSITIONS_SQL = 'SELECT id, latitude, longitude FROM events'
+# Points of one cell, padded because the R*Tree stores 32-bit bounds
+CELL_POINTS_SQL = (
+    'SELECT e.id, e.latitude, e.longitude, e.event_type FROM events_rtree r '
+    'JOIN events e ON e.id = r.id '
+    'WHERE r.max_lat >= {} AND r.min_lat <= {} AND r.max_lon >= {} AND r.min_lon <= {} '
+    'ORDER BY e.id'
+)
+# The CELL_ZOOM level: its multi-point clusters and every event single at or below it
+LEVEL_SQL = (
+    'SELECT zoom, tile_x, tile_y, latitude, longitude, point_count, dominant_type, event_id, '
+    f'type_counts FROM event_clusters WHERE zoom <= {CELL_ZOOM} '
+    f'AND (zoom = {CELL_ZOOM} OR point_count = 1)'
+)
+BUILT_SQL = 'SELECT EXISTS (SELECT 1 FROM event_clusters) AS built'
+ID_CHUNK = 500
+CELL_PAD = 1e-3  # degrees
+
+
+class Cluster:
+    __slots__ = ('x', 'y', 'count', 'types', 'event_id')
+
+    def __init__(self, x, y, count, types, event_id=None):
+        self.x = x
+        self.y = y
+        self.count = count
+        self.types = types
+        self.event_id = event_id
+
+
+def project(lat, lon):
+    """Web mercator position in [0, 1) x [0, 1)"""
+    sin = math.sin(math.radians(max(-85.05112878, min(85.05112878, lat))))
+    x = lon / 360.0 + 0.5
+    y = 0.5 - 0.25 * math.log((1 + sin) / (1 - sin)) / math.pi
+    return min(max(x, 0.0), 1.0 - 1e-12), min(max(y, 0.0), 1.0 - 1e-12)
+
+
+def unproject(x, y):
+    lon = (x - 0.5) * 360.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return lat, lon
+
+
+def cell_of(x, y):
+    scale = 1 << CELL_ZOOM
+    return int(x * scale), int(y * scale)
+
+
+def cells_of(rows):
+    """Cells of (id, latitude, longitude) rows that have a position"""
+    return {cell_of(*project(lat, lon)) for _, lat, lon in rows
+            if lat is not None and lon is not None}
+
+
+def cell_bounds(cell):
+    """Padded (min_lat, max_lat, min_lon, max_lon) covering a cell"""
+    scale = 1 << CELL_ZOOM
+    cx, cy = cell
+    north, west = unproject(cx / scale, cy / scale)
+    south, east = unproject((cx + 1) / scale, (cy + 1) / scale)
+    # project() clamps the poles into the outermost cells
+    if cy == 0:
+        north = 90.0
+    if cy == scale - 1:
+        south = -90.0
+    return south - CELL_PAD, north + CELL_PAD, west - CELL_PAD, east + CELL_PAD
+
+
+def cluster_level(clusters, zoom, radius=RADIUS, extent=EXTENT):
+    """Merge `clusters` (from zoom + 1) into the clusters of `zoom`"""
+    r = radius / (extent * (1 << zoom))
+    grid = {}
+    for i, c in enumerate(clusters):
+        grid.setdefault((int(c.x / r), int(c.y / r)), []).append(i)
+
+    claimed = [False] * len(clusters)
+    merged = []
+    r2 = r * r
+    for i, c in enumerate(clusters):
+        if claimed[i]:
+            continue
+        claimed[i] = True
+        members = [c]
+        gx, gy = int(c.x / r), int(c.y / r)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in grid.get((gx + dx, gy + dy), ()):
+                    other = clusters[j]
+                    if not claimed[j] and (other.x - c.x) ** 2 + (other.y - c.y) ** 2 <= r2:
+                        claimed[j] = True
+                        members.append(other)
+        if len(members) == 1:
+            merged.append(c)
+            continue
+        count = sum(m.count for m in members)
+        types = Counter()
+        for m in members:
+            types.update(m.types)
+        merged.append(Cluster(sum(m.x * m.count for m in members) / count,
+                              sum(m.y * m.count for m in members) / count,
+                              count, types))
+    return merged
+
+
+def dominant(types):
+    if not types:
+        return None
+    # Most frequent, ties broken by name so rebuilds are deterministic
+    return min(types.items(), key=lambda item: (-item[1], item[0] or ''))[0]
+
+
+def _descend(clusters, top, bottom, radius):
+    """Cluster from zoom `top` down to `bottom`
+
+    Returns the (zoom, cluster) entries of multi-point clusters, the
+    (zoom, cluster) of every single event at the lowest zoom it is still
+    single, and the clusters at `bottom`.
+    """
+    entries = []
+    single = {}
+    for zoom in range(top, bottom - 1, -1):
+        clusters = cluster_level(clusters, zoom, radius)
+        for c in clusters:
+            if c.count == 1:
+                single[c.event_id] = (zoom, c)
+            else:
+                entries.append((zoom, c))
+    return entries, single, clusters
+
+
+def _leaves(points):
+    clusters = []
+    for event_id, lat, lon, event_type in points:
+        if lat is None or lon is None:
+            continue
+        x, y = project(lat, lon)
+        clusters.append(Cluster(x, y, 1, Counter({event_type: 1}), event_id))
+    return clusters
+
+
+def _stored(lat, lon, count, types, event_id):
+    """A cluster as read back from its row, so full and partial builds agree"""
+    x, y = project(lat, lon)
+    return Cluster(x, y, count, types, event_id if count == 1 else None)
+
+
+def _round_trip(c):
+    lat, lon = unproject(c.x, c.y)
+    return _stored(round(lat, 6), round(lon, 6), c.count, c.types, c.event_id)
+
+
+def _level_order(c):
+    return (c.y, c.x, c.count, c.event_id or 0)
+
+
+def build_cell(points, radius=RADIUS):
+    """Cluster one cell's points above CELL_ZOOM
+
+    Returns the (zoom, cluster) entries the cell owns (multi-point
+    clusters above CELL_ZOOM, events that stop being single above it)
+    and the cell's clusters at CELL_ZOOM.
+    """
+    entries, single, level = _descend(_leaves(points), MAX_ZOOM, CELL_ZOOM, radius)
+    owned = [(zoom, c) for zoom, c in entries if zoom > CELL_ZOOM]
+    owned += [(zoom, c) for zoom, c in single.values() if zoom > CELL_ZOOM]
+    return owned, [_round_trip(c) for c in level]
+
+
+def build_low(level, radius=RADIUS):
+    """(zoom, cluster) entries for CELL_ZOOM and below from all CELL_ZOOM clusters"""
+    level = sorted(level, key=_level_order)
+    entries = [(CELL_ZOOM, c) for c in level if c.count > 1]
+    single = {c.event_id: (CELL_ZOOM, c) for c in level if c.count == 1}
+    lower, lower_single, _ = _descend(level, CELL_ZOOM - 1, MIN_ZOOM, radius)
+    single.update(lower_single)
+    return entries + lower + list(single.values())
+
+
+def _type_counts(types):
+    return json.dumps(sorted(types.items(), key=lambda item: (item[0] or '', item[1])),
+                      ensure_ascii=False)
+
+
+def cluster_rows(entries):
+    """event_clusters rows for (zoom, cluster) entries, numbered per tile"""
+    seqs = {}
+    for zoom, c in sorted(entries, key=lambda entry: entry[0], reverse=True):
+        scale = 1 << zoom
+        tile = (zoom, int(c.x * scale), int(c.y * scale))
+        seq = seqs[tile] = seqs.get(tile, -1) + 1
+        lat, lon = unproject(c.x, c.y)
+        multi = c.count > 1
+        yield (zoom, tile[1], tile[2], seq, round(lat, 6), round(lon, 6), c.count,
+               dominant(c.types), None if multi else c.event_id,
+               _type_counts(c.types) if multi and zoom == CELL_ZOOM else None)
+
+
+def build_pyramid(points, radius=RADIUS):
+    """Yield all event_clusters rows for (id, latitude, longitude, event_type) points"""
+    cells = {}
+    for point in points:
+        if point[1] is not None and point[2] is not None:
+            cells.setdefault(cell_of(*project(point[1], point[2])), []).append(point)
+    entries = []
+    level = []
+    for cell in sorted(cells):
+        owned, cell_level = build_cell(cells[cell], radius)
+        entries += owned
+        level += cell_level
+    return cluster_rows(entries + build_low(level, radius))
+
+
+def _level_row(row):
+    zoom, tile_x, tile_y, lat, lon, count, dominant_type, event_id, type_counts = row
+    types = (Counter({t: n for t, n in json.loads(type_counts)}) if type_counts
+             else Counter({dominant_type: count}))
+    return _stored(lat, lon, count, types, event_id)
+
+
+def plan_update(dirty, ids, fetch_cell, level_rows, radius=RADIUS):
+    """Rows for the `dirty` cells and for CELL_ZOOM and below
+
+    `ids` are the changed (also deleted) events, `fetch_cell(cell)`
+    returns a cell's current points and `level_rows` are the LEVEL_SQL
+    rows before the update.
+    """
+    entries = []
+    level = []
+    moved = set(ids)
+    for cell in sorted(dirty):
+        points = fetch_cell(cell)
+        moved.update(point[0] for point in points)
+        owned, cell_level = build_cell(points, radius)
+        entries += owned
+        level += cell_level
+    for row in level_rows:
+        zoom, tile_x, tile_y, count, event_id = row[0], row[1], row[2], row[5], row[7]
+        if count == 1 and event_id in moved:
+            continue
+        if count > 1 and (tile_x, tile_y) in dirty:
+            continue
+        level.append(_level_row(row))
+    return cluster_rows(entries + build_low(level, radius))
+
+
+def delete_sql(dirty):
+    """Statements removing the dirty cells above CELL_ZOOM and everything below"""
+    statements = []
+    for cx, cy in sorted(dirty):
+        for zoom in range(CELL_ZOOM + 1, MAX_ZOOM + 1):
+            shift = zoom - CELL_ZOOM
+            statements.append(
+                f"DELETE FROM event_clusters WHERE zoom = {zoom} "
+                f"AND tile_x BETWEEN {cx << shift} AND {((cx + 1) << shift) - 1} "
+                f"AND tile_y BETWEEN {cy << shift} AND {((cy + 1) << shift) - 1}"
+            )
+    statements.append(f"DELETE FROM event_clusters WHERE zoom <= {CELL_ZOOM}")
+    return statements
+
+
+def _insert_sql():
+    placeholders = ', '.join('?' for _ in CLUSTER_COLUMNS)
+    return f"INSERT INTO event_clusters ({', '.join(CLUSTER_COLUMNS)}) VALUES ({placeholders})"
+
+
+def _cell_points_sql(cell):
+    return CELL_POINTS_SQL.format(*(repr(bound) for bound in cell_bounds(cell)))
+
+
+def _in_cell(cell, rows):
+    return [row for row in rows if row[1] is not None and row[2] is not None
+            and cell_of(*project(row[1], row[2])) == cell]
+
+
+def _positions_sql(ids):
+    return f"{POSITIONS_SQL} WHERE id IN ({', '.join(str(int(i)) for i in ids)})"
+
+
+def cells_sqlite(conn, ids):
+    """Cells of the currently stored positions of `ids`"""
+    cells = set()
+    for chunk in iter_chunks(sorted(ids), ID_CHUNK):
+        cells |= cells_of(conn.execute(_positions_sql(chunk)))
+    return cells
+
+
+def _write_sqlite(conn, statements, rows, batch_rows):
+    for sql in statements:
+        conn.execute(sql)
+    written = 0
+    sql = _insert_sql()
+    for chunk in iter_chunks(rows, batch_rows):
+        with metrics.stage('db_execute'):
+            conn.executemany(sql, chunk)
+        written += len(chunk)
+    return written
+
+
+def _in_transaction(conn, in_transaction, body):
+    if not in_transaction:
+        conn.execute('BEGIN IMMEDIATE')
+    try:
+        result = body()
+    except BaseException:
+        if not in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    if not in_transaction:
+        conn.execute('COMMIT')
+    return result
+
+
+def rebuild_sqlite(conn, batch_rows=1000, in_transaction=False):
+    """Replace event_clusters from the events table; returns the row count
+
+    With in_transaction=True the caller owns BEGIN/COMMIT (e.g. the sync).
+    """
+    start = time.perf_counter()
+
+    def body():
+        points = conn.execute(POINTS_SQL).fetchall()
+        return _write_sqlite(conn, ['DELETE FROM event_clusters'], build_pyramid(points), batch_rows)
+
+    rows = _in_transaction(conn, in_transaction, body)
+    metrics.add_time('cluster_pyramid', time.perf_counter() - start)
+    return rows
+
+
+def update_sqlite(conn, old_cells, ids, batch_rows=1000, in_transaction=False):
+    """Re-cluster the cells of `old_cells` and of the current positions of `ids`
+
+    `old_cells` are the cells the changed events were in before the
+    write (cells_sqlite before the upsert/delete). Falls back to a full
+    rebuild while event_clusters is empty. Returns the rows written.
+    """
+    if not conn.execute(BUILT_SQL).fetchone()[0]:
+        return rebuild_sqlite(conn, batch_rows, in_transaction)
+    start = time.perf_counter()
+
+    def body():
+        dirty = set(old_cells) | cells_sqlite(conn, ids)
+        level_rows = conn.execute(LEVEL_SQL).fetchall()
+        rows = plan_update(dirty, ids, lambda cell: _in_cell(cell, conn.execute(_cell_points_sql(cell))),
+                           level_rows)
+        return _write_sqlite(conn, delete_sql(dirty), rows, batch_rows)
+
+    rows = _in_transaction(conn, in_transaction, body)
+    metrics.add_time('cluster_pyramid', time.perf_counter() - start)
+    return rows
+
+
+def _render_row(row):
+    return '(' + ', '.join(sql_literal(v) for v in row) + ')'
+
+
+def _write_wrangler(statements, rows, local, cwd, batch_rows, batch_bytes):
+    """Run `statements`, then insert `rows` one size-bounded batch per file"""
+    result = execute_sql_file(';\n'.join(statements) + ';\n', local, cwd)
+    if result.returncode != 0:
+        raise RuntimeError(f"Writing event_clusters failed: {result.stderr.strip()}")
+    written = 0
+    for batch in iter_batches(rows, batch_rows, batch_bytes, render=_render_row):
+        values = ',\n'.join(rendered for _, rendered in batch)
+        result = execute_sql_file(
+            f"INSERT INTO event_clusters ({', '.join(CLUSTER_COLUMNS)}) VALUES\n{values};\n", local, cwd)
+        if result.returncode != 0:
+            raise RuntimeError(f"Writing event_clusters failed: {result.stderr.strip()}")
+        written += len(batch)
+    return written
+
+
+def cells_wrangler(ids, local=True, cwd=PROJECT_DIR):
+    cells = set()
+    for chunk in iter_chunks(sorted(ids), ID_CHUNK):
+        cells |= cells_of((r['id'], r['latitude'], r['longitude'])
+                          for r in query_json(_positions_sql(chunk), local, cwd))
+    return cells
+
+
+def rebuild_wrangler(local=True, cwd=PROJECT_DIR, batch_rows=DEFAULT_BATCH_ROWS,
+                     batch_bytes=DEFAULT_BATCH_BYTES):
+    """Replace event_clusters through wrangler; returns the row count
+
+    The rows are computed first, then written in size-bounded batches,
+    one wrangler call each; the table is incomplete until the last one.
+    """
+    points = [(r['id'], r['latitude'], r['longitude'], r['event_type'])
+              for r in query_json(POINTS_SQL, local, cwd)]
+    rows = list(build_pyramid(points))
+    return _write_wrangler(['DELETE FROM event_clusters'], rows, local, cwd, batch_rows, batch_bytes)
+
+
+def update_wrangler(old_cells, ids, local=True, cwd=PROJECT_DIR, batch_rows=DEFAULT_BATCH_ROWS,
+                    batch_bytes=DEFAULT_BATCH_BYTES):
+    """update_sqlite through wrangler; `old_cells` as read before the sync wrote"""
+    if not query_json(BUILT_SQL, local, cwd)[0]['built']:
+        return rebuild_wrangler(local, cwd, batch_rows, batch_bytes)
+    dirty = set(old_cells) | cells_wrangler(ids, local, cwd)
+    columns = ('zoom', 'tile_x', 'tile_y', 'latitude', 'longitude', 'point_count',
+               'dominant_type', 'event_id', 'type_counts')
+    level_rows = [tuple(r[c] for c in columns) for r in query_json(LEVEL_SQL, local, cwd)]
+
+    def fetch_cell(cell):
+        return _in_cell(cell, [(r['id'], r['latitude'], r['longitude'], r['event_type'])
+                               for r in query_json(_cell_points_sql(cell), local, cwd)])
+
+    rows = list(plan_update(dirty, ids, fetch_cell, level_rows))
+    return _write_wrangler(delete_sql(dirty), rows, local, cwd, batch_rows, batch_bytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the precomputed marker-cluster pyramid')
+    parser.add_argument('--db', metavar='PATH',
+                        help='rebuild in this SQLite file directly (no wrangler)')
+    parser.add_argument('--direct', action='store_true',
+                        help='write straight into the local D1 SQLite file (auto-detected)')
+    parser.add_argument('--remote', action='store_true',
+                        help='rebuild the remote D1 database instead of --local')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.db or args.direct:
+        conn = connect_local(args.db)
+        try:
+            rows = rebuild_sqlite(conn)
+            per_zoom = conn.execute(
+                'SELECT zoom, SUM(point_count > 1), SUM(point_count = 1) FROM event_clusters '
+                'GROUP BY zoom ORDER BY zoom'
+            ).fetchall()
+        finally:
+            conn.close()
+        for zoom, clusters, singles in per_zoom:
+            print(f"   z{zoom:<2} {clusters:>8} clusters, {singles:>8} events first single here")
+    else:
+        rows = rebuild_wrangler(not args.remote)
+    print(f"✅ {rows} cluster rows written in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Streamed event corpus from NDJSON and seed SQL files
+
+Each line of a corpus file is one JSON object with the events columns.
+`sources` and `keywords` are stored as real JSON arrays and only turned
+back into the TEXT column value when a row is actually written.
+
+The seed_*.sql files can be part of a corpus too: their INSERT INTO
+events tuples are streamed through seed_sql into the same records.
+When several files carry the same id, the file listed first wins.
+"""
+import glob
+import json
+import os
+
+from event_loader import EVENT_COLUMNS
+from load_metrics import metrics
+from seed_sql import iter_rows
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# Seed SQL files in precedence order: the later batches carry the full
+# descriptions, seed_events.sql only the original short rows
+SEED_FILES = (
+    'seed_batch2_events.sql',
+    'seed_batch1_events.sql',
+    'seed_155_events.sql',
+    'seed_events.sql',
+)
+
+JSON_COLUMNS = ('sources', 'keywords')
+
+
+def dump_json_column(value):
+    """Serialize a JSON column the way the seed SQL files store it"""
+    if value is None or isinstance(value, str):
+        return value
+    with metrics.stage('json_serialize'):
+        return json.dumps(value, ensure_ascii=False)
+
+
+class EventRecord:
+    """Compact event row; JSON columns are serialized on access"""
+
+    __slots__ = EVENT_COLUMNS
+
+    def __init__(self, values):
+        for col in EVENT_COLUMNS:
+            setattr(self, col, values.get(col))
+
+    def get(self, col, default=None):
+        if col not in EVENT_COLUMNS:
+            return default
+        value = getattr(self, col)
+        if col in JSON_COLUMNS:
+            return dump_json_column(value)
+        return value
+
+    def __getitem__(self, col):
+        if col not in EVENT_COLUMNS:
+            raise KeyError(col)
+        return self.get(col)
+
+    def __contains__(self, col):
+        return col in EVENT_COLUMNS
+
+    def __repr__(self):
+        return f"EventRecord(id={self.id!r}, title={self.title!r})"
+
+
+def iter_events(path):
+    """Yield EventRecords from an NDJSON file one line at a time"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                with metrics.stage('record_build'):
+                    record = EventRecord(json.loads(line))
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: {e}") from None
+            yield record
+
+
+def iter_seed_events(path):
+    """Yield EventRecords from the INSERT INTO events tuples of a seed SQL file
+
+    Columns the events loaders do not write (related_document_id) are
+    dropped. Malformed statements are reported and skipped.
+    """
+    errors = []
+    for row in iter_rows(path, tables=('events',), errors=errors):
+        with metrics.stage('record_build'):
+            record = EventRecord(row.as_dict())
+        yield record
+    for message in errors:
+        print(f"⚠️  Skipped malformed seed SQL: {message}")
+
+
+def _resolve(path):
+    if os.path.isabs(path):
+        return path
+    if path.endswith('.sql'):
+        return os.path.join(ROOT_DIR, path)
+    return os.path.join(DATA_DIR, path)
+
+
+class EventCorpus:
+    """Re-iterable view over NDJSON corpus and seed SQL files
+
+    Nothing is read until iteration starts, and every iteration streams
+    the files again from disk. Files are read in the order given and an
+    id already yielded by an earlier file is skipped, so only the set of
+    seen ids is kept in memory.
+    """
+
+    def __init__(self, *paths):
+        self.paths = [_resolve(p) for p in paths]
+
+    def __iter__(self):
+        seen = set()
+        for path in self.paths:
+            records = iter_seed_events(path) if path.endswith('.sql') else iter_events(path)
+            for record in records:
+                if record.id in seen:
+                    continue
+                seen.add(record.id)
+                yield record
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def default_corpus(seeds=False):
+    """Every events_*.ndjson file in data/, in file name order
+
+    With seeds=True the SEED_FILES follow, so the NDJSON corpus takes
+    precedence over them.
+    """
+    paths = sorted(glob.glob(os.path.join(DATA_DIR, 'events_*.ndjson')))
+    if seeds:
+        paths += [os.path.join(ROOT_DIR, name) for name in SEED_FILES]
+    return EventCorpus(*paths)
+
+
+def write_events(events, path):
+    """Write events (dicts or EventRecords) as NDJSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in events:
+            row = {}
+            for col in EVENT_COLUMNS:
+                value = event.get(col)
+                if col in JSON_COLUMNS and isinstance(value, str):
+                    value = json.loads(value)
+                row[col] = value
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
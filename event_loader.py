@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for loading events into the D1 database
+
+Batched mode packs many events into multi-row INSERT statements, writes
+them to a temporary SQL file and runs a single `wrangler d1 execute --file`
+per batch instead of one wrangler process per event.
+
+Direct mode skips wrangler entirely for --local runs and writes into the
+SQLite file miniflare keeps under .wrangler/state.
+"""
+import json
+import math
+import os
+import sqlite3
+import subprocess
+import tempfile
+import time
+from contextlib import nullcontext
+
+from fts_bulk import deferred_fts, print_timings
+from load_journal import FileJournal, TableJournal, batch_hash, load_lock, make_entry, pending_rows
+from load_metrics import metrics
+from local_db import PROJECT_DIR, connect_local
+
+DB_NAME = 'weltenbibliothek_db_v2'
+
+EVENT_COLUMNS = (
+    'id', 'title', 'description', 'latitude', 'longitude', 'category', 'event_type',
+    'year', 'date_text', 'icon_type', 'full_description', 'sources', 'keywords', 'evidence_level'
+)
+
+DEFAULT_BATCH_ROWS = 500
+# D1 rejects SQL statements over 100 KB, so batches stay below that
+DEFAULT_BATCH_BYTES = 90 * 1024
+
+def escape_sql(value):
+    """Escape single quotes for SQL"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, str):
+        return value.replace("'", "''")
+    return str(value)
+
+
+def sql_literal(value):
+    """Render a Python value as a SQL literal"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float) and not math.isfinite(value):
+        # NaN/inf have no SQL literal form (SQLite stores a bound NaN as NULL too)
+        return 'NULL'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return f"'{escape_sql(str(value))}'"
+
+
+def inline_params(sql, params):
+    """Substitute each ? placeholder of sql with a literal of the matching param
+
+    The template is split once, so '?' inside a substituted value stays as is.
+    """
+    parts = sql.split('?')
+    if len(parts) != len(params) + 1:
+        raise ValueError(f"SQL has {len(parts) - 1} placeholders but {len(params)} params were given")
+    out = [parts[0]]
+    for value, part in zip(params, parts[1:]):
+        out.append(sql_literal(value))
+        out.append(part)
+    return ''.join(out)
+
+
+def render_row(event):
+    """Render one event as a VALUES tuple"""
+    return '(' + ', '.join(sql_literal(event.get(col)) for col in EVENT_COLUMNS) + ')'
+
+
+def render_insert(rows):
+    """Render pre-rendered VALUES tuples as one multi-row INSERT"""
+    return (
+        f"INSERT INTO events ({', '.join(EVENT_COLUMNS)}) VALUES\n"
+        + ',\n'.join(rows)
+        + ';\n'
+    )
+
+
+def iter_batches(events, max_rows=DEFAULT_BATCH_ROWS, max_bytes=DEFAULT_BATCH_BYTES,
+                 render=render_row):
+    """Group events into batches bounded by row count and SQL byte size
+
+    Yields lists of (event, rendered_row) pairs. A single row larger than
+    max_bytes still gets a batch of its own.
+    """
+    batch = []
+    size = 0
+    for event in events:
+        with metrics.stage('sql_render'):
+            row = render(event)
+        row_bytes = len(row.encode('utf-8')) + 2
+        if batch and (len(batch) >= max_rows or size + row_bytes > max_bytes):
+            yield batch
+            batch = []
+            size = 0
+        batch.append((event, row))
+        size += row_bytes
+    if batch:
+        yield batch
+
+
+def iter_chunks(events, size):
+    """Group events into lists of at most `size`"""
+    chunk = []
+    for event in events:
+        chunk.append(event)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def execute_sql_file(sql, local=True, cwd=PROJECT_DIR):
+    """Run a SQL script through a single wrangler process"""
+    fd, path = tempfile.mkstemp(prefix='events_', suffix='.sql')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(sql)
+        cmd = ['npx', 'wrangler', 'd1', 'execute', DB_NAME, '--file', path]
+        if local:
+            cmd.append('--local')
+        with metrics.stage('subprocess'):
+            return subprocess.run(cmd, capture_output=True, text=True, cwd=cwd)
+    finally:
+        os.unlink(path)
+
+
+def query_json(sql, local=True, cwd=PROJECT_DIR):
+    """Run a read-only query through wrangler and return the result rows"""
+    cmd = ['npx', 'wrangler', 'd1', 'execute', DB_NAME, '--json', '--command', sql]
+    if local:
+        cmd.append('--local')
+    result = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd)
+    if result.returncode != 0:
+        raise RuntimeError(f"wrangler query failed: {result.stderr.strip()}")
+    rows = []
+    for statement in json.loads(result.stdout):
+        rows.extend(statement.get('results', []))
+    return rows
+
+
+def load_batch(batch, local=True, cwd=PROJECT_DIR, render=render_insert):
+    """Insert a batch, splitting it in halves on failure
+
+    Returns (inserted_events, failed) where failed is a list of
+    (event, stderr) pairs for the rows that could not be inserted alone.
+    """
+    with metrics.stage('sql_render'):
+        sql = render([row for _, row in batch])
+    start = time.perf_counter()
+    result = execute_sql_file(sql, local=local, cwd=cwd)
+    if result.returncode == 0:
+        metrics.batch(len(batch), len(sql.encode('utf-8')), time.perf_counter() - start, 'wrangler')
+        return [event for event, _ in batch], []
+    if len(batch) == 1:
+        return [], [(batch[0][0], result.stderr)]
+
+    mid = len(batch) // 2
+    left_ok, left_failed = load_batch(batch[:mid], local=local, cwd=cwd, render=render)
+    right_ok, right_failed = load_batch(batch[mid:], local=local, cwd=cwd, render=render)
+    return left_ok + right_ok, left_failed + right_failed
+
+
+def _batch_key(item):
+    return item[0]['id']
+
+
+def load_events_batched(events, max_rows=DEFAULT_BATCH_ROWS, max_bytes=DEFAULT_BATCH_BYTES,
+                        local=True, cwd=PROJECT_DIR, journal=None, restart=False):
+    """Load events in batches; returns (success_count, failed)
+
+    With `journal` (a sidecar file path) every finished batch is recorded,
+    and a rerun skips batches already committed and retries only the rows
+    that failed. `restart` discards the journal first.
+    """
+    journal = FileJournal(journal) if journal else None
+    success_count = 0
+    failed = []
+    with load_lock(journal.lock_path) if journal else nullcontext():
+        if journal:
+            journal.open(restart)
+        for index, batch in enumerate(iter_batches(events, max_rows, max_bytes)):
+            todo = batch
+            if journal:
+                digest = batch_hash(row for _, row in batch)
+                todo = pending_rows(journal.lookup(index), digest, batch, _batch_key)
+                success_count += len(batch) - len(todo)
+                if not todo:
+                    print(f"⏭️  Batch {index} already committed, skipping")
+                    continue
+
+            ok, bad = load_batch(todo, local=local, cwd=cwd)
+            success_count += len(ok)
+            failed.extend(bad)
+            if journal:
+                journal.record(make_entry(index, digest, [_batch_key(item) for item in batch],
+                                          [event['id'] for event, _ in bad]))
+            print(f"📦 Batch of {len(todo)}: {len(ok)} inserted, {len(bad)} failed")
+            for event, stderr in bad:
+                print(f"❌ Error inserting event {event['id']}: {event['title']}")
+                print(f"   {stderr}")
+    return success_count, failed
+
+
+def event_params(event):
+    """Bind parameters for one event in EVENT_COLUMNS order"""
+    return tuple(event.get(col) for col in EVENT_COLUMNS)
+
+
+def insert_sql(verb='INSERT'):
+    """Parameterized single-row INSERT for the events table"""
+    placeholders = ', '.join('?' for _ in EVENT_COLUMNS)
+    return f"{verb} INTO events ({', '.join(EVENT_COLUMNS)}) VALUES ({placeholders})"
+
+
+def _load_sqlite_journaled(events, conn, journal, restart, batch_rows):
+    sql = insert_sql()
+    success_count = 0
+    failed = []
+    with load_lock(journal.lock_path):
+        journal.open(restart)
+        for index, batch in enumerate(iter_chunks(events, batch_rows)):
+            rows = [(event, event_params(event)) for event in batch]
+            digest = batch_hash(json.dumps(params, ensure_ascii=False) for _, params in rows)
+            todo = pending_rows(journal.lookup(index), digest, rows, _batch_key)
+            success_count += len(rows) - len(todo)
+            if not todo:
+                print(f"⏭️  Batch {index} already committed, skipping")
+                continue
+
+            bad = []
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                try:
+                    with metrics.stage('db_execute'):
+                        conn.executemany(sql, [params for _, params in todo])
+                except sqlite3.Error:
+                    conn.execute('ROLLBACK')
+                    conn.execute('BEGIN IMMEDIATE')
+                    for event, params in todo:
+                        try:
+                            conn.execute(sql, params)
+                        except sqlite3.Error as e:
+                            bad.append((event, str(e)))
+                entry = make_entry(index, digest, [event['id'] for event in batch],
+                                   [event['id'] for event, _ in bad])
+                if journal.transactional:
+                    journal.record(entry)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            if not journal.transactional:
+                journal.record(entry)
+
+            success_count += len(todo) - len(bad)
+            failed.extend(bad)
+            print(f"📦 Batch {index} of {len(todo)}: {len(todo) - len(bad)} inserted, {len(bad)} failed")
+            for event, error in bad:
+                print(f"❌ Error inserting event {event['id']}: {event['title']}")
+                print(f"   {error}")
+    return success_count, failed
+
+
+def load_events_sqlite(events, db_path=None, cwd=PROJECT_DIR, conn=None, bulk=False,
+                       journal=None, restart=False, batch_rows=DEFAULT_BATCH_ROWS):
+    """Insert all events in one transaction via executemany
+
+    Events are streamed into executemany. On failure the transaction is
+    rolled back and each row is retried in a throwaway transaction to report
+    exactly which rows were rejected, so `events` must be re-iterable
+    (a list or an EventCorpus) for that report to be complete.
+    Returns (success_count, failed) like load_events_batched.
+
+    With bulk=True the FTS triggers are suspended and events_fts is
+    rebuilt once after the insert (see fts_bulk.deferred_fts).
+
+    With `journal` (a run name) the load instead commits every batch_rows
+    events together with a sync_journal row, so an interrupted load
+    resumes at the first unfinished batch. Not combinable with bulk.
+    """
+    if journal and bulk:
+        raise ValueError("A journaled load commits per batch and cannot defer FTS maintenance")
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_local(db_path, cwd)
+    sql = insert_sql()
+    try:
+        if journal:
+            return _load_sqlite_journaled(events, conn, TableJournal(conn, journal), restart,
+                                          batch_rows)
+
+        timings = {}
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            start = time.perf_counter()
+            with deferred_fts(conn, 'events', timings) if bulk else nullcontext():
+                with metrics.stage('db_execute'):
+                    cursor = conn.executemany(sql, (event_params(event) for event in events))
+            metrics.batch(cursor.rowcount, None, time.perf_counter() - start, 'sqlite')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+        else:
+            conn.execute('COMMIT')
+            print(f"⚡ Inserted {cursor.rowcount} events directly into SQLite")
+            print_timings(timings)
+            return cursor.rowcount, []
+
+        failed = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for event in events:
+                try:
+                    conn.execute(sql, event_params(event))
+                except sqlite3.Error as e:
+                    failed.append((event, str(e)))
+        finally:
+            conn.execute('ROLLBACK')
+        for event, error in failed:
+            print(f"❌ Error inserting event {event['id']}: {event['title']}")
+            print(f"   {error}")
+        print("↩️  Load rolled back, no events were written")
+        return 0, failed
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def add_batch_arguments(parser):
+    """Register the batched-mode command line options"""
+    parser.add_argument('--batch', action='store_true',
+                        help='load events with one wrangler process per batch')
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS,
+                        help='maximum events per batch')
+    parser.add_argument('--batch-bytes', type=int, default=DEFAULT_BATCH_BYTES,
+                        help='maximum SQL bytes per batch')
+    parser.add_argument('--corpus', nargs='+', metavar='FILE',
+                        help='load these NDJSON or seed SQL files instead of the built-in corpus '
+                             '(earlier files win on duplicate ids)')
+    parser.add_argument('--direct', action='store_true',
+                        help='write straight into the local D1 SQLite file (no wrangler)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='with --direct: defer FTS maintenance and rebuild the index once')
+    parser.add_argument('--db', metavar='PATH',
+                        help='SQLite file for --direct (default: auto-detect under .wrangler/state)')
+    parser.add_argument('--validate', action='store_true',
+                        help='validate the corpus first and abort without writing if it has problems')
+    parser.add_argument('--journal', metavar='PATH_OR_RUN',
+                        help='resumable load: sidecar journal file for --batch, '
+                             'sync_journal run name for --direct')
+    parser.add_argument('--restart', action='store_true',
+                        help='discard the journal and start the load from scratch')
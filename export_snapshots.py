@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Static, precompressed JSON snapshots of the events API
+
+Writes the event list as shards keyed by category, event_type and year
+bucket into public/data/events/, named after a hash of their content.
+The directory is a build output and ignored by git. Every shard is
+stored as plain JSON plus .gz and, when the brotli module is installed,
+.br variants compressed ahead of time. manifest.json lists the shards
+with ETags and row counts, and carries the aggregate counts of
+/api/events/categories and /api/events/types.
+
+Shards whose content hash is unchanged since the last manifest are not
+rewritten or recompressed, so after a small sync only the touched shards
+change on disk. Shards that disappeared are deleted.
+
+Usage:
+    python3 export_snapshots.py --db PATH      export from a SQLite file
+    python3 export_snapshots.py [--remote]     export through wrangler
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+
+from event_loader import PROJECT_DIR, query_json
+from local_db import connect_readonly
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.path.join(ROOT_DIR, 'public', 'data', 'events')
+MANIFEST = 'manifest.json'
+
+BUCKET_YEARS = 500
+
+# Same columns as GET /api/events
+SNAPSHOT_COLUMNS = ('id', 'title', 'description', 'latitude', 'longitude', 'category',
+                    'event_type', 'year', 'date_text', 'icon_type', 'image_url',
+                    'image_thumbnail_url', 'related_document_id')
+
+SNAPSHOT_SQL = f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM events ORDER BY id"
+
+
+def year_bucket(year, bucket_years=BUCKET_YEARS):
+    """First year of the bucket containing `year`, or None"""
+    if year is None:
+        return None
+    return year // bucket_years * bucket_years
+
+
+def slug(value):
+    if value is None:
+        return 'none'
+    value = value.lower()
+    for src, dst in (('ä', 'ae'), ('ö', 'oe'), ('ü', 'ue'), ('ß', 'ss')):
+        value = value.replace(src, dst)
+    return re.sub(r'[^a-z0-9]+', '-', value).strip('-') or 'none'
+
+
+def shard_events(events, bucket_years=BUCKET_YEARS):
+    """Group event dicts into {(category, event_type, bucket): [event, ...]}"""
+    shards = {}
+    for event in events:
+        key = (event['category'], event['event_type'], year_bucket(event['year'], bucket_years))
+        shards.setdefault(key, []).append(event)
+    return shards
+
+
+def counts(events, column):
+    """[{column: value, count: n}] ordered like the API (count desc)"""
+    tally = {}
+    for event in events:
+        if event[column] is not None:
+            tally[event[column]] = tally.get(event[column], 0) + 1
+    return [{column: value, 'count': n}
+            for value, n in sorted(tally.items(), key=lambda item: (-item[1], item[0]))]
+
+
+def _write(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _read_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_shard(out_dir, name, body):
+    """Write the plain, gzip and brotli variants; returns their sizes"""
+    sizes = {'bytes': len(body)}
+    _write(os.path.join(out_dir, name), body)
+    # mtime=0 keeps the .gz bytes identical across runs
+    gz = gzip.compress(body, compresslevel=9, mtime=0)
+    _write(os.path.join(out_dir, name + '.gz'), gz)
+    sizes['gzip_bytes'] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(body, quality=11)
+        _write(os.path.join(out_dir, name + '.br'), br)
+        sizes['br_bytes'] = len(br)
+    return sizes
+
+
+def export(events, out_dir=SNAPSHOT_DIR, bucket_years=BUCKET_YEARS, force=False):
+    """Write shards and manifest for `events` (dicts); returns stats"""
+    os.makedirs(out_dir, exist_ok=True)
+    previous = {}
+    old = _read_manifest(out_dir)
+    if old.get('bucket_years') == bucket_years:
+        previous = {s['file']: s for s in old.get('shards', [])}
+
+    stats = {'shards': 0, 'written': 0, 'unchanged': 0, 'removed': 0}
+    shards = []
+    for (category, event_type, bucket), rows in sorted(
+            shard_events(events, bucket_years).items(),
+            key=lambda item: tuple('' if v is None else str(v) for v in item[0])):
+        body = json.dumps({'success': True, 'events': rows}, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        bucket_name = 'unknown' if bucket is None else str(bucket)
+        name = f"events.{slug(category)}.{slug(event_type)}.{bucket_name}.{digest}.json"
+        entry = previous.get(name)
+        if entry is None or force or not os.path.exists(os.path.join(out_dir, name)):
+            entry = {'file': name, **write_shard(out_dir, name, body)}
+            stats['written'] += 1
+        else:
+            stats['unchanged'] += 1
+        shards.append({
+            **entry,
+            'category': category,
+            'event_type': event_type,
+            'year_from': bucket,
+            'year_to': None if bucket is None else bucket + bucket_years - 1,
+            'count': len(rows),
+            'etag': f'"{digest}"',
+        })
+    stats['shards'] = len(shards)
+
+    manifest = {
+        'version': hashlib.blake2b(''.join(s['file'] for s in shards).encode('utf-8'),
+                                   digest_size=8).hexdigest(),
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'bucket_years': bucket_years,
+        'encodings': ['gzip', 'br'] if brotli is not None else ['gzip'],
+        'total': len(events),
+        'categories': counts(events, 'category'),
+        'types': counts(events, 'event_type'),
+        'shards': shards,
+    }
+    _write(os.path.join(out_dir, MANIFEST),
+           json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    # Drop shard files no longer listed; only after the new manifest is in place
+    keep = {s['file'] for s in shards}
+    for name in os.listdir(out_dir):
+        base = re.sub(r'\.(gz|br)$', '', name)
+        if name.startswith('events.') and base.endswith('.json') and base not in keep:
+            os.unlink(os.path.join(out_dir, name))
+            stats['removed'] += name == base
+    return stats
+
+
+def fetch_sqlite(conn):
+    cursor = conn.execute(SNAPSHOT_SQL)
+    return [dict(zip(SNAPSHOT_COLUMNS, row)) for row in cursor]
+
+
+def fetch_wrangler(local=True, cwd=PROJECT_DIR):
+    return [{col: row.get(col) for col in SNAPSHOT_COLUMNS}
+            for row in query_json(SNAPSHOT_SQL, local, cwd)]
+
+
+def print_stats(stats):
+    print(f"🗂️  {stats['shards']} shards: {stats['written']} written, "
+          f"{stats['unchanged']} unchanged, {stats['removed']} removed")
+    if brotli is None:
+        print("   (brotli module not installed, only .gz variants written)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export static precompressed event snapshots')
+    parser.add_argument('--db', metavar='PATH',
+                        help='read from this SQLite file directly (no wrangler)')
+    parser.add_argument('--direct', action='store_true',
+                        help='read straight from the local D1 SQLite file (auto-detected)')
+    parser.add_argument('--remote', action='store_true',
+                        help='read the remote D1 database instead of --local')
+    parser.add_argument('--out', default=SNAPSHOT_DIR, help='output directory')
+    parser.add_argument('--bucket-years', type=int, default=BUCKET_YEARS)
+    parser.add_argument('--force', action='store_true', help='rewrite every shard')
+    args = parser.parse_args()
+
+    if args.db or args.direct:
+        conn = connect_readonly(args.db)
+        try:
+            events = fetch_sqlite(conn)
+        finally:
+            conn.close()
+    else:
+        events = fetch_wrangler(not args.remote)
+
+    start = time.perf_counter()
+    stats = export(events, args.out, args.bucket_years, args.force)
+    print_stats(stats)
+    print(f"✅ Snapshot of {len(events)} events written to {args.out} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,51 +1,192 @@
 #!/usr/bin/env python3
+"""
+Fix SQL escaping issues in INSERT INTO events statements
+
+Streams the input in fixed-size chunks through a small SQL lexer that
+tracks string-literal state across line and chunk boundaries. Inside an
+INSERT INTO events statement, a single quote that is not followed by
+another quote or by a token that can end a value (`,` `)` `;`) is a stray
+apostrophe and gets doubled. Everything else is copied through unchanged.
+"""
+import argparse
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
-def fix_sql_file(input_file, output_file):
-    """Fix SQL escaping issues in INSERT statements"""
-    
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Split by INSERT statements
-    lines = content.split('\n')
-    fixed_lines = []
-    
-    in_insert = False
-    current_value = []
-    
-    for line in lines:
-        # Keep comments and empty lines as-is
-        if line.strip().startswith('--') or line.strip() == '':
-            fixed_lines.append(line)
-            continue
-            
-        # Keep INSERT header
-        if 'INSERT INTO events' in line:
-            fixed_lines.append(line)
-            in_insert = True
-            continue
-        
-        # Process value lines
-        if in_insert:
-            # For lines within string values, escape single quotes
-            # This is a simple approach: replace ' with '' except in specific contexts
-            fixed_line = line
-            
-            # Don't escape in JSON arrays or at line boundaries
-            # We'll use a more sophisticated approach
-            
-            fixed_lines.append(line)
-    
-    # Write output
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(fixed_lines))
+CHUNK_SIZE = 1024 * 1024
 
-if __name__ == '__main__':
-    if len(sys.argv) != 3:
-        print("Usage: fix_sql_escaping.py <input.sql> <output.sql>")
+CODE, STRING, COMMENT = range(3)
+
+CODE_TOKEN = re.compile(r"['(;-]")
+INSERT_EVENTS = re.compile(r'^\s*INSERT\s+(?:OR\s+\w+\s+)?INTO\s+events\b', re.IGNORECASE)
+VALUE_END = ',);'
+MAX_HEAD = 256
+
+
+class QuoteFixer:
+    """Incremental lexer; feed() chunks in, collect the fixed text out"""
+
+    def __init__(self):
+        self.mode = CODE
+        self.pending = ''
+        self.head = ''
+        self.fixing = None
+        self.fixed_quotes = 0
+
+    def _statement_code(self, text):
+        if self.fixing is None and len(self.head) < MAX_HEAD:
+            self.head += text[:MAX_HEAD - len(self.head)]
+
+    def _decide(self):
+        if self.fixing is None:
+            self.fixing = bool(INSERT_EVENTS.match(self.head))
+
+    def feed(self, chunk, final=False):
+        buf = self.pending + chunk
+        self.pending = ''
+        out = []
+        pos = 0
+        end = len(buf)
+
+        while pos < end:
+            if self.mode == CODE:
+                m = CODE_TOKEN.search(buf, pos)
+                if not m:
+                    self._statement_code(buf[pos:])
+                    out.append(buf[pos:])
+                    pos = end
+                    break
+                i = m.start()
+                self._statement_code(buf[pos:i])
+                token = buf[i]
+                if token == '-':
+                    if i + 1 == end and not final:
+                        out.append(buf[pos:i])
+                        self.pending = buf[i:]
+                        pos = end
+                        break
+                    if buf.startswith('--', i):
+                        self.mode = COMMENT
+                    out.append(buf[pos:i + 1])
+                    if self.mode == CODE:
+                        self._statement_code('-')
+                    pos = i + 1
+                elif token == ';':
+                    out.append(buf[pos:i + 1])
+                    self.head = ''
+                    self.fixing = None
+                    pos = i + 1
+                else:
+                    self._statement_code(token)
+                    self._decide()
+                    if token == "'":
+                        self.mode = STRING
+                    out.append(buf[pos:i + 1])
+                    pos = i + 1
+
+            elif self.mode == COMMENT:
+                i = buf.find('\n', pos)
+                if i < 0:
+                    out.append(buf[pos:])
+                    pos = end
+                    break
+                out.append(buf[pos:i + 1])
+                self.mode = CODE
+                pos = i + 1
+
+            else:
+                i = buf.find("'", pos)
+                if i < 0:
+                    out.append(buf[pos:])
+                    pos = end
+                    break
+                out.append(buf[pos:i])
+                if i + 1 == end and not final:
+                    self.pending = buf[i:]
+                    pos = end
+                    break
+                if i + 1 < end and buf[i + 1] == "'":
+                    out.append("''")
+                    pos = i + 2
+                    continue
+                if not self.fixing:
+                    out.append("'")
+                    self.mode = CODE
+                    pos = i + 1
+                    continue
+                j = i + 1
+                while j < end and buf[j].isspace():
+                    j += 1
+                if j == end and not final:
+                    self.pending = buf[i:]
+                    pos = end
+                    break
+                if j == end or buf[j] in VALUE_END:
+                    out.append("'")
+                    self.mode = CODE
+                else:
+                    out.append("''")
+                    self.fixed_quotes += 1
+                pos = i + 1
+
+        return ''.join(out)
+
+    def finish(self):
+        return self.feed('', final=True)
+
+
+def fix_sql_file(input_file, output_file, chunk_size=CHUNK_SIZE):
+    """Fix SQL escaping issues in INSERT statements; returns quotes fixed"""
+    fixer = QuoteFixer()
+    with open(input_file, 'r', encoding='utf-8', newline='') as src, \
+            open(output_file, 'w', encoding='utf-8', newline='') as dst:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            dst.write(fixer.feed(chunk))
+        dst.write(fixer.finish())
+    return fixer.fixed_quotes
+
+
+def _fix_job(paths):
+    input_file, output_file = paths
+    return input_file, output_file, fix_sql_file(input_file, output_file)
+
+
+def fix_sql_files(jobs, workers=None):
+    """Fix several (input, output) pairs in parallel processes"""
+    if len(jobs) == 1:
+        yield _fix_job(jobs[0])
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_fix_job, jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage='%(prog)s <input.sql> <output.sql>\n'
+              '       %(prog)s --suffix SUFFIX [--jobs N] <input.sql> [<input.sql> ...]'
+    )
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--suffix',
+                        help='fix every input file, writing <name><suffix>.sql next to it')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help='parallel worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    if args.suffix:
+        jobs = [(f, os.path.splitext(f)[0] + args.suffix + '.sql') for f in args.files]
+    elif len(args.files) == 2:
+        jobs = [tuple(args.files)]
+    else:
+        parser.print_usage()
         sys.exit(1)
-    
-    fix_sql_file(sys.argv[1], sys.argv[2])
-    print(f"Fixed: {sys.argv[1]} -> {sys.argv[2]}")
+
+    for input_file, output_file, fixed in fix_sql_files(jobs, args.jobs):
+        print(f"Fixed: {input_file} -> {output_file} ({fixed} quotes escaped)")
+
+
+if __name__ == '__main__':
+    main()
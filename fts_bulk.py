@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Deferred FTS5 maintenance for bulk loads
+
+The *_ai / *_au triggers from the migrations write every inserted or
+updated row into the FTS index one at a time. For large loads the
+triggers are dropped for the duration of the load, the index is rebuilt
+once from the content table and optimized, the triggers are restored and
+the table is re-analyzed. All of it runs inside the caller's transaction,
+so a failed load leaves the original triggers in place.
+"""
+import argparse
+import time
+from contextlib import contextmanager
+
+from load_metrics import metrics
+from local_db import connect_local
+
+FTS_TABLES = {
+    'events': 'events_fts',
+    'documents': 'documents_fts',
+}
+
+DEFERRED_TRIGGERS = ('ai', 'au')
+
+
+def _trigger_sql(conn, table):
+    names = [f'{table}_{suffix}' for suffix in DEFERRED_TRIGGERS]
+    placeholders = ', '.join('?' for _ in names)
+    return conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+        names,
+    ).fetchall()
+
+
+def _timed(timings, phase, conn, *statements):
+    start = time.perf_counter()
+    for sql in statements:
+        conn.execute(sql)
+    elapsed = time.perf_counter() - start
+    timings[phase] = timings.get(phase, 0.0) + elapsed
+    metrics.add_time(phase, elapsed)
+
+
+def rebuild_fts(conn, table, timings):
+    """Rebuild and optimize the FTS index of `table`, then ANALYZE it"""
+    fts = FTS_TABLES[table]
+    _timed(timings, 'fts_rebuild', conn, f"INSERT INTO {fts}({fts}) VALUES('rebuild')")
+    _timed(timings, 'fts_optimize', conn, f"INSERT INTO {fts}({fts}) VALUES('optimize')")
+
+
+@contextmanager
+def deferred_fts(conn, table, timings=None):
+    """Suspend the FTS triggers of `table` while the body bulk-loads it
+
+    `timings` collects seconds per phase: suspend_triggers, load,
+    fts_rebuild, fts_optimize, restore_triggers and analyze.
+    """
+    if table not in FTS_TABLES:
+        raise ValueError(f"No FTS index registered for table {table!r}")
+    timings = {} if timings is None else timings
+    triggers = _trigger_sql(conn, table)
+    _timed(timings, 'suspend_triggers', conn, *(f'DROP TRIGGER {name}' for name, _ in triggers))
+
+    start = time.perf_counter()
+    try:
+        yield timings
+    except BaseException:
+        for _, sql in triggers:
+            conn.execute(sql)
+        raise
+    timings['load'] = timings.get('load', 0.0) + time.perf_counter() - start
+
+    rebuild_fts(conn, table, timings)
+    _timed(timings, 'restore_triggers', conn, *(sql for _, sql in triggers))
+    _timed(timings, 'analyze', conn, f'ANALYZE {table}')
+
+
+def print_timings(timings):
+    """Print one line per phase"""
+    for phase, seconds in timings.items():
+        print(f"   ⏱️  {phase:<17} {seconds * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild and optimize FTS5 indexes of the local D1 database')
+    parser.add_argument('tables', nargs='*', default=list(FTS_TABLES), choices=list(FTS_TABLES))
+    parser.add_argument('--db', metavar='PATH',
+                        help='SQLite file (default: auto-detect under .wrangler/state)')
+    args = parser.parse_args()
+
+    conn = connect_local(args.db)
+    try:
+        for table in args.tables:
+            timings = {}
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                rebuild_fts(conn, table, timings)
+                _timed(timings, 'analyze', conn, f'ANALYZE {table}')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            print(f"🔎 {FTS_TABLES[table]} rebuilt")
+            print_timings(timings)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for scale-testing the schema
+
+Fills users, documents, events, chats, chat_members, messages,
+message_reactions, notifications, push_subscriptions and the event_*
+tables of a SQLite database built from migrations/, with:
+
+- events clustered around CLUSTER_COUNT hotspots (Gaussian spread)
+- German-looking text of realistic length in full_description
+- power-law chat sizes and per-chat message rates
+- foreign keys that always point at existing rows: message senders are
+  members of their chat, comments/bookmarks/views reference real events
+  and users
+
+Everything derives from --seed: every (table, id range) chunk seeds its
+own generator, so output is identical regardless of --jobs. Chunks are
+generated in a process pool and streamed, in order, into executemany on
+one writer connection (one transaction per table, FTS triggers
+suspended while events and documents load). Events get their geohash
+and tile_key up front; derived tables (clusters, rollups, journals,
+archive index) and the event counters are left to their own jobs; only
+materialized stats that were built before are recounted with the events.
+
+Usage:
+    python3 generate_data.py --db /tmp/scale.sqlite --events 1000000 --users 100000 \\
+        --messages 50000000 --jobs 8
+"""
+import argparse
+import bisect
+import math
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+from contextlib import ExitStack
+from functools import lru_cache
+
+from fts_bulk import FTS_TABLES, deferred_fts
+from local_db import LOAD_PRAGMAS, create_database
+from materialized_stats import refresh_sqlite as refresh_stats_sqlite
+from spatial_index import SPATIAL_COLUMNS, spatial_keys
+
+CHUNK_ROWS = 20_000
+CLUSTER_COUNT = 60
+BASE_TIME = 1_600_000_000  # 2020-09-13, start of generated activity
+SPAN_SECONDS = 5 * 365 * 86400
+
+EVENT_TYPES = ('ancient', 'ufo', 'conspiracy', 'mystery', 'phenomenon', 'cryptid',
+               'paranormal', 'signal')
+EVIDENCE_LEVELS = ('speculative', 'documented', 'proven', 'military')
+CATEGORIES = ('Alte Zivilisationen', 'UFOs & Aliens', 'Mystische Orte', 'Geheimdienste',
+              'Kryptozoologie', 'Alternative Theorien', 'Alte Astronauten')
+REACTIONS = ('👍', '❤️', '😂', '😮', '🤔', '👽')
+NOTIFICATION_TYPES = ('message', 'event_comment', 'mention', 'system')
+
+WORDS = (
+    'der die das und ist nicht mit von auf für eine einem einer sich auch als noch wie '
+    'Pyramide Tempel Stein Zivilisation Legende Rätsel Himmel Licht Objekt Zeuge Bericht '
+    'Forscher Expedition Ruine Kammer Tunnel Symbol Sterne Energie Signal Regierung '
+    'Geheimnis Beweis Theorie Quelle Archiv Nacht Berg Wüste Meer Insel Stadt Jahrhundert '
+    'uralt mysteriös unerklärlich gewaltig präzise verborgen seltsam leuchtend unbekannt '
+    'entdeckten berichteten zeigt beweist vermuten erklärt bleibt verschwand erschien '
+    'wurde wurden haben hatte könnte soll nach über unter zwischen während seit bereits '
+    'heute damals später jedoch außerdem trotzdem deshalb angeblich tatsächlich'
+).split()
+
+TABLE_ORDER = ('users', 'documents', 'events', 'chats', 'chat_members', 'messages',
+               'message_reactions', 'event_comments', 'event_comment_votes', 'event_bookmarks',
+               'event_views', 'notifications', 'push_subscriptions')
+
+COLUMNS = {
+    'users': ('id', 'username', 'email', 'password_hash', 'display_name', 'bio', 'interests',
+              'is_verified', 'status', 'last_seen', 'created_at', 'role'),
+    'documents': ('id', 'title', 'author', 'category', 'description', 'file_path', 'tags',
+                  'created_at'),
+    'events': ('id', 'title', 'description', 'latitude', 'longitude', 'category', 'event_type',
+               'year', 'date_text', 'icon_type', 'full_description', 'sources', 'keywords',
+               'evidence_level', 'created_at') + SPATIAL_COLUMNS,
+    'chats': ('id', 'chat_type', 'title', 'description', 'creator_id', 'is_public',
+              'member_count', 'created_at'),
+    'chat_members': ('chat_id', 'user_id', 'role', 'is_muted', 'joined_at'),
+    'messages': ('id', 'chat_id', 'sender_id', 'message_type', 'content', 'created_at'),
+    'message_reactions': ('message_id', 'user_id', 'reaction', 'created_at'),
+    'event_comments': ('id', 'event_id', 'user_id', 'content', 'upvotes', 'downvotes',
+                       'created_at'),
+    'event_comment_votes': ('comment_id', 'user_id', 'vote_type', 'created_at'),
+    'event_bookmarks': ('event_id', 'user_id', 'created_at'),
+    'event_views': ('event_id', 'user_id', 'view_duration', 'created_at'),
+    'notifications': ('user_id', 'notification_type', 'title', 'body', 'related_entity_type',
+                      'related_entity_id', 'is_read', 'is_sent', 'created_at'),
+    'push_subscriptions': ('user_id', 'endpoint', 'auth_key', 'p256dh_key', 'device_type',
+                           'is_active', 'created_at'),
+}
+
+# Tables whose rows are keyed by a parent (one chunk = a range of parents)
+PER_PARENT = {'chat_members': 'chats'}
+
+# Tables with UNIQUE constraints over random pairs: duplicates are skipped
+OR_IGNORE = {'message_reactions', 'event_comment_votes', 'event_bookmarks', 'push_subscriptions'}
+
+
+def _rng(seed, table, key):
+    return random.Random(f"{seed}:{table}:{key}")
+
+
+def _timestamp(rng, start=BASE_TIME):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(start + rng.randrange(SPAN_SECONDS)))
+
+
+def _sentence(rng, low=6, high=14):
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return words[0].capitalize() + ' ' + ' '.join(words[1:]) + '.'
+
+
+def german_text(rng, mean_chars):
+    """Paragraphs of pseudo-German sentences, length log-normal around mean_chars"""
+    target = int(rng.lognormvariate(math.log(mean_chars), 0.5))
+    parts = []
+    size = 0
+    while size < target:
+        paragraph = ' '.join(_sentence(rng) for _ in range(rng.randint(3, 6)))
+        parts.append(paragraph)
+        size += len(paragraph) + 2
+    return '\n\n'.join(parts)
+
+
+def _pareto(rng, alpha, low, high):
+    return min(high, int(low * rng.paretovariate(alpha)))
+
+
+@lru_cache(maxsize=1)
+def _clusters(seed):
+    rng = _rng(seed, 'clusters', 0)
+    return [(rng.uniform(-60, 70), rng.uniform(-170, 170), rng.uniform(0.5, 8.0))
+            for _ in range(CLUSTER_COUNT)]
+
+
+@lru_cache(maxsize=4096)
+def chat_members(seed, chat_id, users):
+    """Member ids of a chat; the creator is always the first member"""
+    rng = _rng(seed, 'members', chat_id)
+    # Two in five chats are private; group and channel sizes follow a power law
+    size = min(2 if chat_id % 5 < 2 else _pareto(rng, 1.2, 3, 5000), users)
+    return tuple(rng.sample(range(1, users + 1), size))
+
+
+@lru_cache(maxsize=1)
+def _chat_activity(seed, chats):
+    """Cumulative power-law message weights per chat"""
+    rng = _rng(seed, 'activity', 0)
+    cumulative = []
+    total = 0.0
+    for _ in range(chats):
+        total += rng.paretovariate(1.1)
+        cumulative.append(total)
+    return cumulative
+
+
+def _pick_chat(rng, cumulative):
+    return bisect.bisect_left(cumulative, rng.random() * cumulative[-1]) + 1
+
+
+def _popular_id(rng, count):
+    """Id in 1..count skewed towards low (older, more popular) ids"""
+    return 1 + int(count * rng.random() ** 3)
+
+
+def generate(table, start, end, cfg):
+    """Rows for ids start..end-1 (or parents start..end-1) of `table`"""
+    seed = cfg['seed']
+    rng = _rng(seed, table, start)
+    rows = []
+    users = cfg['users']
+    if table == 'users':
+        for i in range(start, end):
+            rows.append((i, f'nutzer{i}', f'nutzer{i}@example.org', 'pbkdf2$synthetic$' + format(i, 'x'),
+                         f'Nutzer {i}', _sentence(rng), '["Mysterien", "Geschichte"]',
+                         int(rng.random() < 0.1), rng.choice(('online', 'offline', 'away')),
+                         _timestamp(rng), _timestamp(rng), 'admin' if i == 1 else 'user'))
+    elif table == 'documents':
+        for i in range(start, end):
+            rows.append((i, _sentence(rng, 3, 7).rstrip('.'), f'Autor {rng.randrange(500)}',
+                         rng.choice(CATEGORIES), german_text(rng, 300), f'/docs/{i}.pdf',
+                         '["synthetisch"]', _timestamp(rng)))
+    elif table == 'events':
+        clusters = _clusters(seed)
+        coords = []
+        for _ in range(start, end):
+            lat0, lon0, spread = rng.choice(clusters)
+            coords.append((round(max(-89.9, min(89.9, rng.gauss(lat0, spread))), 5),
+                           round((rng.gauss(lon0, spread) + 180) % 360 - 180, 5)))
+        for i, (lat, lon), keys in zip(range(start, end), coords, spatial_keys(coords)):
+            year = rng.randrange(-12000, 2026)
+            keywords = rng.sample(WORDS[20:], 5)
+            rows.append((i, _sentence(rng, 2, 5).rstrip('.'), _sentence(rng), lat,
+                         lon, rng.choice(CATEGORIES), rng.choice(EVENT_TYPES), year,
+                         f'{-year} v.Chr.' if year < 0 else str(year), 'marker',
+                         german_text(rng, 1200),
+                         f'[{{"title": "Quelle {i}", "year": {rng.randrange(1800, 2025)}}}]',
+                         '[' + ', '.join(f'"{k}"' for k in keywords) + ']',
+                         rng.choice(EVIDENCE_LEVELS), _timestamp(rng)) + keys)
+    elif table == 'chats':
+        for i in range(start, end):
+            members = chat_members(seed, i, users)
+            kind = 'private' if i % 5 < 2 else rng.choice(('group', 'channel'))
+            rows.append((i, kind, None if kind == 'private' else _sentence(rng, 2, 4).rstrip('.'),
+                         None, members[0], int(kind == 'channel'), len(members), _timestamp(rng)))
+    elif table == 'chat_members':
+        for chat_id in range(start, end):
+            for n, user_id in enumerate(chat_members(seed, chat_id, users)):
+                rows.append((chat_id, user_id, 'admin' if n == 0 else 'member',
+                             int(rng.random() < 0.15), _timestamp(rng)))
+    elif table == 'messages':
+        activity = _chat_activity(seed, cfg['chats'])
+        for i in range(start, end):
+            chat_id = _pick_chat(rng, activity)
+            sender = rng.choice(chat_members(seed, chat_id, users))
+            rows.append((i, chat_id, sender, 'text', _sentence(rng, 2, 18),
+                         _timestamp(rng, BASE_TIME + (i * SPAN_SECONDS) // max(cfg['messages'], 1)
+                                    - SPAN_SECONDS // 2)))
+    elif table == 'message_reactions':
+        for _ in range(start, end):
+            rows.append((rng.randint(1, cfg['messages']), rng.randint(1, users),
+                         rng.choice(REACTIONS), _timestamp(rng)))
+    elif table == 'event_comments':
+        for i in range(start, end):
+            rows.append((i, _popular_id(rng, cfg['events']), rng.randint(1, users),
+                         _sentence(rng, 4, 30), rng.randrange(20), rng.randrange(5), _timestamp(rng)))
+    elif table == 'event_comment_votes':
+        for _ in range(start, end):
+            rows.append((rng.randint(1, cfg['event_comments']), rng.randint(1, users),
+                         rng.choice(('upvote', 'upvote', 'downvote')), _timestamp(rng)))
+    elif table == 'event_bookmarks':
+        for _ in range(start, end):
+            rows.append((_popular_id(rng, cfg['events']), rng.randint(1, users), _timestamp(rng)))
+    elif table == 'event_views':
+        for _ in range(start, end):
+            rows.append((_popular_id(rng, cfg['events']),
+                         rng.randint(1, users) if rng.random() < 0.6 else None,
+                         rng.randrange(5, 600), _timestamp(rng)))
+    elif table == 'notifications':
+        for _ in range(start, end):
+            kind = rng.choice(NOTIFICATION_TYPES)
+            rows.append((rng.randint(1, users), kind, _sentence(rng, 2, 5), _sentence(rng),
+                         'message' if kind == 'message' else 'event',
+                         rng.randint(1, cfg['messages'] if kind == 'message' else cfg['events']),
+                         int(rng.random() < 0.7), 1, _timestamp(rng)))
+    elif table == 'push_subscriptions':
+        for _ in range(start, end):
+            user_id = rng.randint(1, users)
+            rows.append((user_id, f'https://push.example.org/{user_id}/{rng.getrandbits(48):x}',
+                         format(rng.getrandbits(64), 'x'), format(rng.getrandbits(128), 'x'),
+                         rng.choice(('web', 'mobile')), 1, _timestamp(rng)))
+    return rows
+
+
+def _generate_chunk(args):
+    return generate(*args)
+
+
+def plan(cfg, chunk_rows=CHUNK_ROWS):
+    """(table, [(start, end), ...]) in foreign-key order"""
+    for table in TABLE_ORDER:
+        count = cfg[PER_PARENT.get(table, table)]
+        if not count:
+            continue
+        step = chunk_rows if table not in PER_PARENT else max(1, chunk_rows // 50)
+        yield table, [(start, min(start + step, count + 1)) for start in range(1, count + 1, step)]
+
+
+def scale_config(args):
+    cfg = {
+        'seed': args.seed,
+        'users': args.users,
+        'documents': args.documents,
+        'events': args.events,
+        'chats': args.chats,
+        'messages': args.messages,
+    }
+    cfg['chat_members'] = cfg['chats']
+    cfg['message_reactions'] = cfg['messages'] // 10
+    cfg['event_comments'] = cfg['events'] * 2
+    cfg['event_comment_votes'] = cfg['event_comments'] * 2
+    cfg['event_bookmarks'] = cfg['events']
+    cfg['event_views'] = cfg['events'] * 10
+    cfg['notifications'] = cfg['messages'] // 2
+    cfg['push_subscriptions'] = cfg['users'] // 2
+    if not cfg['users'] and any(cfg[t] for t in TABLE_ORDER if t not in ('users', 'documents', 'events')):
+        raise ValueError('--users must be positive when chats, messages or interactions are generated')
+    if cfg['messages'] and not cfg['chats']:
+        raise ValueError('--chats must be positive when --messages is')
+    return cfg
+
+
+def write(conn, cfg, jobs=None, chunk_rows=CHUNK_ROWS):
+    """Generate and insert every table; returns {table: (rows, seconds)}"""
+    stats = {}
+    with multiprocessing.get_context('spawn').Pool(jobs) as pool:
+        for table, ranges in plan(cfg, chunk_rows):
+            columns = COLUMNS[table]
+            verb = 'INSERT OR IGNORE' if table in OR_IGNORE else 'INSERT'
+            sql = f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+            chunks = pool.imap(_generate_chunk, [(table, a, b, cfg) for a, b in ranges])
+            start = time.perf_counter()
+            rows = 0
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                with ExitStack() as stack:
+                    if table in FTS_TABLES:
+                        stack.enter_context(deferred_fts(conn, table))
+                    for chunk in chunks:
+                        # rowcount leaves out rows skipped by OR IGNORE
+                        rows += conn.executemany(sql, chunk).rowcount
+                if table == 'events':
+                    refresh_stats_sqlite(conn, in_transaction=True)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            elapsed = time.perf_counter() - start
+            stats[table] = (rows, elapsed)
+            print(f"🧪 {table:<20} {rows:>11} rows in {elapsed:7.2f}s "
+                  f"({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic data for scale tests')
+    parser.add_argument('--db', required=True, metavar='PATH',
+                        help='target SQLite file (created from migrations if missing)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--documents', type=int, default=1_000)
+    parser.add_argument('--events', type=int, default=10_000)
+    parser.add_argument('--chats', type=int, default=2_000)
+    parser.add_argument('--messages', type=int, default=200_000)
+    parser.add_argument('--jobs', type=int, help='generator processes (default: CPU count)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    cfg = scale_config(args)
+    if not os.path.exists(args.db):
+        create_database(args.db)
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    for pragma in LOAD_PRAGMAS:
+        conn.execute(pragma)
+    try:
+        if conn.execute('SELECT 1 FROM users LIMIT 1').fetchone():
+            raise SystemExit(f"❌ {args.db} already has users; generate into a fresh database")
+        start = time.perf_counter()
+        stats = write(conn, cfg, args.jobs, args.chunk_rows)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+    rows = sum(count for count, _ in stats.values())
+    print(f"\n✅ {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s, seed {args.seed})")
+
+
+if __name__ == '__main__':
+    main()
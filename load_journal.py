@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Batch journal for resumable loads
+
+Every committed batch is recorded with its index, id range, content hash
+and commit time. A restarted load skips batches whose journal entry has a
+matching hash and retries only the rows that failed last time.
+
+Two backends share one interface:
+- FileJournal: NDJSON sidecar file, for wrangler batches
+- TableJournal: the sync_journal table (migrations/0011), written in the
+  same transaction as the batch it describes
+
+Concurrent loads are kept out with an exclusive flock on a lock file;
+take it with load_lock(journal.lock_path) before calling journal.open().
+"""
+import fcntl
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+def batch_hash(parts):
+    """Hash the rendered rows (strings) of one batch"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def make_entry(index, digest, ids, failed_ids):
+    return {
+        'batch_index': index,
+        'batch_hash': digest,
+        'first_id': min(ids) if ids else None,
+        'last_id': max(ids) if ids else None,
+        'row_count': len(ids),
+        'failed_ids': sorted(failed_ids),
+        'committed_at': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime()),
+    }
+
+
+def pending_rows(entry, digest, batch, key):
+    """Rows of `batch` that still need loading given its journal entry
+
+    Returns the whole batch when there is no entry or the batch changed,
+    only the previously failed rows when the hash matches.
+    """
+    if entry is None or entry['batch_hash'] != digest:
+        return batch
+    failed = set(entry['failed_ids'])
+    return [item for item in batch if key(item) in failed]
+
+
+@contextmanager
+def load_lock(path):
+    """Hold an exclusive lock on `path` for the duration of a load"""
+    with open(path, 'a') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RuntimeError(f"Another load is already running (lock held on {path})") from None
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class FileJournal:
+    """Append-only NDJSON journal; the last entry per batch index wins"""
+
+    # Entries are appended after the batch committed, not inside it
+    transactional = False
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.entries = {}
+
+    def open(self, restart=False):
+        """Read existing entries, or discard them with restart=True"""
+        path = self.path
+        if restart and os.path.exists(path):
+            os.unlink(path)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry['batch_index']] = entry
+
+    def lookup(self, index):
+        return self.entries.get(index)
+
+    def record(self, entry):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[entry['batch_index']] = entry
+
+
+class TableJournal:
+    """Journal rows in sync_journal, one set per named run"""
+
+    transactional = True
+
+    def __init__(self, conn, run):
+        self.conn = conn
+        self.run = run
+        path = conn.execute('PRAGMA database_list').fetchone()[2]
+        self.lock_path = (path or os.path.join(os.getcwd(), 'memory')) + '.load.lock'
+        self.entries = {}
+
+    def open(self, restart=False):
+        """Read this run's entries, or delete them with restart=True"""
+        if restart:
+            self.conn.execute('DELETE FROM sync_journal WHERE run = ?', (self.run,))
+        rows = self.conn.execute(
+            'SELECT batch_index, batch_hash, first_id, last_id, row_count, failed_ids, committed_at '
+            'FROM sync_journal WHERE run = ?', (self.run,)
+        )
+        for index, digest, first_id, last_id, count, failed_ids, committed_at in rows:
+            self.entries[index] = {
+                'batch_index': index, 'batch_hash': digest, 'first_id': first_id,
+                'last_id': last_id, 'row_count': count,
+                'failed_ids': json.loads(failed_ids or '[]'), 'committed_at': committed_at,
+            }
+
+    def lookup(self, index):
+        return self.entries.get(index)
+
+    def record(self, entry):
+        """Insert the entry; call inside the batch's own transaction"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO sync_journal '
+            '(run, batch_index, batch_hash, first_id, last_id, row_count, failed_ids, committed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (self.run, entry['batch_index'], entry['batch_hash'], entry['first_id'],
+             entry['last_id'], entry['row_count'], json.dumps(entry['failed_ids']),
+             entry['committed_at']),
+        )
+        self.entries[entry['batch_index']] = entry
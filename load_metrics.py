@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing and counters for the event loaders
+
+A single module-level `metrics` registry is shared by the loader modules.
+It is disabled by default, and then every hook is a no-op. Stages nest:
+json_serialize time is also counted in the sql_render or db_execute stage
+that triggered it.
+
+Stages:
+    record_build    parsing corpus lines into EventRecords
+    json_serialize  turning sources/keywords back into JSON text
+    sql_render      rendering VALUES tuples for wrangler batches
+    subprocess      wrangler process runtime (spawn + execution)
+    db_execute      executemany against SQLite, including trigger work
+                    unless the FTS triggers are deferred
+    suspend_triggers, fts_rebuild, fts_optimize, restore_triggers, analyze
+                    deferred FTS maintenance phases (see fts_bulk)
+    cluster_pyramid rebuilding event_clusters after a sync
+    related_score   scoring candidate neighbours for related_events
+    related_events  the whole related_events recompute including the write
+"""
+import cProfile
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+METRIC_PREFIX = 'weltenbibliothek_load'
+
+_NULL = nullcontext()
+
+
+class Metrics:
+    """Accumulates seconds and call counts per stage plus per-batch sizes"""
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.stages = {}
+        self.batches = []
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def stage(self, name):
+        """Context manager timing one pass through a stage"""
+        if not self.enabled:
+            return _NULL
+        return self._timed(name)
+
+    def add_time(self, name, seconds, calls=1):
+        if not self.enabled:
+            return
+        total, count = self.stages.get(name, (0.0, 0))
+        self.stages[name] = (total + seconds, count + calls)
+
+    def batch(self, rows, size_bytes, seconds, target):
+        """Record one written batch; size_bytes is None when no SQL text was built"""
+        if self.enabled:
+            self.batches.append({'rows': rows, 'bytes': size_bytes,
+                                 'seconds': seconds, 'target': target})
+
+    def records(self):
+        """All metrics as a list of dicts, one per stage and batch"""
+        out = [{'type': 'stage', 'stage': name, 'seconds': round(total, 6), 'calls': calls}
+               for name, (total, calls) in sorted(self.stages.items())]
+        out.extend({'type': 'batch', **b} for b in self.batches)
+        out.append({
+            'type': 'run',
+            'started': self.started,
+            'seconds': round(time.time() - self.started, 6),
+            'rows': sum(b['rows'] for b in self.batches),
+            'bytes': sum(b['bytes'] or 0 for b in self.batches),
+            'batches': len(self.batches),
+        })
+        return out
+
+    def to_ndjson(self):
+        return ''.join(json.dumps(record) + '\n' for record in self.records())
+
+    def to_prometheus(self):
+        lines = [
+            f'# HELP {METRIC_PREFIX}_stage_seconds_total Time spent per loader stage.',
+            f'# TYPE {METRIC_PREFIX}_stage_seconds_total counter',
+        ]
+        for name, (total, _) in sorted(self.stages.items()):
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_total{{stage="{name}"}} {total:.6f}')
+        lines += [
+            f'# HELP {METRIC_PREFIX}_stage_calls_total Passes through each loader stage.',
+            f'# TYPE {METRIC_PREFIX}_stage_calls_total counter',
+        ]
+        for name, (_, calls) in sorted(self.stages.items()):
+            lines.append(f'{METRIC_PREFIX}_stage_calls_total{{stage="{name}"}} {calls}')
+        run = self.records()[-1]
+        for key in ('rows', 'bytes', 'batches'):
+            lines += [
+                f'# TYPE {METRIC_PREFIX}_{key}_total counter',
+                f'{METRIC_PREFIX}_{key}_total {run[key]}',
+            ]
+        lines += [
+            f'# TYPE {METRIC_PREFIX}_last_run_seconds gauge',
+            f'{METRIC_PREFIX}_last_run_seconds {run["seconds"]}',
+            f'# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge',
+            f'{METRIC_PREFIX}_last_run_timestamp_seconds {int(self.started)}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, fmt='ndjson'):
+        """Write NDJSON (appending) or a Prometheus textfile (replacing)"""
+        if fmt == 'prom':
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+        else:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(self.to_ndjson())
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def profiled(path):
+    """Run the body under cProfile and dump stats to `path` (no-op if None)"""
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"🔬 Profile written to {path}")
+
+
+def add_metrics_arguments(parser):
+    """Register the instrumentation command line options"""
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='write per-stage timings and batch counters to FILE')
+    parser.add_argument('--metrics-format', choices=('ndjson', 'prom'), default='ndjson',
+                        help='NDJSON lines (appended) or a Prometheus textfile')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='run under cProfile and write the stats to FILE')
+
+
+@contextmanager
+def instrumented(args):
+    """Enable metrics/profiling for one run according to parsed arguments"""
+    metrics.enabled = bool(args.metrics)
+    metrics.reset()
+    with profiled(args.profile):
+        try:
+            yield metrics
+        finally:
+            if args.metrics:
+                metrics.write(args.metrics, args.metrics_format)
+                print(f"📈 Metrics written to {args.metrics}")
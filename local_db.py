@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Direct access to the local D1 database
+
+For --local runs wrangler keeps the D1 database as a plain SQLite file
+under .wrangler/state; these helpers find it and open it for bulk work.
+"""
+import glob
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+PROJECT_DIR = '/home/user/webapp'
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Connection-level settings for a bulk load; none of them persist in the file
+LOAD_PRAGMAS = (
+    'PRAGMA synchronous = OFF',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+    'PRAGMA locking_mode = EXCLUSIVE',
+)
+
+
+def find_local_database(cwd=PROJECT_DIR):
+    """Locate the miniflare SQLite file that backs the local D1 database
+
+    Picks the most recently modified state file that has an events table.
+    """
+    pattern = os.path.join(cwd, '.wrangler', 'state', '**', '*.sqlite')
+    candidates = sorted(glob.glob(pattern, recursive=True), key=os.path.getmtime, reverse=True)
+    for path in candidates:
+        if os.path.basename(path) == 'metadata.sqlite':
+            continue
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            found = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events'"
+            ).fetchone()
+        finally:
+            conn.close()
+        if found:
+            return path
+    raise FileNotFoundError(f"No local D1 database with an events table under {cwd}/.wrangler/state")
+
+
+def migration_files():
+    return sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '*.sql')))
+
+
+def create_database(path):
+    """Create an empty database with all migrations applied"""
+    conn = sqlite3.connect(path)
+    try:
+        for migration in migration_files():
+            with open(migration, encoding='utf-8') as f:
+                conn.executescript(f.read())
+    finally:
+        conn.close()
+
+
+def connect_local(db_path=None, cwd=PROJECT_DIR):
+    """Open the local D1 database in autocommit mode with load pragmas applied"""
+    conn = sqlite3.connect(db_path or find_local_database(cwd), isolation_level=None)
+    for pragma in LOAD_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def connect_shared(db_path=None, cwd=PROJECT_DIR, timeout=30.0):
+    """Open the local D1 database in autocommit mode for work next to other writers
+
+    Unlike connect_local no load pragmas are applied: commits are durable
+    and the file is only locked while a transaction runs. A lock held by
+    wrangler or another tool is waited for up to `timeout` seconds.
+    """
+    return sqlite3.connect(db_path or find_local_database(cwd), timeout=timeout, isolation_level=None)
+
+
+def connect_readonly(db_path=None, cwd=PROJECT_DIR):
+    """Open the local D1 database read-only in autocommit mode
+
+    Default locking: every statement reads in its own short snapshot, so
+    wrangler and other writers are only blocked while a query runs.
+    """
+    path = os.path.abspath(db_path or find_local_database(cwd))
+    return sqlite3.connect(f'file:{pathname2url(path)}?mode=ro', uri=True, isolation_level=None)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Roll up event_views, prune old raw views and recompute event counters
+
+Three set-based steps, each a handful of SQL statements:
+
+1. Rollup: raw event_views rows above the watermark and from completed
+   days are aggregated into event_view_daily (migrations/0015) with one
+   INSERT ... SELECT ... GROUP BY, and the watermark moves past them.
+2. Retention: rolled-up raw rows older than --retention-days are deleted
+   in batches of --batch-rows, each batch its own short transaction.
+3. Counters: view_count, comment_count and bookmark_count are recomputed
+   for all events with one UPDATE ... FROM over aggregate subqueries;
+   only rows whose values differ are written.
+
+Views served before the Worker logged raw rows only exist in view_count,
+so by default view_count is never lowered; --exact-views sets it to the
+logged total.
+"""
+import argparse
+import time
+
+from event_loader import PROJECT_DIR, execute_sql_file, query_json
+from local_db import connect_shared
+
+JOB = 'event_views_rollup'
+RETENTION_DAYS = 90
+PRUNE_BATCH_ROWS = 5000
+
+WATERMARK = f"(SELECT last_id FROM maintenance_watermarks WHERE job = '{JOB}')"
+
+OPEN_SQL = (
+    f"INSERT OR IGNORE INTO maintenance_watermarks (job, last_id) VALUES ('{JOB}', 0)",
+    # Only completed (UTC) days, so a day's unique_users is counted in one pass
+    "UPDATE maintenance_watermarks SET next_id = COALESCE(("
+    "  SELECT MAX(id) FROM event_views"
+    "  WHERE id > maintenance_watermarks.last_id AND created_at < date('now')"
+    f"), last_id) WHERE job = '{JOB}'",
+)
+
+PENDING_SQL = (
+    f"SELECT COUNT(*) AS n FROM event_views v JOIN maintenance_watermarks w ON w.job = '{JOB}' "
+    "WHERE v.id > w.last_id AND v.id <= w.next_id"
+)
+
+ROLLUP_SQL = f"""
+INSERT INTO event_view_daily (event_id, day, views, unique_users, total_duration)
+SELECT v.event_id, date(v.created_at), COUNT(*), COUNT(DISTINCT v.user_id),
+       COALESCE(SUM(v.view_duration), 0)
+FROM event_views v
+JOIN maintenance_watermarks w ON w.job = '{JOB}'
+WHERE v.id > w.last_id AND v.id <= w.next_id
+GROUP BY v.event_id, date(v.created_at)
+ON CONFLICT(event_id, day) DO UPDATE SET
+  views = views + excluded.views,
+  unique_users = unique_users + excluded.unique_users,
+  total_duration = total_duration + excluded.total_duration
+"""
+
+CLOSE_SQL = (
+    "UPDATE maintenance_watermarks SET last_id = next_id, next_id = NULL, "
+    f"updated_at = CURRENT_TIMESTAMP WHERE job = '{JOB}'"
+)
+
+
+def prune_sql(retention_days, batch_rows):
+    return (
+        "DELETE FROM event_views WHERE id IN ("
+        f"SELECT id FROM event_views WHERE id <= COALESCE({WATERMARK}, 0) "
+        f"AND created_at < datetime('now', '-{int(retention_days)} days') "
+        f"ORDER BY id LIMIT {int(batch_rows)})"
+    )
+
+
+def prunable_sql(retention_days):
+    return (
+        f"SELECT COUNT(*) AS n FROM event_views WHERE id <= COALESCE({WATERMARK}, 0) "
+        f"AND created_at < datetime('now', '-{int(retention_days)} days')"
+    )
+
+
+def counters_sql(exact_views=False):
+    logged = 'COALESCE(d.n, 0) + COALESCE(r.n, 0)'
+    views = logged if exact_views else f'MAX(COALESCE(e.view_count, 0), {logged})'
+    return f"""
+UPDATE events
+SET view_count = c.views, comment_count = c.comments, bookmark_count = c.bookmarks
+FROM (
+  SELECT e.id, {views} AS views, COALESCE(cm.n, 0) AS comments, COALESCE(b.n, 0) AS bookmarks
+  FROM events e
+  LEFT JOIN (SELECT event_id, SUM(views) AS n FROM event_view_daily GROUP BY event_id) d
+    ON d.event_id = e.id
+  LEFT JOIN (SELECT event_id, COUNT(*) AS n FROM event_views
+             WHERE id > COALESCE({WATERMARK}, 0) GROUP BY event_id) r
+    ON r.event_id = e.id
+  LEFT JOIN (SELECT event_id, COUNT(*) AS n FROM event_comments
+             WHERE is_deleted = 0 GROUP BY event_id) cm
+    ON cm.event_id = e.id
+  LEFT JOIN (SELECT event_id, COUNT(*) AS n FROM event_bookmarks GROUP BY event_id) b
+    ON b.event_id = e.id
+) AS c
+WHERE events.id = c.id
+  AND (events.view_count IS NOT c.views
+       OR events.comment_count IS NOT c.comments
+       OR events.bookmark_count IS NOT c.bookmarks)
+"""
+
+
+def _transaction(conn, body):
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        result = body()
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+    return result
+
+
+def run_sqlite(conn, retention_days=RETENTION_DAYS, batch_rows=PRUNE_BATCH_ROWS,
+               exact_views=False, prune=True):
+    """Run all three steps against a SQLite connection; returns stats"""
+    stats = {}
+
+    def rollup():
+        for sql in OPEN_SQL:
+            conn.execute(sql)
+        stats['rolled_up'] = conn.execute(PENDING_SQL).fetchone()[0]
+        stats['daily_rows'] = conn.execute(ROLLUP_SQL).rowcount
+        conn.execute(CLOSE_SQL)
+
+    start = time.perf_counter()
+    _transaction(conn, rollup)
+    stats['rollup_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats['pruned'] = 0
+    sql = prune_sql(retention_days, batch_rows)
+    while prune:
+        deleted = _transaction(conn, lambda: conn.execute(sql).rowcount)
+        stats['pruned'] += deleted
+        if deleted < batch_rows:
+            break
+    stats['prune_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats['counters_fixed'] = _transaction(conn, lambda: conn.execute(counters_sql(exact_views)).rowcount)
+    stats['counters_s'] = time.perf_counter() - start
+    return stats
+
+
+def _execute(sql, local, cwd):
+    result = execute_sql_file(sql + ';\n', local, cwd)
+    if result.returncode != 0:
+        raise RuntimeError(f"wrangler failed: {result.stderr.strip()}")
+
+
+def run_wrangler(local=True, cwd=PROJECT_DIR, retention_days=RETENTION_DAYS,
+                 batch_rows=PRUNE_BATCH_ROWS, exact_views=False, prune=True):
+    """Run all three steps through wrangler; one process per step or batch"""
+    stats = {}
+    start = time.perf_counter()
+    _execute(';\n'.join(OPEN_SQL), local, cwd)
+    stats['rolled_up'] = query_json(PENDING_SQL, local, cwd)[0]['n']
+    _execute(';\n'.join((ROLLUP_SQL.strip(), CLOSE_SQL)), local, cwd)
+    stats['rollup_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats['pruned'] = query_json(prunable_sql(retention_days), local, cwd)[0]['n'] if prune else 0
+    for _ in range(0, stats['pruned'], batch_rows):
+        _execute(prune_sql(retention_days, batch_rows), local, cwd)
+    stats['prune_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _execute(counters_sql(exact_views).strip(), local, cwd)
+    stats['counters_fixed'] = None
+    stats['counters_s'] = time.perf_counter() - start
+    return stats
+
+
+def print_stats(stats):
+    rate = stats['rolled_up'] / stats['rollup_s'] if stats['rollup_s'] else 0
+    print(f"📅 Rolled up {stats['rolled_up']} raw views into {stats.get('daily_rows', '?')} daily rows "
+          f"in {stats['rollup_s'] * 1000:.1f} ms ({rate:.0f} rows/s)")
+    print(f"🧹 Pruned {stats['pruned']} raw views in {stats['prune_s'] * 1000:.1f} ms")
+    fixed = 'all' if stats['counters_fixed'] is None else stats['counters_fixed']
+    print(f"🔢 Counters recomputed ({fixed} events changed) in {stats['counters_s'] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Roll up event_views and recompute event counters')
+    parser.add_argument('--db', metavar='PATH',
+                        help='use this SQLite file directly (no wrangler)')
+    parser.add_argument('--direct', action='store_true',
+                        help='use the local D1 SQLite file directly (auto-detected)')
+    parser.add_argument('--remote', action='store_true',
+                        help='run against the remote D1 database instead of --local')
+    parser.add_argument('--retention-days', type=int, default=RETENTION_DAYS,
+                        help='keep raw views this many days after they are rolled up')
+    parser.add_argument('--batch-rows', type=int, default=PRUNE_BATCH_ROWS,
+                        help='raw views deleted per retention batch')
+    parser.add_argument('--no-prune', action='store_true', help='skip the retention step')
+    parser.add_argument('--exact-views', action='store_true',
+                        help='set view_count to the logged views even if that lowers it')
+    args = parser.parse_args()
+
+    if args.db or args.direct:
+        conn = connect_shared(args.db)
+        try:
+            stats = run_sqlite(conn, args.retention_days, args.batch_rows, args.exact_views,
+                               not args.no_prune)
+        finally:
+            conn.close()
+    else:
+        stats = run_wrangler(not args.remote, retention_days=args.retention_days,
+                             batch_rows=args.batch_rows, exact_views=args.exact_views,
+                             prune=not args.no_prune)
+    print_stats(stats)
+
+
+if __name__ == '__main__':
+    main()
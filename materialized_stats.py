@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Materialized aggregates for the stats endpoints
+
+stats_counters (migrations/0017) holds running counts per category,
+event type and year of the events table and its total. stats_materialized
+holds one JSON payload per aggregate, rendered from the counters in SQL,
+so the Worker answers /api/events/categories, /api/events/types and
+/api/events/timeline with one primary-key lookup (and a 304 when the
+version still matches the client's ETag). A payload's version is bumped
+only when its JSON changes.
+
+Only the events table is covered. Once the counters are built (by
+sync_events --stats or this script), every sync keeps them exact by
+tracking the old and new (category, event_type, year) of every inserted,
+updated and deleted row and applying the difference in its transaction.
+The other writers of events (the event loaders, backup_db restore and
+generate_data) recount them with a full rebuild afterwards. users, chats
+and messages are written by the Worker and documents by the seeds, so
+/api/stats and /api/admin/stats take the events total from here and
+count those tables live. While the counters have never been built, an
+apply falls back to a full rebuild.
+
+Usage:
+    python3 materialized_stats.py --db PATH            # full rebuild
+    python3 materialized_stats.py                      # full rebuild through wrangler
+"""
+import argparse
+import time
+from collections import Counter
+
+from event_loader import PROJECT_DIR, execute_sql_file, query_json, sql_literal
+from local_db import connect_shared
+
+EVENT_STATS = (
+    ('events_by_category', 'category'),
+    ('events_by_type', 'event_type'),
+    ('events_by_year', 'year'),
+)
+
+EVENT_COUNTS_SQL = tuple(
+    "INSERT INTO stats_counters (stat, bucket, count) "
+    f"SELECT '{stat}', {column}, COUNT(*) FROM events WHERE {column} IS NOT NULL GROUP BY {column}"
+    for stat, column in EVENT_STATS
+) + (
+    "INSERT INTO stats_counters (stat, bucket, count) SELECT 'table_total', 'events', COUNT(*) FROM events",
+)
+
+REBUILD_SQL = ("DELETE FROM stats_counters",) + EVENT_COUNTS_SQL
+
+
+def _counts(stat, key, order):
+    value = 'CAST(bucket AS INTEGER)' if key == 'year' else 'bucket'
+    return (f"(SELECT json_group_array(json_object('{key}', {value}, 'count', count)) "
+            f"FROM (SELECT bucket, count FROM stats_counters WHERE stat = '{stat}' ORDER BY {order}))")
+
+
+def _total(table):
+    return f"COALESCE((SELECT count FROM stats_counters WHERE stat = 'table_total' AND bucket = '{table}'), 0)"
+
+
+PAYLOADS = {
+    'event_categories': _counts('events_by_category', 'category', 'count DESC, bucket'),
+    'event_types': _counts('events_by_type', 'event_type', 'count DESC, bucket'),
+    'event_years': _counts('events_by_year', 'year', 'CAST(bucket AS INTEGER)'),
+    'event_total': _total('events'),
+}
+
+RENDER_SQL = tuple(
+    f"INSERT INTO stats_materialized (name, payload) SELECT '{name}', {expr} WHERE true "
+    "ON CONFLICT(name) DO UPDATE SET payload = excluded.payload, version = version + 1, "
+    "updated_at = CURRENT_TIMESTAMP WHERE payload IS NOT excluded.payload"
+    for name, expr in PAYLOADS.items()
+)
+
+COUNTER_UPSERT_SQL = (
+    "INSERT INTO stats_counters (stat, bucket, count) VALUES (?, ?, ?) "
+    "ON CONFLICT(stat, bucket) DO UPDATE SET count = count + excluded.count"
+)
+# The events total stays at 0 so an emptied table is not mistaken for never-built counters
+PRUNE_SQL = "DELETE FROM stats_counters WHERE count <= 0 AND stat != 'table_total'"
+BUILT_SQL = "SELECT COUNT(*) AS n FROM stats_counters WHERE stat = 'table_total' AND bucket = 'events'"
+
+FACETS_SQL = 'SELECT id, content_hash, category, event_type, year FROM events'
+
+
+def event_facets(event):
+    """(category, event_type, year) of an event dict or row"""
+    return tuple(event.get(column) for _, column in EVENT_STATS)
+
+
+def _bucket(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _keys(facets):
+    keys = [('table_total', 'events')]
+    for (stat, _), value in zip(EVENT_STATS, facets):
+        if value is not None:
+            keys.append((stat, _bucket(value)))
+    return keys
+
+
+def track(delta, old, new):
+    """Add the counter changes of one row going from `old` to `new` facets
+
+    Either side is None for inserted and deleted rows.
+    """
+    if old == new:
+        return
+    for key in _keys(old) if old is not None else ():
+        delta[key] -= 1
+    for key in _keys(new) if new is not None else ():
+        delta[key] += 1
+
+
+def new_delta():
+    return Counter()
+
+
+def _delta_rows(delta):
+    return [(stat, bucket, change) for (stat, bucket), change in sorted(delta.items()) if change]
+
+
+def built_sqlite(conn):
+    """Whether the counters were ever built (and so must follow every write)"""
+    return bool(conn.execute(BUILT_SQL).fetchone()[0])
+
+
+def built_wrangler(local=True, cwd=PROJECT_DIR):
+    return bool(query_json(BUILT_SQL, local, cwd)[0]['n'])
+
+
+def apply_sqlite(conn, delta, in_transaction=False, rebuild=False):
+    """Apply an event delta and re-render the payloads
+
+    Returns the number of payloads whose version was bumped.
+    """
+    if not in_transaction:
+        conn.execute('BEGIN IMMEDIATE')
+    try:
+        if not rebuild and built_sqlite(conn):
+            conn.executemany(COUNTER_UPSERT_SQL, _delta_rows(delta))
+            conn.execute(PRUNE_SQL)
+        else:
+            for sql in REBUILD_SQL:
+                conn.execute(sql)
+        bumped = sum(conn.execute(sql).rowcount for sql in RENDER_SQL)
+    except BaseException:
+        if not in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    if not in_transaction:
+        conn.execute('COMMIT')
+    return bumped
+
+
+def rebuild_sqlite(conn):
+    """Recount everything from scratch; returns the number of payloads bumped"""
+    return apply_sqlite(conn, new_delta(), rebuild=True)
+
+
+def refresh_sqlite(conn, in_transaction=False):
+    """Rebuild after a write that bypassed the counters, if they were ever built
+
+    Returns the number of payloads bumped, or None when there are no
+    counters to keep up to date.
+    """
+    if not built_sqlite(conn):
+        return None
+    return apply_sqlite(conn, new_delta(), in_transaction, rebuild=True)
+
+
+def _execute(statements, local, cwd):
+    result = execute_sql_file(';\n'.join(statements) + ';\n', local, cwd)
+    if result.returncode != 0:
+        raise RuntimeError(f"Updating materialized stats failed: {result.stderr.strip()}")
+
+
+def apply_wrangler(delta, local=True, cwd=PROJECT_DIR, rebuild=False):
+    """Same as apply_sqlite, as one SQL file through wrangler"""
+    if rebuild or not built_wrangler(local, cwd):
+        statements = list(REBUILD_SQL)
+    else:
+        statements = [
+            "INSERT INTO stats_counters (stat, bucket, count) VALUES "
+            f"({sql_literal(stat)}, {sql_literal(bucket)}, {change}) "
+            "ON CONFLICT(stat, bucket) DO UPDATE SET count = count + excluded.count"
+            for stat, bucket, change in _delta_rows(delta)
+        ]
+        statements.append(PRUNE_SQL)
+    _execute(statements + list(RENDER_SQL), local, cwd)
+
+
+def refresh_wrangler(local=True, cwd=PROJECT_DIR):
+    """Same as refresh_sqlite through wrangler; returns whether it rebuilt"""
+    if not built_wrangler(local, cwd):
+        return False
+    apply_wrangler(new_delta(), local, cwd, rebuild=True)
+    return True
+
+
+def refresh_after_load(direct=False, db_path=None, local=True, cwd=PROJECT_DIR):
+    """Refresh the counters after an event loader run, directly or through wrangler"""
+    if not direct:
+        return refresh_wrangler(local, cwd)
+    conn = connect_shared(db_path, cwd)
+    try:
+        return refresh_sqlite(conn) is not None
+    finally:
+        conn.close()
+
+
+def print_payloads(conn):
+    for name, version, payload in conn.execute(
+            'SELECT name, version, payload FROM stats_materialized ORDER BY name'):
+        print(f"📈 {name:<20} v{version:<5} {len(payload):>7} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the materialized stats tables')
+    parser.add_argument('--db', metavar='PATH',
+                        help='use this SQLite file directly (no wrangler)')
+    parser.add_argument('--direct', action='store_true',
+                        help='use the local D1 SQLite file directly (auto-detected)')
+    parser.add_argument('--remote', action='store_true',
+                        help='update the remote D1 database instead of --local')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.db or args.direct:
+        conn = connect_shared(args.db)
+        try:
+            bumped = rebuild_sqlite(conn)
+            print_payloads(conn)
+        finally:
+            conn.close()
+        print(f"✅ {bumped} payloads changed in {time.perf_counter() - start:.2f}s")
+    else:
+        apply_wrangler(new_delta(), not args.remote, rebuild=True)
+        print(f"✅ Materialized stats updated in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
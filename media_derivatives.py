@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Resized WebP/AVIF derivatives of uploaded images
+
+Scans a directory laid out like the MEDIA R2 bucket (uploads/... as
+written by POST /api/upload), and for every image writes derivatives at
+WIDTHS into derived/<hash>/<width>.<format>, where <hash> is the
+blake2b of the source bytes. Identical uploads share one set of
+derivatives, and a source whose hash already has a complete set is
+skipped. derived/index.json remembers (size, mtime, hash) per source
+key so unchanged files are not even re-hashed.
+
+Hashing and encoding run in a process pool, one task per source image,
+so throughput scales with cores. JPEGs are decoded at reduced scale
+(draft mode) when the largest width allows it, and each width is
+resized from the next larger one.
+
+AVIF is written only when the installed Pillow can encode it; WebP needs
+Pillow itself. Afterwards messages.media_thumbnail_url and
+events.image_thumbnail_url (migrations/0018) are set for rows whose
+media_url / image_url points at a processed source, with one
+UPDATE ... FROM per chunk of urls. A changed image_url clears its
+thumbnail (trigger in migrations/0018) until the next run derives one.
+The derived/ tree is served through /api/files/ like any other object
+once copied into the bucket.
+
+Usage:
+    python3 media_derivatives.py --store media/ --db PATH [--jobs 8]
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from event_loader import PROJECT_DIR, execute_sql_file, inline_params, iter_chunks
+from local_db import connect_shared
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+MEDIA_DIR = os.path.join(ROOT_DIR, 'media')
+
+DERIVED_PREFIX = 'derived'
+INDEX_KEY = f'{DERIVED_PREFIX}/index.json'
+URL_PREFIX = '/api/files/'
+
+WIDTHS = (160, 320, 640, 1280)
+THUMBNAIL_WIDTH = 320
+QUALITY = {'webp': 80, 'avif': 55}
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff', '.avif')
+UPDATE_CHUNK = 500
+
+# (table, source url column, thumbnail column)
+URL_COLUMNS = (
+    ('messages', 'media_url', 'media_thumbnail_url'),
+    ('events', 'image_url', 'image_thumbnail_url'),
+)
+
+
+def available_formats():
+    """Derivative formats the installed Pillow can encode, preferred first"""
+    if Image is None:
+        return ()
+    formats = ['webp'] if features.check('webp') else []
+    if 'AVIF' in Image.registered_extensions().values() or features.check('avif'):
+        formats.append('avif')
+    return tuple(formats)
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def derivative_key(source_hash, width, fmt):
+    return f"{DERIVED_PREFIX}/{source_hash}/{width}.{fmt}"
+
+
+def _path(root, key):
+    return os.path.join(root, *key.split('/'))
+
+
+def scan(root):
+    """Yield (key, size, mtime_ns) of every image in the store outside derived/"""
+    for directory, dirs, files in os.walk(root):
+        rel = os.path.relpath(directory, root)
+        if rel.split(os.sep)[0] == DERIVED_PREFIX:
+            dirs[:] = []
+            continue
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                key = os.path.relpath(path, root).replace(os.sep, '/')
+                yield key, stat.st_size, stat.st_mtime_ns
+
+
+def read_index(root):
+    try:
+        with open(_path(root, INDEX_KEY), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'sources': {}, 'derived': {}}
+
+
+def write_index(root, index):
+    path = _path(root, INDEX_KEY)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def _save(image, path, fmt):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    if fmt == 'webp':
+        image.save(tmp, 'WEBP', quality=QUALITY['webp'], method=4)
+    else:
+        image.save(tmp, 'AVIF', quality=QUALITY['avif'])
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+def derive(root, key, source_hash, widths, formats):
+    """Worker: write all derivatives of one source; returns {"<width>.<fmt>": bytes}"""
+    with Image.open(_path(root, key)) as image:
+        if image.format == 'JPEG':
+            # Let the decoder downscale by up to 8x when the largest width allows it
+            image.draft('RGB', (max(widths), max(widths) * image.height // max(image.width, 1)))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    targets = sorted({min(width, image.width) for width in widths}, reverse=True)
+    written = {}
+    current = image
+    for width in targets:
+        if current.width != width:
+            height = max(1, round(current.height * width / current.width))
+            current = current.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            written[f"{width}.{fmt}"] = _save(current, _path(root, derivative_key(source_hash, width, fmt)), fmt)
+    return written
+
+
+def _hash_task(args):
+    root, key = args
+    return key, file_hash(_path(root, key))
+
+
+def _derive_task(args):
+    root, key, source_hash, widths, formats = args
+    try:
+        return source_hash, derive(root, key, source_hash, widths, formats), None
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        return source_hash, None, f"{key}: {e}"
+
+
+def _complete(entry, widths, formats):
+    """Whether a derived entry already covers the requested widths and formats"""
+    return (entry is not None and set(widths) <= set(entry['widths'])
+            and set(formats) <= set(entry['formats']))
+
+
+def process(root, widths=WIDTHS, formats=None, jobs=None):
+    """Hash new or changed sources and derive what is missing; returns (index, stats)"""
+    formats = formats or available_formats()
+    if not formats:
+        raise RuntimeError("Pillow with WebP support is required (pip install Pillow)")
+    index = read_index(root)
+    stats = {'sources': 0, 'hashed': 0, 'derived': 0, 'skipped': 0, 'failed': 0, 'bytes': 0}
+    sources = {}
+    to_hash = []
+    for key, size, mtime in scan(root):
+        stats['sources'] += 1
+        known = index['sources'].get(key)
+        if known and known[:2] == [size, mtime]:
+            sources[key] = known
+        else:
+            sources[key] = [size, mtime, None]
+            to_hash.append(key)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for key, digest in pool.map(_hash_task, [(root, key) for key in to_hash], chunksize=16):
+            sources[key][2] = digest
+            stats['hashed'] += 1
+
+        todo = {}
+        for key, (_, _, digest) in sorted(sources.items()):
+            if _complete(index['derived'].get(digest), widths, formats):
+                stats['skipped'] += 1
+            elif digest not in todo:
+                todo[digest] = key
+        tasks = [(root, key, digest, tuple(widths), tuple(formats)) for digest, key in todo.items()]
+        for digest, written, error in pool.map(_derive_task, tasks):
+            if error:
+                stats['failed'] += 1
+                print(f"⚠️  Skipped unreadable image {error}")
+                continue
+            index['derived'][digest] = {'widths': sorted(widths), 'formats': list(formats),
+                                        'files': written}
+            stats['derived'] += 1
+            stats['bytes'] += sum(written.values())
+
+    index['sources'] = sources
+    write_index(root, index)
+    return index, stats
+
+
+def thumbnail_urls(index, width=THUMBNAIL_WIDTH):
+    """{source url: thumbnail url} using the preferred format at `width`"""
+    urls = {}
+    for key, (_, _, digest) in index['sources'].items():
+        entry = index['derived'].get(digest)
+        if not entry:
+            continue
+        written = entry['files']
+        sizes = sorted({int(name.split('.')[0]) for name in written})
+        best = max([s for s in sizes if s <= width] or sizes[:1])
+        fmt = 'webp' if f"{best}.webp" in written else next(
+            name.split('.')[1] for name in written if name.startswith(f"{best}."))
+        urls[URL_PREFIX + key] = URL_PREFIX + derivative_key(digest, best, fmt)
+    return urls
+
+
+def _update_sql(table, url_column, thumb_column, rows):
+    values = ', '.join('(?, ?)' for _ in range(rows))
+    return (
+        f"UPDATE {table} SET {thumb_column} = m.thumb "
+        f"FROM (SELECT column1 AS url, column2 AS thumb FROM (VALUES {values})) AS m "
+        f"WHERE {table}.{url_column} = m.url AND {table}.{thumb_column} IS NOT m.thumb"
+    )
+
+
+def update_sqlite(conn, urls):
+    """Set the thumbnail columns in one transaction; returns rows changed per table"""
+    changed = {}
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        for table, url_column, thumb_column in URL_COLUMNS:
+            changed[table] = 0
+            for chunk in iter_chunks(sorted(urls.items()), UPDATE_CHUNK):
+                params = [value for pair in chunk for value in pair]
+                changed[table] += conn.execute(
+                    _update_sql(table, url_column, thumb_column, len(chunk)), params).rowcount
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+    return changed
+
+
+def update_wrangler(urls, local=True, cwd=PROJECT_DIR):
+    """Same updates as one SQL file through wrangler"""
+    statements = []
+    for table, url_column, thumb_column in URL_COLUMNS:
+        for chunk in iter_chunks(sorted(urls.items()), UPDATE_CHUNK):
+            sql = _update_sql(table, url_column, thumb_column, len(chunk))
+            statements.append(inline_params(sql, [v for pair in chunk for v in pair]) + ';')
+    if statements:
+        result = execute_sql_file('\n'.join(statements) + '\n', local, cwd)
+        if result.returncode != 0:
+            raise RuntimeError(f"Updating thumbnail urls failed: {result.stderr.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate resized image derivatives')
+    parser.add_argument('--store', default=MEDIA_DIR, help='directory laid out like the MEDIA bucket')
+    parser.add_argument('--widths', type=int, nargs='+', default=list(WIDTHS))
+    parser.add_argument('--formats', nargs='+', choices=('webp', 'avif'),
+                        help='default: every format the installed Pillow can encode')
+    parser.add_argument('--jobs', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--db', metavar='PATH',
+                        help='update thumbnail urls in this SQLite file directly (no wrangler)')
+    parser.add_argument('--direct', action='store_true',
+                        help='update the local D1 SQLite file directly (auto-detected)')
+    parser.add_argument('--remote', action='store_true',
+                        help='update the remote D1 database instead of --local')
+    parser.add_argument('--no-update', action='store_true', help='only write derivatives')
+    args = parser.parse_args()
+
+    if Image is None:
+        raise SystemExit("❌ Pillow is not installed (pip install Pillow)")
+    start = time.perf_counter()
+    index, stats = process(args.store, args.widths, args.formats, args.jobs)
+    elapsed = time.perf_counter() - start
+    rate = stats['derived'] / elapsed if elapsed else 0
+    print(f"🖼️  {stats['sources']} sources: {stats['hashed']} hashed, {stats['derived']} derived "
+          f"({rate:.1f}/s, {stats['bytes']} bytes), {stats['skipped']} already done, "
+          f"{stats['failed']} failed")
+
+    if args.no_update:
+        return
+    urls = thumbnail_urls(index)
+    if args.db or args.direct:
+        conn = connect_shared(args.db)
+        try:
+            changed = update_sqlite(conn, urls)
+        finally:
+            conn.close()
+        print('🔗 Thumbnail urls set: ' + ', '.join(f"{t} {n}" for t, n in changed.items()))
+    else:
+        update_wrangler(urls, not args.remote)
+        print(f"🔗 Thumbnail urls updated for {len(urls)} sources")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+-- Content hash written by the Python sync to detect changed events
+ALTER TABLE events ADD COLUMN content_hash TEXT;
@@ -0,0 +1,12 @@
+-- Journal of committed loader batches, used to resume interrupted loads
+CREATE TABLE IF NOT EXISTS sync_journal (
+  run TEXT NOT NULL,
+  batch_index INTEGER NOT NULL,
+  batch_hash TEXT NOT NULL,
+  first_id INTEGER,
+  last_id INTEGER,
+  row_count INTEGER NOT NULL,
+  failed_ids TEXT, -- JSON array of ids rejected in this batch
+  committed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (run, batch_index)
+);
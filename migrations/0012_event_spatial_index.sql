@@ -0,0 +1,33 @@
+-- Spatial keys written by the Python sync (see spatial_index.py)
+ALTER TABLE events ADD COLUMN geohash TEXT; -- base32 geohash, 9 characters
+ALTER TABLE events ADD COLUMN tile_key TEXT; -- web mercator quadkey at zoom 16
+
+CREATE INDEX IF NOT EXISTS idx_events_geohash ON events(geohash);
+CREATE INDEX IF NOT EXISTS idx_events_tile_key ON events(tile_key);
+
+-- R*Tree of event points for bounding box and nearby lookups
+CREATE VIRTUAL TABLE IF NOT EXISTS events_rtree USING rtree(
+  id,
+  min_lat, max_lat,
+  min_lon, max_lon
+);
+
+INSERT OR REPLACE INTO events_rtree (id, min_lat, max_lat, min_lon, max_lon)
+SELECT id, latitude, latitude, longitude, longitude FROM events;
+
+-- Triggers to keep the R*Tree in sync
+CREATE TRIGGER IF NOT EXISTS events_rtree_ai AFTER INSERT ON events BEGIN
+  INSERT INTO events_rtree (id, min_lat, max_lat, min_lon, max_lon)
+  VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_rtree_ad AFTER DELETE ON events BEGIN
+  DELETE FROM events_rtree WHERE id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_rtree_au AFTER UPDATE OF latitude, longitude ON events BEGIN
+  UPDATE events_rtree
+  SET min_lat = new.latitude, max_lat = new.latitude,
+      min_lon = new.longitude, max_lon = new.longitude
+  WHERE id = new.id;
+END;
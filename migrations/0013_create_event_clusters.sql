@@ -0,0 +1,14 @@
+-- Precomputed marker clusters per zoom level, rebuilt by cluster_pyramid.py
+CREATE TABLE IF NOT EXISTS event_clusters (
+  zoom INTEGER NOT NULL,
+  tile_x INTEGER NOT NULL,
+  tile_y INTEGER NOT NULL,
+  seq INTEGER NOT NULL, -- cluster number within the tile
+  latitude REAL NOT NULL, -- weighted centroid
+  longitude REAL NOT NULL,
+  point_count INTEGER NOT NULL,
+  dominant_type TEXT, -- most frequent event_type in the cluster
+  event_id INTEGER, -- set when the cluster is a single event
+  type_counts TEXT, -- JSON event_type counts of a multi-point cluster
+  PRIMARY KEY (zoom, tile_x, tile_y, seq)
+) WITHOUT ROWID;
@@ -0,0 +1,20 @@
+-- Feature hash of the last related_events computation (see related_events.py)
+ALTER TABLE events ADD COLUMN related_hash TEXT;
+
+-- Only reindex FTS when an indexed column changes, not on counter or
+-- related_events updates. events_fts is an external-content table, so
+-- the old row is removed with the 'delete' command (an UPDATE or DELETE
+-- on it cannot see the old tokens and leaves them in the index).
+DROP TRIGGER IF EXISTS events_au;
+CREATE TRIGGER IF NOT EXISTS events_au AFTER UPDATE OF title, description, full_description, keywords ON events BEGIN
+  INSERT INTO events_fts(events_fts, rowid, title, description, full_description, keywords)
+  VALUES ('delete', old.id, old.title, old.description, old.full_description, old.keywords);
+  INSERT INTO events_fts(rowid, title, description, full_description, keywords)
+  VALUES (new.id, new.title, new.description, new.full_description, new.keywords);
+END;
+
+DROP TRIGGER IF EXISTS events_ad;
+CREATE TRIGGER IF NOT EXISTS events_ad AFTER DELETE ON events BEGIN
+  INSERT INTO events_fts(events_fts, rowid, title, description, full_description, keywords)
+  VALUES ('delete', old.id, old.title, old.description, old.full_description, old.keywords);
+END;
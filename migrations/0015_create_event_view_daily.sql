@@ -0,0 +1,19 @@
+-- Daily rollup of event_views, maintained by maintain_event_views.py
+CREATE TABLE IF NOT EXISTS event_view_daily (
+  event_id INTEGER NOT NULL,
+  day TEXT NOT NULL, -- YYYY-MM-DD (UTC)
+  views INTEGER NOT NULL DEFAULT 0,
+  unique_users INTEGER NOT NULL DEFAULT 0, -- distinct signed-in viewers that day
+  total_duration INTEGER NOT NULL DEFAULT 0, -- seconds
+  PRIMARY KEY (event_id, day)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_event_view_daily_day ON event_view_daily(day);
+
+-- Progress markers of maintenance jobs: rows with id <= last_id are done
+CREATE TABLE IF NOT EXISTS maintenance_watermarks (
+  job TEXT PRIMARY KEY,
+  last_id INTEGER NOT NULL DEFAULT 0,
+  next_id INTEGER, -- upper bound of the run in progress
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,17 @@
+-- Index of archived message blocks written by archive_messages.py
+CREATE TABLE IF NOT EXISTS message_archive_blocks (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  chat_id INTEGER NOT NULL,
+  month TEXT NOT NULL, -- YYYY-MM of the messages' created_at
+  block_key TEXT NOT NULL UNIQUE, -- object key in the archive store
+  codec TEXT NOT NULL, -- zstd or zlib, NDJSON inside
+  first_id INTEGER NOT NULL,
+  last_id INTEGER NOT NULL,
+  message_count INTEGER NOT NULL,
+  bytes INTEGER NOT NULL,
+  checksum TEXT NOT NULL, -- blake2b of the compressed block
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (chat_id) REFERENCES chats(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_message_archive_chat ON message_archive_blocks(chat_id, last_id);
@@ -0,0 +1,15 @@
+-- Running counts behind the aggregate endpoints, maintained by materialized_stats.py
+CREATE TABLE IF NOT EXISTS stats_counters (
+  stat TEXT NOT NULL, -- counter family, see materialized_stats.py
+  bucket TEXT NOT NULL, -- value counted within the family
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (stat, bucket)
+) WITHOUT ROWID;
+
+-- One ready-to-serve JSON payload per aggregate endpoint
+CREATE TABLE IF NOT EXISTS stats_materialized (
+  name TEXT PRIMARY KEY, -- payload name, see materialized_stats.py
+  payload TEXT NOT NULL, -- JSON
+  version INTEGER NOT NULL DEFAULT 1, -- bumped whenever the payload changes, served as ETag
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
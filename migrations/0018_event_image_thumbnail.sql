@@ -0,0 +1,9 @@
+-- Small derivative of image_url for list views, written by media_derivatives.py
+ALTER TABLE events ADD COLUMN image_thumbnail_url TEXT;
+
+-- A new image_url invalidates the thumbnail until media_derivatives.py
+-- derives one for it, whichever writer changed the url
+CREATE TRIGGER IF NOT EXISTS events_image_au AFTER UPDATE OF image_url ON events
+WHEN old.image_url IS NOT new.image_url BEGIN
+  UPDATE events SET image_thumbnail_url = NULL WHERE id = new.id;
+END;
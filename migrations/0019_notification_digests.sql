@@ -0,0 +1,7 @@
+-- One digest notification per recipient and chat/event ('chat:<id>',
+-- 'event:<id>'), upserted by notify_fanout.py; NULL for everything else
+ALTER TABLE notifications ADD COLUMN digest_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_notifications_digest ON notifications(user_id, digest_key);
+
+-- Retention scans read notifications by age
+CREATE INDEX IF NOT EXISTS idx_notifications_read_at ON notifications(read_at) WHERE is_read = 1;
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Fan new messages and comments out into notifications, and expire old ones
+
+Fan-out is set-based. For each source (messages, event_comments) the
+rows above its watermark (maintenance_watermarks, migrations/0015) are
+turned into notifications by one INSERT ... SELECT over a CTE:
+
+- messages reach every unmuted chat member except the sender; the CTE
+  counts new messages per chat and subtracts each member's own, so a
+  channel costs one pass over its members, not members x messages
+- comments reach users who bookmarked the event and the author of the
+  parent comment, never the commenter
+
+Bursts are coalesced into one digest per recipient and chat/event,
+keyed by notifications.digest_key (migrations/0019): ON CONFLICT adds
+the new count to an unread digest, or reopens a read one with the new
+count, and marks it unsent so it is delivered again. The watermark
+advances in the same transaction. A source's first run creates its
+watermark at the current MAX(id), so rows that existed before fan-out
+was set up are never notified.
+
+Retention deletes read notifications whose read_at is older than
+--retention-days in batches of --batch-rows, each its own short
+transaction; with --archive every batch is first appended as gzip NDJSON
+to archive/notifications/<date>.ndjson.gz.
+
+Usage:
+    python3 notify_fanout.py --db PATH [--retention-days 30] [--archive]
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+
+from archive_messages import ARCHIVE_DIR
+from event_loader import PROJECT_DIR, execute_sql_file, query_json
+from local_db import connect_shared
+
+RETENTION_DAYS = 30
+PRUNE_BATCH_ROWS = 5000
+
+_MESSAGE_FAN = """
+batch AS (
+  SELECT m.id, m.chat_id, m.sender_id FROM messages m
+  JOIN maintenance_watermarks w ON w.job = '{job}'
+  WHERE m.id > w.last_id AND m.id <= w.next_id AND m.is_deleted = 0
+),
+totals AS (SELECT chat_id, COUNT(*) AS n, MAX(id) AS last_id FROM batch GROUP BY chat_id),
+own AS (SELECT chat_id, sender_id, COUNT(*) AS n FROM batch GROUP BY chat_id, sender_id),
+fan AS (
+  SELECT t.chat_id AS entity_id, cm.user_id, t.n - COALESCE(o.n, 0) AS n, t.last_id
+  FROM totals t
+  JOIN chat_members cm ON cm.chat_id = t.chat_id AND cm.is_muted = 0
+  LEFT JOIN own o ON o.chat_id = t.chat_id AND o.sender_id = cm.user_id
+  WHERE t.n - COALESCE(o.n, 0) > 0
+)"""
+
+_COMMENT_FAN = """
+batch AS (
+  SELECT c.id, c.event_id, c.user_id, c.parent_comment_id FROM event_comments c
+  JOIN maintenance_watermarks w ON w.job = '{job}'
+  WHERE c.id > w.last_id AND c.id <= w.next_id AND c.is_deleted = 0
+),
+audience AS (
+  SELECT b.event_id, k.user_id, b.id FROM batch b
+  JOIN event_bookmarks k ON k.event_id = b.event_id WHERE k.user_id != b.user_id
+  UNION
+  SELECT b.event_id, p.user_id, b.id FROM batch b
+  JOIN event_comments p ON p.id = b.parent_comment_id WHERE p.user_id != b.user_id
+),
+fan AS (
+  SELECT event_id AS entity_id, user_id, COUNT(*) AS n, MAX(id) AS last_id
+  FROM audience GROUP BY event_id, user_id
+)"""
+
+SOURCES = {
+    'messages': {
+        'job': 'notify_messages', 'fan': _MESSAGE_FAN,
+        'type': 'message', 'entity': 'chat',
+        'title': "(SELECT COALESCE(title, 'Chat') FROM chats WHERE id = f.entity_id)",
+        'one': 'Neue Nachricht', 'many': 'neue Nachrichten',
+    },
+    'event_comments': {
+        'job': 'notify_event_comments', 'fan': _COMMENT_FAN,
+        'type': 'event_comment', 'entity': 'event',
+        'title': "(SELECT title FROM events WHERE id = f.entity_id)",
+        'one': 'Neuer Kommentar', 'many': 'neue Kommentare',
+    },
+}
+
+
+def open_sql(source):
+    job, table = SOURCES[source]['job'], source
+    return (
+        # A new watermark starts at the current end, so history is not notified
+        "INSERT OR IGNORE INTO maintenance_watermarks (job, last_id) "
+        f"SELECT '{job}', COALESCE(MAX(id), 0) FROM {table}",
+        "UPDATE maintenance_watermarks SET next_id = COALESCE("
+        f"(SELECT MAX(id) FROM {table} WHERE id > maintenance_watermarks.last_id), last_id) "
+        f"WHERE job = '{job}'",
+    )
+
+
+def pending_sql(source):
+    job = SOURCES[source]['job']
+    return (f"SELECT COUNT(*) AS n FROM {source} s JOIN maintenance_watermarks w ON w.job = '{job}' "
+            "WHERE s.id > w.last_id AND s.id <= w.next_id")
+
+
+def upsert_sql(source):
+    """Write one digest per recipient, reopening a read one with a fresh count"""
+    spec = SOURCES[source]
+    count = "json_extract(notifications.data, '$.count')"
+    return f"""WITH {spec['fan'].format(job=spec['job']).strip()}
+INSERT INTO notifications
+  (user_id, notification_type, title, body, data, related_entity_type, related_entity_id, digest_key)
+SELECT f.user_id, '{spec['type']}', COALESCE({spec['title']}, ''),
+       CASE WHEN f.n = 1 THEN '{spec['one']}' ELSE f.n || ' {spec['many']}' END,
+       json_object('count', f.n, 'last_id', f.last_id), '{spec['entity']}', f.entity_id,
+       '{spec['entity']}:' || f.entity_id
+FROM fan f WHERE true
+ON CONFLICT(user_id, digest_key) DO UPDATE SET
+  body = CASE WHEN is_read THEN excluded.body
+              ELSE ({count} + json_extract(excluded.data, '$.count')) || ' {spec['many']}' END,
+  data = CASE WHEN is_read THEN excluded.data
+              ELSE json_set(excluded.data, '$.count',
+                            {count} + json_extract(excluded.data, '$.count')) END,
+  title = excluded.title,
+  is_read = 0,
+  read_at = NULL,
+  is_sent = 0,
+  created_at = CURRENT_TIMESTAMP"""
+
+
+def close_sql(source):
+    return ("UPDATE maintenance_watermarks SET last_id = next_id, next_id = NULL, "
+            f"updated_at = CURRENT_TIMESTAMP WHERE job = '{SOURCES[source]['job']}'")
+
+
+def expired_sql(retention_days, batch_rows):
+    return ("SELECT * FROM notifications WHERE is_read = 1 "
+            f"AND read_at < datetime('now', '-{int(retention_days)} days') "
+            f"ORDER BY read_at, id LIMIT {int(batch_rows)}")
+
+
+def delete_sql(ids):
+    return f"DELETE FROM notifications WHERE id IN ({', '.join(str(int(i)) for i in ids)})"
+
+
+def archive_rows(rows, archive_dir=ARCHIVE_DIR):
+    """Append rows to today's gzip NDJSON file (one gzip member per batch)"""
+    path = os.path.join(archive_dir, 'notifications', time.strftime('%Y-%m-%d') + '.ndjson.gz')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    body = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+    with open(path, 'ab') as f:
+        f.write(gzip.compress(body, mtime=0))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _transaction(conn, body):
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        result = body()
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+    return result
+
+
+def fan_out_sqlite(conn, source):
+    """Run one source's fan-out in one transaction; returns stats"""
+    def run():
+        for sql in open_sql(source):
+            conn.execute(sql)
+        stats = {'source_rows': conn.execute(pending_sql(source)).fetchone()[0]}
+        # rowcount is -1 for statements starting with WITH
+        changes = conn.total_changes
+        conn.execute(upsert_sql(source))
+        stats['digests'] = conn.total_changes - changes
+        conn.execute(close_sql(source))
+        return stats
+
+    start = time.perf_counter()
+    stats = _transaction(conn, run)
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def prune_sqlite(conn, retention_days=RETENTION_DAYS, batch_rows=PRUNE_BATCH_ROWS, archive=False):
+    start = time.perf_counter()
+    deleted = 0
+    sql = expired_sql(retention_days, batch_rows)
+    while True:
+        def batch():
+            cursor = conn.execute(sql)
+            columns = [d[0] for d in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor]
+            if rows:
+                if archive:
+                    archive_rows(rows)
+                conn.execute(delete_sql([row['id'] for row in rows]))
+            return len(rows)
+
+        count = _transaction(conn, batch)
+        deleted += count
+        if count < batch_rows:
+            break
+    return {'deleted': deleted, 'seconds': time.perf_counter() - start}
+
+
+def _execute(statements, local, cwd):
+    result = execute_sql_file(';\n'.join(statements) + ';\n', local, cwd)
+    if result.returncode != 0:
+        raise RuntimeError(f"wrangler failed: {result.stderr.strip()}")
+
+
+def fan_out_wrangler(source, local=True, cwd=PROJECT_DIR):
+    """Same statements through wrangler: open, count, then one file for the write"""
+    start = time.perf_counter()
+    _execute(open_sql(source), local, cwd)
+    stats = {'source_rows': query_json(pending_sql(source), local, cwd)[0]['n'],
+             'digests': None}
+    _execute((upsert_sql(source), close_sql(source)), local, cwd)
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def prune_wrangler(local=True, cwd=PROJECT_DIR, retention_days=RETENTION_DAYS,
+                   batch_rows=PRUNE_BATCH_ROWS, archive=False):
+    start = time.perf_counter()
+    deleted = 0
+    while True:
+        rows = query_json(expired_sql(retention_days, batch_rows), local, cwd)
+        if not rows:
+            break
+        if archive:
+            archive_rows(rows)
+        _execute((delete_sql([row['id'] for row in rows]),), local, cwd)
+        deleted += len(rows)
+        if len(rows) < batch_rows:
+            break
+    return {'deleted': deleted, 'seconds': time.perf_counter() - start}
+
+
+def print_stats(fanout, pruned, archive):
+    for source, stats in fanout.items():
+        rate = stats['source_rows'] / stats['seconds'] if stats['seconds'] else 0
+        digests = '?' if stats['digests'] is None else stats['digests']
+        print(f"🔔 {source:<15} {stats['source_rows']:>8} rows -> {digests} digests "
+              f"in {stats['seconds'] * 1000:.1f} ms ({rate:.0f} rows/s)")
+    if pruned is not None:
+        rate = pruned['deleted'] / pruned['seconds'] if pruned['seconds'] else 0
+        verb = 'Archived and deleted' if archive else 'Deleted'
+        print(f"🧹 {verb} {pruned['deleted']} read notifications "
+              f"in {pruned['seconds'] * 1000:.1f} ms ({rate:.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fan out notifications and expire read ones')
+    parser.add_argument('--db', metavar='PATH',
+                        help='use this SQLite file directly (no wrangler)')
+    parser.add_argument('--direct', action='store_true',
+                        help='use the local D1 SQLite file directly (auto-detected)')
+    parser.add_argument('--remote', action='store_true',
+                        help='run against the remote D1 database instead of --local')
+    parser.add_argument('--sources', nargs='+', choices=tuple(SOURCES), default=list(SOURCES))
+    parser.add_argument('--retention-days', type=int, default=RETENTION_DAYS,
+                        help='delete read notifications this many days after they were read')
+    parser.add_argument('--batch-rows', type=int, default=PRUNE_BATCH_ROWS,
+                        help='notifications deleted per retention batch')
+    parser.add_argument('--archive', action='store_true',
+                        help='append expired notifications to archive/notifications/ before deleting')
+    parser.add_argument('--no-prune', action='store_true', help='skip the retention step')
+    args = parser.parse_args()
+
+    fanout = {}
+    pruned = None
+    if args.db or args.direct:
+        conn = connect_shared(args.db)
+        try:
+            for source in args.sources:
+                fanout[source] = fan_out_sqlite(conn, source)
+            if not args.no_prune:
+                pruned = prune_sqlite(conn, args.retention_days, args.batch_rows, args.archive)
+        finally:
+            conn.close()
+    else:
+        for source in args.sources:
+            fanout[source] = fan_out_wrangler(source, not args.remote)
+        if not args.no_prune:
+            pruned = prune_wrangler(not args.remote, retention_days=args.retention_days,
+                                    batch_rows=args.batch_rows, archive=args.archive)
+    print_stats(fanout, pruned, args.archive)
+
+
+if __name__ == '__main__':
+    main()
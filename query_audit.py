@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Audit the query plans of every SQL statement the Worker issues
+
+Extracts each DB.prepare(...) call from src/index.tsx. Inline literals
+are taken as-is; a prepare(sql) on a variable is resolved to its
+declaration plus the `sql += ...` appends before the call. When some
+appends are conditional (inside an if, indented below the declaration)
+both variants are audited: "[no filters]" with only the unconditional
+appends and "[all filters]" with every one, since the unfiltered query
+is usually the one that scans. Placeholders get representative values
+from their context (ids, years, LIKE patterns, LIMIT/OFFSET).
+
+Each statement is run through EXPLAIN QUERY PLAN on a migrated and
+populated local SQLite (see generate_data.py) and flagged for:
+
+- full-scan       SCAN of a table without any index
+- temp-btree      USE TEMP B-TREE for ORDER BY / GROUP BY / DISTINCT
+- auto-index      an AUTOMATIC index built for every execution
+- like-wildcard   LIKE with a leading %, which no B-tree index can serve
+
+Flagged tables get a suggested index (equality columns, then the ORDER
+BY or range column, then the selected columns when that makes it
+covering); --verify creates the suggestions and reports whether the
+flags disappear. Everything runs in one transaction that is rolled
+back, so --analyze and --verify leave the database untouched.
+
+The report is plain text keyed by route and statement number, with no
+timings or line numbers, so it can be committed and diffed; --check
+fails when a statement has a flag that the baseline report does not.
+
+Usage:
+    python3 query_audit.py --db /tmp/scale.sqlite --analyze --verify --out query_plans.txt
+    python3 query_audit.py --db /tmp/scale.sqlite --check query_plans.txt
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+from fts_bulk import FTS_TABLES
+from local_db import connect_local
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(ROOT_DIR, 'src', 'index.tsx')
+
+PREPARE = re.compile(r'\.prepare\(\s*')
+ROUTE = re.compile(r"^app\.(get|post|put|delete|patch)\('([^']+)'|^(?:async\s+)?function\s+(\w+)", re.M)
+STRING = re.compile(r'`([^`]*)`|\'((?:[^\'\\]|\\.)*)\'|"((?:[^"\\]|\\.)*)"', re.S)
+
+KEYWORDS = {'WHERE', 'ON', 'JOIN', 'INNER', 'LEFT', 'CROSS', 'ORDER', 'GROUP', 'LIMIT', 'SET',
+            'VALUES', 'AND', 'OR', 'AS', 'USING', 'HAVING'}
+TABLE_REF = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.I)
+# Column compared with a parameter or constant; join conditions (a.x = b.y) do not match
+CONDITION = re.compile(r'(?:(\w+)\.)?(\w+)\s*(=|IN\b|IS\b|<=|>=|<|>|BETWEEN\b|LIKE\b)\s*'
+                       r'(?=\?|\'|-?\d|NULL\b|NOT\s+NULL\b|\()', re.I)
+ORDER_BY = re.compile(r'\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|\bOFFSET\b|$)', re.I | re.S)
+SELECT_LIST = re.compile(r'^\s*SELECT\s+(?:DISTINCT\s+)?(.+?)\s+FROM\b', re.I | re.S)
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+AUTO_INDEX = re.compile(r'^(?:SEARCH|SCAN) (\w+) USING AUTOMATIC')
+TEMP_BTREE = re.compile(r'^USE TEMP B-TREE FOR (.+)$')
+
+
+def _literal(match):
+    return next(group for group in match.groups() if group is not None)
+
+
+def _route_at(source, pos):
+    """(label, offset) of the route or function enclosing pos"""
+    label, start = '(module)', 0
+    for match in ROUTE.finditer(source, 0, pos):
+        method, path, function = match.groups()
+        label = f"{method.upper()} {path}" if method else f"{function}()"
+        start = match.start()
+    return label, start
+
+
+def _indent(text, pos):
+    """(indentation, text before pos) of the line holding pos"""
+    line = text[text.rfind('\n', 0, pos) + 1:pos]
+    return len(line) - len(line.lstrip()), line.strip()
+
+
+def _resolve(source, name, scope_start, pos):
+    """(unconditional, all appends) SQL of `name` before pos, within the route
+
+    An append counts as conditional when it sits deeper than the
+    declaration or follows an if/else on the same line.
+    """
+    scope = source[scope_start:pos]
+    decls = list(re.finditer(
+        rf'\b(?:let|const|var)\s+{name}\s*(?::\s*\w+)?\s*=\s*', scope))
+    if not decls:
+        return None
+    decl = decls[-1]
+    first = STRING.match(scope, decl.end())
+    if not first:
+        return None
+    depth = _indent(scope, decl.start())[0]
+    base, full = [_literal(first)], [_literal(first)]
+    for append in re.finditer(rf'\b{name}\s*\+=\s*', scope[first.end():]):
+        literal = STRING.match(scope, first.end() + append.end())
+        if literal:
+            full.append(_literal(literal))
+            indent, before = _indent(scope, first.end() + append.start())
+            if indent <= depth and not re.match(r'(?:}\s*)?(?:if\b|else\b)', before):
+                base.append(_literal(literal))
+    return ''.join(base), ''.join(full)
+
+
+def extract_statements(path=SOURCE):
+    """[(key, line, sql or None)] for every prepare() call in source order"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    statements = []
+    counts = {}
+    for match in PREPARE.finditer(source):
+        label, scope_start = _route_at(source, match.start())
+        counts[label] = counts.get(label, 0) + 1
+        key = f"{label} #{counts[label]}"
+        line = source.count('\n', 0, match.start()) + 1
+        literal = STRING.match(source, match.end())
+        if literal:
+            variants = [(key, _literal(literal))]
+        else:
+            name = re.match(r'\w+', source[match.end():])
+            resolved = _resolve(source, name.group(0), scope_start, match.start()) if name else None
+            if resolved is None:
+                variants = [(key, None)]
+            elif resolved[0] == resolved[1]:
+                variants = [(key, resolved[1])]
+            else:
+                variants = [(f"{key} [no filters]", resolved[0]),
+                            (f"{key} [all filters]", resolved[1])]
+        for variant, sql in variants:
+            if sql is not None and '${' in sql:
+                sql = None
+            statements.append((variant, line, normalize(sql) if sql else None))
+    return statements
+
+
+def normalize(sql):
+    return ' '.join(sql.split())
+
+
+def bind_values(sql):
+    """A representative value for every ? placeholder, from the text before it"""
+    values = []
+    for match in re.finditer(r'\?', sql):
+        before = sql[max(0, match.start() - 60):match.start()].rstrip()
+        upper = before.upper()
+        column = re.search(r'(\w+)\s*(?:=|<=|>=|<|>|!=)$', before)
+        if upper.endswith('LIKE'):
+            values.append('%myst%')
+        elif upper.endswith('LIMIT'):
+            values.append(50)
+        elif upper.endswith('OFFSET'):
+            values.append(0)
+        elif column and (column.group(1).endswith('id') or column.group(1) == 'year'):
+            values.append(1000 if column.group(1) == 'year' else 1)
+        elif column:
+            values.append('user' if column.group(1) == 'role' else 'x')
+        else:
+            # VALUES lists and other positions: the plan does not depend on them
+            values.append(1)
+    return values
+
+
+def plan(conn, sql):
+    """EXPLAIN QUERY PLAN rows as indented detail lines"""
+    rows = conn.execute('EXPLAIN QUERY PLAN ' + sql, bind_values(sql)).fetchall()
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def aliases(sql):
+    """{alias or table name: table}"""
+    found = {}
+    for table, alias in TABLE_REF.findall(sql):
+        found[table] = table
+        if alias and alias.upper() not in KEYWORDS:
+            found[alias] = table
+    return found
+
+
+def flags_for(sql, lines):
+    flags = []
+    for line in (line.strip() for line in lines):
+        scan = FULL_SCAN.match(line)
+        auto = AUTO_INDEX.match(line)
+        temp = TEMP_BTREE.match(line)
+        if scan:
+            flags.append(('full-scan', scan.group(1)))
+        elif auto:
+            flags.append(('auto-index', auto.group(1)))
+        elif temp:
+            flags.append(('temp-btree', temp.group(1)))
+    for alias, column in re.findall(r'(?:(\w+)\.)?(\w+)\s+LIKE\s+\?', sql, re.I):
+        flags.append(('like-wildcard', f"{alias + '.' if alias else ''}{column}"))
+    return flags
+
+
+def _single(names):
+    tables = set(names.values())
+    return tables.pop() if len(tables) == 1 else None
+
+
+def _columns_by_table(sql, names):
+    """Equality, range and ORDER BY columns per table"""
+    where = re.split(r'\bORDER\s+BY\b', sql, maxsplit=1, flags=re.I)[0]
+    single = _single(names)
+    eq, ranges, order = {}, {}, {}
+    for alias, column, op in CONDITION.findall(where):
+        table = names.get(alias) if alias else single
+        if table is None or column.upper() in KEYWORDS:
+            continue
+        op = op.upper()
+        if op in ('=', 'IN', 'IS'):
+            eq.setdefault(table, []).append(column)
+        elif op != 'LIKE':
+            ranges.setdefault(table, []).append(column)
+    by = ORDER_BY.search(sql)
+    for term in by.group(1).split(',') if by else ():
+        ref = re.match(r'\s*(?:(\w+)\.)?(\w+)', term)
+        table = names.get(ref.group(1)) if ref and ref.group(1) else single
+        if ref and table:
+            order.setdefault(table, []).append(ref.group(2))
+    if len(order) > 1:
+        # Sorting across tables of a join cannot come from one index
+        order = {}
+    return eq, ranges, order
+
+
+def _selected(sql, table, names):
+    """Columns of `table` in an explicit select list, or None"""
+    select = SELECT_LIST.match(sql)
+    if not select or '*' in select.group(1) or '(' in select.group(1):
+        return None
+    single = _single(names)
+    columns = []
+    for item in select.group(1).split(','):
+        ref = re.match(r'\s*(?:(\w+)\.)?(\w+)', item)
+        if ref and (names.get(ref.group(1)) if ref.group(1) else single) == table:
+            columns.append(ref.group(2))
+    return columns
+
+
+def _existing(conn, table):
+    """Column lists of the table's indexes"""
+    indexes = []
+    for row in conn.execute(f"PRAGMA index_list('{table}')"):
+        indexes.append([info[2] for info in conn.execute(f"PRAGMA index_info('{row[1]}')")])
+    return indexes
+
+
+def suggest(conn, sql, flags):
+    """CREATE INDEX statements that could remove the flags"""
+    names = aliases(sql)
+    eq, ranges, order = _columns_by_table(sql, names)
+    targets = [names.get(alias) for kind, alias in flags if kind in ('full-scan', 'auto-index')]
+    if any(kind == 'temp-btree' and 'ORDER BY' in what for kind, what in flags):
+        targets.extend(order)
+    suggestions = []
+    for table in dict.fromkeys(targets):
+        if table is None:
+            continue
+        known = {row[1] for row in conn.execute(f"PRAGMA table_info('{table}')")}
+        columns = [c for c in dict.fromkeys(eq.get(table, [])) if c in known]
+        # ORDER BY may name result aliases (count, total); those cannot be indexed
+        tail = [c for c in order.get(table, []) if c in known] or \
+            [c for c in ranges.get(table, []) if c in known][:1]
+        columns += [c for c in tail if c not in columns]
+        if not columns:
+            continue
+        selected = _selected(sql, table, names)
+        if selected and len(set(selected) | set(columns)) <= 6:
+            columns += [c for c in selected if c in known and c not in columns and c != 'id']
+        if any(index[:len(columns)] == columns for index in _existing(conn, table)):
+            continue
+        name = 'idx_' + table + '_' + '_'.join(columns)
+        suggestions.append(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})")
+    return suggestions
+
+
+def audit(conn, statements, verify=False):
+    """[{key, sql, plan, flags, suggestions, verified, error}] in source order"""
+    results = []
+    for key, _, sql in statements:
+        entry = {'key': key, 'sql': sql, 'plan': [], 'flags': [], 'suggestions': [],
+                 'hints': [], 'remaining': None, 'error': None}
+        results.append(entry)
+        if sql is None:
+            entry['error'] = 'SQL built dynamically; could not resolve'
+            continue
+        try:
+            entry['plan'] = plan(conn, sql)
+        except sqlite3.Error as e:
+            entry['error'] = str(e)
+            continue
+        entry['flags'] = flags_for(sql, entry['plan'])
+        entry['suggestions'] = suggest(conn, sql, entry['flags'])
+        tables = sorted(set(aliases(sql).values()))
+        if any(kind == 'like-wildcard' for kind, _ in entry['flags']):
+            fts = [FTS_TABLES[t] for t in tables if t in FTS_TABLES]
+            entry['hints'].append('replace LIKE \'%...%\' with an FTS5 MATCH'
+                                  + (f" on {', '.join(fts)}" if fts else ' (needs an FTS5 table)'))
+        if verify and entry['suggestions']:
+            conn.execute('SAVEPOINT verify')
+            for statement in entry['suggestions']:
+                conn.execute(statement)
+            entry['remaining'] = flags_for(sql, plan(conn, sql))
+            conn.execute('ROLLBACK TO verify')
+            conn.execute('RELEASE verify')
+    return results
+
+
+def format_report(results):
+    out = []
+    for entry in results:
+        out.append(f"== {entry['key']}")
+        out.append(f"   {entry['sql'] or '?'}")
+        if entry['error']:
+            out.append(f"   ERROR {entry['error']}")
+        out.extend(f"   | {line}" for line in entry['plan'])
+        out.extend(f"   ! {kind} {what}" for kind, what in entry['flags'])
+        out.extend(f"   + {statement}" for statement in entry['suggestions'])
+        out.extend(f"   ~ {hint}" for hint in entry['hints'])
+        if entry['remaining'] is not None:
+            left = ', '.join(f"{kind} {what}" for kind, what in entry['remaining']) or 'none'
+            out.append(f"   = flags left with suggestions: {left}")
+        out.append('')
+    return '\n'.join(out)
+
+
+def parse_flags(text):
+    """{key: {flag lines}} from a report written by format_report"""
+    flags = {}
+    key = None
+    for line in text.splitlines():
+        if line.startswith('== '):
+            key = line[3:]
+            flags[key] = set()
+        elif key and line.startswith('   ! '):
+            flags[key].add(line[5:])
+    return flags
+
+
+def regressions(results, baseline_text):
+    baseline = parse_flags(baseline_text)
+    current = parse_flags(format_report(results))
+    return {key: sorted(flags - baseline.get(key, set()))
+            for key, flags in current.items() if flags - baseline.get(key, set())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit query plans of the SQL in src/index.tsx')
+    parser.add_argument('--db', metavar='PATH',
+                        help='migrated, populated SQLite file (default: local D1 database)')
+    parser.add_argument('--source', default=SOURCE, help='TypeScript file to scan')
+    parser.add_argument('--analyze', action='store_true',
+                        help='run ANALYZE first so plans use table statistics (rolled back)')
+    parser.add_argument('--verify', action='store_true',
+                        help='create the suggested indexes and re-plan (rolled back)')
+    parser.add_argument('--out', metavar='FILE', help='write the report here instead of stdout')
+    parser.add_argument('--check', metavar='BASELINE',
+                        help='exit 1 if any statement gained a flag compared to this report')
+    args = parser.parse_args()
+
+    statements = extract_statements(args.source)
+    conn = connect_local(args.db)
+    try:
+        conn.execute('BEGIN')
+        try:
+            if args.analyze:
+                conn.execute('ANALYZE')
+            results = audit(conn, statements, args.verify)
+        finally:
+            conn.execute('ROLLBACK')
+    finally:
+        conn.close()
+
+    report = format_report(results)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(report)
+    elif not args.check:
+        print(report)
+
+    flagged = sum(1 for entry in results if entry['flags'])
+    errors = sum(1 for entry in results if entry['error'])
+    suggested = sum(len(entry['suggestions']) for entry in results)
+    print(f"🔎 {len(results)} statements, {flagged} flagged, {errors} errors, "
+          f"{suggested} index suggestions", file=sys.stderr)
+
+    if args.check:
+        with open(args.check, encoding='utf-8') as f:
+            new = regressions(results, f.read())
+        for key, flags in new.items():
+            for flag in flags:
+                print(f"❌ {key}: {flag}", file=sys.stderr)
+        if new:
+            sys.exit(1)
+        print(f"✅ No plan regressions against {args.check}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Precompute events.related_events
+
+Each event is scored against its candidates: the CANDIDATES best text
+matches (events sharing a term), the CANDIDATES nearest events within
+GEO_CANDIDATE_KM and the CANDIDATES closest in year within YEAR_WINDOW,
+so events without text overlap still get their neighbours:
+
+    score = TEXT_WEIGHT * cosine(tf-idf)
+          + GEO_WEIGHT  * exp(-distance_km / GEO_SCALE_KM)
+          + YEAR_WEIGHT * exp(-|year difference| / YEAR_SCALE)
+
+TF-IDF vectors come from keywords (counted twice), title and
+full_description, tokenized like the search index; terms found in more
+than MAX_DF_RATIO of all events are dropped as stop words. Cosines are
+computed as a sparse product through an inverted index, BLOCK_ROWS
+events at a time, so memory stays bounded by one block of score
+accumulators. Nearby events come from an in-memory grid of GRID_DEG
+degree cells (wrapping at the antimeridian), close years from a sorted
+list. The top RELATED_K ids go into related_events as a JSON array, all
+in one transaction.
+
+Incremental runs recompute only events whose features changed since
+their last computation (events.related_hash, migrations/0014), the
+events that listed one of them, and their new neighbours. The hash is
+stored for empty lists too; they are retried only when some event
+changed, since nothing else can give them a neighbour. IDF drift from
+the changed rows is ignored until the next --full run.
+"""
+import argparse
+import bisect
+import hashlib
+import heapq
+import json
+import math
+import time
+from operator import itemgetter
+
+from event_loader import PROJECT_DIR, execute_sql_file, iter_chunks, query_json, sql_literal
+from local_db import connect_shared
+from load_metrics import metrics
+from search_index import tokenize
+from spatial_index import EARTH_RADIUS_KM, haversine_km
+
+RELATED_K = 5
+CANDIDATES = 50
+BLOCK_ROWS = 1000
+MAX_DF_RATIO = 0.2
+
+TEXT_WEIGHT = 0.7
+GEO_WEIGHT = 0.2
+YEAR_WEIGHT = 0.1
+GEO_SCALE_KM = 1000.0
+YEAR_SCALE = 500.0
+GEO_CANDIDATE_KM = 2 * GEO_SCALE_KM
+YEAR_WINDOW = 2 * YEAR_SCALE
+GRID_DEG = 5.0
+
+FEATURE_COLUMNS = ('title', 'keywords', 'full_description', 'latitude', 'longitude', 'year')
+FEATURES_SQL = ('SELECT id, title, keywords, full_description, latitude, longitude, year, '
+                'related_events, related_hash FROM events ORDER BY id')
+
+
+def feature_hash(event):
+    payload = json.dumps([event.get(col) for col in FEATURE_COLUMNS], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _keywords(value):
+    try:
+        words = json.loads(value) if value else []
+    except ValueError:
+        return [value]
+    return words if isinstance(words, list) else [value]
+
+
+def event_terms(event):
+    terms = []
+    for keyword in _keywords(event.get('keywords')):
+        terms.extend(tokenize(str(keyword)) * 2)
+    terms.extend(tokenize(event.get('title')))
+    terms.extend(tokenize(event.get('full_description')))
+    return terms
+
+
+def tfidf_vectors(events):
+    """{id: {term: weight}} with L2-normalized, log-scaled tf-idf weights"""
+    counts = {}
+    df = {}
+    for event in events:
+        tf = {}
+        for term in event_terms(event):
+            tf[term] = tf.get(term, 0) + 1
+        counts[event['id']] = tf
+        for term in tf:
+            df[term] = df.get(term, 0) + 1
+
+    n = len(events)
+    max_df = max(2, n * MAX_DF_RATIO)
+    vectors = {}
+    for event_id, tf in counts.items():
+        vec = {term: (1 + math.log(c)) * math.log((1 + n) / (1 + df[term]))
+               for term, c in tf.items() if df[term] <= max_df}
+        norm = math.sqrt(sum(w * w for w in vec.values()))
+        vectors[event_id] = {t: w / norm for t, w in vec.items() if w} if norm else {}
+    return vectors
+
+
+def inverted(vectors):
+    postings = {}
+    for event_id, vec in vectors.items():
+        for term, weight in vec.items():
+            postings.setdefault(term, []).append((event_id, weight))
+    return postings
+
+
+def _proximity(a, b):
+    score = 0.0
+    if None not in (a['latitude'], a['longitude'], b['latitude'], b['longitude']):
+        distance = haversine_km(a['latitude'], a['longitude'], b['latitude'], b['longitude'])
+        score += GEO_WEIGHT * math.exp(-distance / GEO_SCALE_KM)
+    if a['year'] is not None and b['year'] is not None:
+        score += YEAR_WEIGHT * math.exp(-abs(a['year'] - b['year']) / YEAR_SCALE)
+    return score
+
+
+def _cell(lat, lon):
+    return int((lat + 90.0) // GRID_DEG), int((lon + 180.0) // GRID_DEG) % int(360 / GRID_DEG)
+
+
+def geo_grid(events):
+    """{grid cell: [(id, latitude, longitude)]} of events with a position"""
+    grid = {}
+    for e in events:
+        if e['latitude'] is not None and e['longitude'] is not None:
+            grid.setdefault(_cell(e['latitude'], e['longitude']), []).append(
+                (e['id'], e['latitude'], e['longitude']))
+    return grid
+
+
+def geo_candidates(event, grid, limit=CANDIDATES, radius_km=GEO_CANDIDATE_KM):
+    """Ids of the `limit` nearest events within radius_km"""
+    lat, lon = event['latitude'], event['longitude']
+    if lat is None or lon is None:
+        return []
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-9 else min(180.0, dlat / cos_lat)
+    columns = int(360 / GRID_DEG)
+    low, high = _cell(max(-90.0, lat - dlat), lon - dlon), _cell(min(89.999, lat + dlat), lon + dlon)
+    span = columns if dlon >= 180.0 else (high[1] - low[1]) % columns + 1
+    hits = []
+    for row in range(low[0], high[0] + 1):
+        for step in range(span):
+            for other, olat, olon in grid.get((row, (low[1] + step) % columns), ()):
+                if other != event['id']:
+                    distance = haversine_km(lat, lon, olat, olon)
+                    if distance <= radius_km:
+                        hits.append((distance, other))
+    return [other for _, other in heapq.nsmallest(limit, hits)]
+
+
+def timeline(events):
+    """(years, ids) of events with a year, sorted by year"""
+    pairs = sorted((e['year'], e['id']) for e in events if e['year'] is not None)
+    return [year for year, _ in pairs], [event_id for _, event_id in pairs]
+
+
+def year_candidates(event, years, limit=CANDIDATES, window=YEAR_WINDOW):
+    """Ids of the `limit` events closest in year within `window` years"""
+    year = event['year']
+    if year is None:
+        return []
+    years, ids = years
+    right = bisect.bisect_left(years, year)
+    left = right - 1
+    found = []
+    while len(found) < limit:
+        gap_left = year - years[left] if left >= 0 else None
+        gap_right = years[right] - year if right < len(years) else None
+        if gap_right is not None and (gap_left is None or gap_right <= gap_left):
+            gap, other, right = gap_right, ids[right], right + 1
+        elif gap_left is not None:
+            gap, other, left = gap_left, ids[left], left - 1
+        else:
+            break
+        if gap > window:
+            break
+        if other != event['id']:
+            found.append(other)
+    return found
+
+
+def top_related(targets, by_id, vectors, postings, k=RELATED_K, block_rows=BLOCK_ROWS,
+                grid=None, years=None):
+    """Yield (id, [related ids]) for every target id, one block at a time"""
+    grid = geo_grid(by_id.values()) if grid is None else grid
+    years = timeline(by_id.values()) if years is None else years
+    for block in iter_chunks(targets, block_rows):
+        with metrics.stage('related_score'):
+            for event_id in block:
+                dots = {}
+                for term, weight in vectors.get(event_id, {}).items():
+                    for other, other_weight in postings[term]:
+                        if other != event_id:
+                            dots[other] = dots.get(other, 0.0) + weight * other_weight
+                event = by_id[event_id]
+                candidates = {other for other, _ in
+                              heapq.nlargest(CANDIDATES, dots.items(), key=itemgetter(1))}
+                candidates.update(geo_candidates(event, grid))
+                candidates.update(year_candidates(event, years))
+                scored = ((TEXT_WEIGHT * dots.get(other, 0.0) + _proximity(event, by_id[other]), other)
+                          for other in candidates)
+                yield event_id, [other for _, other in heapq.nlargest(k, scored)]
+
+
+def plan_targets(events, full=False):
+    """Ids whose related_events must be recomputed, plus ids that changed"""
+    if full:
+        return [e['id'] for e in events], {e['id'] for e in events}
+    changed = {e['id'] for e in events if e['related_hash'] != feature_hash(e)}
+    ids = {e['id'] for e in events}
+    targets = set(changed)
+    for event in events:
+        listed = set(json.loads(event['related_events'] or '[]'))
+        # Lists that point at a changed or deleted event, and empty ones
+        # that a changed event may have given a neighbour
+        if listed & changed or listed - ids or (changed and not listed):
+            targets.add(event['id'])
+    return sorted(targets), changed
+
+
+def compute(events, full=False, k=RELATED_K):
+    """Return {id: (related ids, feature hash)} for the events that need it"""
+    by_id = {e['id']: e for e in events}
+    targets, changed = plan_targets(events, full)
+    if not targets:
+        return {}
+    vectors = tfidf_vectors(events)
+    postings = inverted(vectors)
+    grid = geo_grid(events)
+    years = timeline(events)
+
+    results = {}
+    neighbours = set()
+    for event_id, related in top_related(targets, by_id, vectors, postings, k,
+                                         grid=grid, years=years):
+        results[event_id] = related
+        if event_id in changed:
+            neighbours.update(related)
+    # New neighbours of changed events may now rank them in their top k
+    extra = sorted(neighbours - results.keys())
+    for event_id, related in top_related(extra, by_id, vectors, postings, k,
+                                         grid=grid, years=years):
+        results[event_id] = related
+    return {event_id: (related, feature_hash(by_id[event_id]))
+            for event_id, related in results.items()}
+
+
+UPDATE_SQL = 'UPDATE events SET related_events = ?, related_hash = ? WHERE id = ?'
+
+
+def _params(results):
+    return [(json.dumps(related), digest, event_id)
+            for event_id, (related, digest) in sorted(results.items())]
+
+
+def fetch_sqlite(conn):
+    cursor = conn.execute(FEATURES_SQL)
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+
+def update_sqlite(conn, full=False, in_transaction=False):
+    """Recompute and write related_events; returns the number of rows updated"""
+    start = time.perf_counter()
+    results = compute(fetch_sqlite(conn), full)
+    if not in_transaction:
+        conn.execute('BEGIN IMMEDIATE')
+    try:
+        with metrics.stage('db_execute'):
+            conn.executemany(UPDATE_SQL, _params(results))
+    except BaseException:
+        if not in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    if not in_transaction:
+        conn.execute('COMMIT')
+    metrics.add_time('related_events', time.perf_counter() - start)
+    return len(results)
+
+
+def update_wrangler(local=True, cwd=PROJECT_DIR, full=False, batch_rows=500):
+    """Recompute through wrangler; all updates go out as one SQL file"""
+    results = compute(query_json(FEATURES_SQL, local, cwd), full)
+    statements = []
+    for chunk in iter_chunks(_params(results), batch_rows):
+        statements.extend(
+            f"UPDATE events SET related_events = {sql_literal(related)}, "
+            f"related_hash = {sql_literal(digest)} WHERE id = {event_id};"
+            for related, digest, event_id in chunk
+        )
+    if statements:
+        result = execute_sql_file('\n'.join(statements) + '\n', local, cwd)
+        if result.returncode != 0:
+            raise RuntimeError(f"Writing related_events failed: {result.stderr.strip()}")
+    return len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute events.related_events')
+    parser.add_argument('--db', metavar='PATH',
+                        help='use this SQLite file directly (no wrangler)')
+    parser.add_argument('--direct', action='store_true',
+                        help='use the local D1 SQLite file directly (auto-detected)')
+    parser.add_argument('--remote', action='store_true',
+                        help='update the remote D1 database instead of --local')
+    parser.add_argument('--full', action='store_true',
+                        help='recompute every event instead of only the changed ones')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.db or args.direct:
+        conn = connect_shared(args.db)
+        try:
+            count = update_sqlite(conn, args.full)
+        finally:
+            conn.close()
+    else:
+        count = update_wrangler(not args.remote, full=args.full)
+    print(f"✅ related_events recomputed for {count} events in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Offline inverted index for document and event search
+
+Tokenizes the searchable columns of documents and events with German
+normalization (lowercasing, umlaut/ß folding, a light suffix stemmer) and
+writes a compact, versioned postings file:
+
+    b'WBSI' | format version (u16) | header length (u32) | JSON header | postings
+
+The header lists, per table, every term with its document frequency and
+the slice of the postings blob holding its ids. Ids are sorted and stored
+as varint-encoded deltas. It also keeps each row's content hash, so a
+rebuild only re-tokenizes rows that changed and drops rows that are gone.
+The file goes to public/data/search/, a build output ignored by git.
+
+Usage:
+    python3 search_index.py --db PATH            build from a SQLite file
+    python3 search_index.py [--remote]           build through wrangler
+    python3 search_index.py --query "Pyramide"   search the built index
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import struct
+import time
+import unicodedata
+
+from event_loader import PROJECT_DIR, query_json
+from local_db import connect_readonly
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_PATH = os.path.join(ROOT_DIR, 'public', 'data', 'search', 'index.bin')
+
+MAGIC = b'WBSI'
+FORMAT_VERSION = 1
+
+# Searchable columns per table
+INDEX_SOURCES = {
+    'documents': ('title', 'description', 'author', 'tags'),
+    'events': ('title', 'description', 'full_description', 'keywords'),
+}
+
+FOLD = str.maketrans({'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss'})
+WORD = re.compile(r'\w+')
+MIN_TOKEN = 2
+
+
+def fold(text):
+    """Lowercase, fold umlauts/ß and strip any remaining accents"""
+    text = text.lower().translate(FOLD)
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def stem(word):
+    """Light German stemmer: strips common inflection suffixes only"""
+    if word.isdigit():
+        return word
+    # Step 1: plural and case endings
+    if len(word) > 5 and word.endswith('ern'):
+        word = word[:-3]
+    elif len(word) > 4 and word[-2:] in ('em', 'en', 'er', 'es'):
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith('e'):
+        word = word[:-1]
+    elif len(word) > 3 and word.endswith('s') and word[-2] in 'bdfghklmnrt':
+        word = word[:-1]
+    # Step 2: comparative/superlative endings
+    if len(word) > 5 and word.endswith('est'):
+        word = word[:-3]
+    elif len(word) > 4 and word[-2:] in ('er', 'en'):
+        word = word[:-2]
+    elif len(word) > 4 and word.endswith('st') and word[-3] in 'bdfghklmnt':
+        word = word[:-2]
+    return word
+
+
+def tokenize(text):
+    """Normalized terms of `text` in order, duplicates included"""
+    if not text:
+        return []
+    return [stem(word) for word in WORD.findall(fold(text)) if len(word) >= MIN_TOKEN]
+
+
+def row_hash(row, columns):
+    payload = json.dumps([row.get(col) for col in columns], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def encode_postings(ids):
+    """Sorted ids -> varint-encoded deltas"""
+    out = bytearray()
+    last = 0
+    for value in ids:
+        delta = value - last
+        last = value
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_postings(data):
+    ids = []
+    value = shift = last = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        last += value
+        ids.append(last)
+        value = shift = 0
+    return ids
+
+
+class SearchIndex:
+    """In-memory form: per table, {term: set(ids)} plus {id: content hash}"""
+
+    def __init__(self):
+        self.version = None
+        self.built_at = None
+        self.postings = {table: {} for table in INDEX_SOURCES}
+        self.docs = {table: {} for table in INDEX_SOURCES}
+
+    def remove(self, table, ids):
+        """Drop `ids` from every posting list of `table`"""
+        if not ids:
+            return
+        postings = self.postings[table]
+        for term in list(postings):
+            postings[term] -= ids
+            if not postings[term]:
+                del postings[term]
+
+    def add(self, table, row_id, terms):
+        postings = self.postings[table]
+        for term in set(terms):
+            postings.setdefault(term, set()).add(row_id)
+
+    def lookup(self, table, term):
+        return self.postings[table].get(term, set())
+
+    def search(self, table, query):
+        """Ids of `table` rows containing every term of `query`"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Intersect starting from the rarest term
+        lists = sorted((self.lookup(table, term) for term in set(terms)), key=len)
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result &= ids
+        return sorted(result)
+
+
+def read_index(path):
+    """Load an index file; returns an empty SearchIndex if there is none"""
+    index = SearchIndex()
+    if not os.path.exists(path):
+        return index
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a search index")
+    version, header_len = struct.unpack_from('<HI', data, 4)
+    if version != FORMAT_VERSION:
+        # Older format: rebuild from scratch
+        return index
+    start = 4 + struct.calcsize('<HI')
+    header = json.loads(data[start:start + header_len].decode('utf-8'))
+    blob = memoryview(data)[start + header_len:]
+    index.version = header['version']
+    index.built_at = header['built_at']
+    for table, section in header['tables'].items():
+        if table not in INDEX_SOURCES:
+            continue
+        index.docs[table] = {int(k): v for k, v in section['docs'].items()}
+        index.postings[table] = {
+            term: set(decode_postings(blob[offset:offset + length]))
+            for term, _, offset, length in section['terms']
+        }
+    return index
+
+
+def write_index(index, path):
+    """Serialize `index`; the version is a hash of the postings content"""
+    blob = bytearray()
+    tables = {}
+    for table in INDEX_SOURCES:
+        terms = []
+        for term in sorted(index.postings[table]):
+            ids = sorted(index.postings[table][term])
+            data = encode_postings(ids)
+            terms.append([term, len(ids), len(blob), len(data)])
+            blob += data
+        tables[table] = {
+            'rows': len(index.docs[table]),
+            'docs': {str(k): v for k, v in sorted(index.docs[table].items())},
+            'terms': terms,
+        }
+    index.version = hashlib.blake2b(
+        json.dumps(tables, sort_keys=True).encode('utf-8') + bytes(blob), digest_size=8
+    ).hexdigest()
+    index.built_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    header = json.dumps({'version': index.version, 'built_at': index.built_at, 'tables': tables},
+                        ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + struct.pack('<HI', FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(blob)
+    os.replace(tmp, path)
+
+
+def update_index(index, table, rows):
+    """Re-index changed rows of `table` and drop missing ones; returns stats"""
+    columns = INDEX_SOURCES[table]
+    docs = index.docs[table]
+    current = {}
+    changed = []
+    for row in rows:
+        digest = row_hash(row, columns)
+        current[row['id']] = digest
+        if docs.get(row['id']) != digest:
+            changed.append(row)
+
+    stale = {row['id'] for row in changed if row['id'] in docs} | (docs.keys() - current.keys())
+    index.remove(table, stale)
+    for row in changed:
+        terms = []
+        for col in columns:
+            terms.extend(tokenize(row.get(col)))
+        index.add(table, row['id'], terms)
+    index.docs[table] = current
+    return {'rows': len(current), 'indexed': len(changed),
+            'removed': len(docs.keys() - current.keys()), 'terms': len(index.postings[table])}
+
+
+def _select(table):
+    return f"SELECT id, {', '.join(INDEX_SOURCES[table])} FROM {table} ORDER BY id"
+
+
+def fetch_sqlite(conn, table):
+    columns = ('id',) + INDEX_SOURCES[table]
+    return [dict(zip(columns, row)) for row in conn.execute(_select(table))]
+
+
+def fetch_wrangler(table, local=True, cwd=PROJECT_DIR):
+    return query_json(_select(table), local, cwd)
+
+
+def build(fetch, path=INDEX_PATH, full=False):
+    """Update the index at `path` from fetch(table) rows; returns stats per table"""
+    index = SearchIndex() if full else read_index(path)
+    stats = {table: update_index(index, table, fetch(table)) for table in INDEX_SOURCES}
+    write_index(index, path)
+    return index, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query the offline search index')
+    parser.add_argument('--db', metavar='PATH',
+                        help='read from this SQLite file directly (no wrangler)')
+    parser.add_argument('--direct', action='store_true',
+                        help='read straight from the local D1 SQLite file (auto-detected)')
+    parser.add_argument('--remote', action='store_true',
+                        help='read the remote D1 database instead of --local')
+    parser.add_argument('--out', default=INDEX_PATH, help='index file')
+    parser.add_argument('--full', action='store_true', help='ignore the existing index and rebuild')
+    parser.add_argument('--query', metavar='TEXT', help='search the existing index instead of building')
+    parser.add_argument('--table', choices=list(INDEX_SOURCES), default='documents')
+    args = parser.parse_args()
+
+    if args.query:
+        index = read_index(args.out)
+        ids = index.search(args.table, args.query)
+        print(f"🔎 {args.table} matching {args.query!r} (terms {tokenize(args.query)}): {ids}")
+        return
+
+    start = time.perf_counter()
+    if args.db or args.direct:
+        conn = connect_readonly(args.db)
+        try:
+            index, stats = build(lambda table: fetch_sqlite(conn, table), args.out, args.full)
+        finally:
+            conn.close()
+    else:
+        index, stats = build(lambda table: fetch_wrangler(table, not args.remote), args.out, args.full)
+
+    for table, s in stats.items():
+        print(f"📚 {table:<10} {s['rows']:>7} rows, {s['indexed']} re-indexed, "
+              f"{s['removed']} removed, {s['terms']} terms")
+    print(f"✅ Index {index.version} written to {args.out} "
+          f"({os.path.getsize(args.out)} bytes) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for the multi-row INSERT statements in seed_*.sql
+
+Tokenizes a SQL file chunk by chunk and yields one row per VALUES tuple,
+so memory stays bounded by the largest single statement rather than the
+file. A statement's rows are held back until it parsed completely.
+Statements other than INSERT are skipped. Malformed INSERT statements
+raise SeedParseError, or are reported into an `errors` list and skipped
+up to the next `;` when one is passed.
+"""
+import re
+
+CHUNK_SIZE = 1024 * 1024
+# Characters a number or comment may still need to be told apart at a chunk end
+LOOKAHEAD = 3
+
+TOKEN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*(?:\n|\Z))
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<punct>[(),;*=])
+""", re.VERBOSE)
+
+
+class SeedParseError(ValueError):
+    pass
+
+
+class SeedRow:
+    """One VALUES tuple: source location, target table and column values"""
+
+    __slots__ = ('path', 'line', 'table', 'columns', 'values')
+
+    def __init__(self, path, line, table, columns, values):
+        self.path = path
+        self.line = line
+        self.table = table
+        self.columns = columns
+        self.values = values
+
+    def as_dict(self):
+        return dict(zip(self.columns, self.values))
+
+
+def iter_tokens(path, chunk_size=CHUNK_SIZE):
+    """Yield (kind, value, line) tokens; strings are unescaped, numbers typed
+
+    Characters that start no token come out as ('error', char, line).
+    """
+    line = 1
+    buf = ''
+    final = False
+    with open(path, 'r', encoding='utf-8') as f:
+        while not final:
+            chunk = f.read(chunk_size)
+            final = not chunk
+            buf += chunk
+            pos = 0
+            end = len(buf)
+            while pos < end:
+                m = TOKEN.match(buf, pos)
+                # Near the buffer end a token may continue in the next chunk:
+                # a number cut after '.', 'e' or the exponent sign, a '-' that
+                # starts a comment or number, an unmatched quote that opens a
+                # string, or a string cut inside an escaped ''
+                if not final and (
+                        (m is None and (buf[pos] == "'" or pos + LOOKAHEAD >= end))
+                        or (m and m.lastgroup != 'string' and m.end() + LOOKAHEAD > end)
+                        or (m and m.end() == end)
+                        or (m and m.lastgroup == 'string' and buf[m.end()] == "'")):
+                    break
+                if m is None:
+                    yield 'error', buf[pos], line
+                    line += buf[pos] == '\n'
+                    pos += 1
+                    continue
+                kind = m.lastgroup
+                text = m.group()
+                if kind == 'string':
+                    yield kind, text[1:-1].replace("''", "'"), line
+                elif kind == 'number':
+                    yield kind, float(text) if ('.' in text or 'e' in text.lower()) else int(text), line
+                elif kind == 'word':
+                    yield kind, text.upper() if text.upper() == 'NULL' else text, line
+                elif kind == 'punct':
+                    yield kind, text, line
+                line += text.count('\n')
+                pos = m.end()
+            buf = buf[pos:]
+
+
+def _value(kind, value):
+    if kind == 'word':
+        if value == 'NULL':
+            return None
+        upper = value.upper()
+        if upper in ('TRUE', 'FALSE'):
+            return int(upper == 'TRUE')
+    return value
+
+
+def _skip_statement(tokens):
+    for kind, value, _ in tokens:
+        if kind == 'punct' and value == ';':
+            return
+
+
+def _is(token, punct):
+    return token[0] == 'punct' and token[1] == punct
+
+
+def _read_tuple(tokens, path):
+    """Values of one tuple after its '('; returns (values, error, last token)
+
+    Values must be separated by single commas.
+    """
+    values = []
+    need_value = True
+    token = None
+    for token in tokens:
+        kind, value, line = token
+        if need_value:
+            if _is(token, ')') and not values:
+                return values, None, token
+            if kind in ('punct', 'error'):
+                return values, f"{path}:{line}: unexpected {value!r} in VALUES tuple", token
+            values.append(_value(kind, value))
+            need_value = False
+        elif _is(token, ')'):
+            return values, None, token
+        elif _is(token, ','):
+            need_value = True
+        else:
+            return values, f"{path}:{line}: expected ',' or ')' after a value, got {value!r}", token
+    return values, f"{path}: unterminated VALUES tuple at end of file", token
+
+
+def _read_values(tokens, path, columns):
+    """Tuples of one VALUES list up to its ';'; returns (rows, error, last token)
+
+    rows are (line, values) pairs; tuples must be separated by single
+    commas and the list may end at the end of the file.
+    """
+    rows = []
+    need_tuple = True
+    token = None
+    for token in tokens:
+        kind, value, line = token
+        if need_tuple:
+            if not _is(token, '('):
+                return rows, f"{path}:{line}: expected '(' in VALUES list, got {value!r}", token
+            values, error, token = _read_tuple(tokens, path)
+            if error is None and len(values) != len(columns):
+                error = f"{path}:{line}: {len(values)} values for {len(columns)} columns"
+            if error:
+                return rows, error, token
+            rows.append((line, tuple(values)))
+            need_tuple = False
+        elif _is(token, ';'):
+            return rows, None, token
+        elif _is(token, ','):
+            need_tuple = True
+        else:
+            return rows, f"{path}:{line}: expected ',' or ';' after a VALUES tuple, got {value!r}", token
+    if need_tuple:
+        return rows, f"{path}: VALUES list ends without a tuple", token
+    return rows, None, token
+
+
+def iter_rows(path, tables=None, chunk_size=CHUNK_SIZE, errors=None):
+    """Yield a SeedRow for every VALUES tuple of INSERT statements
+
+    `tables` limits the result to those table names (case-insensitive).
+    A statement's rows are only yielded once the whole statement parsed,
+    so a malformed statement contributes no rows at all.
+    """
+    wanted = {t.lower() for t in tables} if tables else None
+    tokens = iter_tokens(path, chunk_size)
+    statement = []
+
+    def fail(message, token=None):
+        if errors is None:
+            raise SeedParseError(message)
+        errors.append(message)
+        # The offending token may already be the statement's end
+        if token is None or not _is(token, ';'):
+            _skip_statement(tokens)
+
+    for token in tokens:
+        kind, value, line = token
+        if _is(token, ';'):
+            statement = []
+            continue
+        if not statement and _is(token, '('):
+            fail(f"{path}:{line}: VALUES tuple outside an INSERT statement")
+            continue
+        statement.append((kind, value))
+        if not (kind == 'word' and value.upper() == 'VALUES'):
+            continue
+
+        words = [v.upper() if k == 'word' else v for k, v in statement]
+        if not words or words[0] != 'INSERT' or 'INTO' not in words:
+            continue
+        into = words.index('INTO')
+        table = statement[into + 1][1]
+        columns = tuple(v for k, v in statement[into + 2:-1] if k == 'word')
+        statement = []
+
+        rows, error, last = _read_values(tokens, path, columns)
+        if error:
+            fail(error, last)
+            continue
+        if wanted is None or table.lower() in wanted:
+            for start_line, values in rows:
+                yield SeedRow(path, start_line, table, columns, values)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Spatial keys and R*Tree lookups for events
+
+The sync writes two derived columns for every event (migrations/0012):
+- geohash: 9 character base32 geohash (~5 m cells)
+- tile_key: web mercator quadkey at TILE_ZOOM; its first z characters are
+  the XYZ tile at zoom z, so a tile lookup is a prefix range scan
+
+Keys are computed for a whole batch at once, with NumPy when it is
+installed and a plain Python loop otherwise. The events_rtree table is
+kept in step by triggers; bbox() and nearby() query it.
+
+Usage:
+    python3 spatial_index.py --backfill          fill missing/stale keys
+    python3 spatial_index.py --bbox S W N E      events inside a box
+    python3 spatial_index.py --nearby LAT LON KM events within a radius
+"""
+import argparse
+import math
+
+from local_db import connect_local
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+GEOHASH_PRECISION = 9
+TILE_ZOOM = 16
+SPATIAL_COLUMNS = ('geohash', 'tile_key')
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+MAX_MERCATOR_LAT = 85.05112878
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _geohash_py(lat, lon, precision):
+    lat_bits = precision * 5 // 2
+    lon_bits = precision * 5 - lat_bits
+    lat_i = min(int((lat + 90.0) / 180.0 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    lon_i = min(int((lon + 180.0) / 360.0 * (1 << lon_bits)), (1 << lon_bits) - 1)
+    code = 0
+    for bit in range(precision * 5):
+        # Bits alternate starting with longitude, most significant first
+        if bit % 2 == 0:
+            lon_bits -= 1
+            code = (code << 1) | ((lon_i >> lon_bits) & 1)
+        else:
+            lat_bits -= 1
+            code = (code << 1) | ((lat_i >> lat_bits) & 1)
+    return ''.join(BASE32[(code >> shift) & 31] for shift in range(precision * 5 - 5, -1, -5))
+
+
+def _tile_xy(lat, lon, zoom):
+    n = 1 << zoom
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _quadkey_py(lat, lon, zoom):
+    x, y = _tile_xy(lat, lon, zoom)
+    return ''.join(str(((x >> i) & 1) + 2 * ((y >> i) & 1)) for i in range(zoom - 1, -1, -1))
+
+
+def _digits(codes, bits, count, alphabet):
+    """Split integer codes into `count` digits of `bits` bits each"""
+    table = np.array(list(alphabet))
+    shifts = np.arange((count - 1) * bits, -1, -bits, dtype=np.int64)
+    chars = table[(codes[:, None] >> shifts) & ((1 << bits) - 1)]
+    return [''.join(row) for row in chars]
+
+
+def _geohash_np(lat, lon, precision):
+    lat_bits = precision * 5 // 2
+    lon_bits = precision * 5 - lat_bits
+    lat_i = np.minimum(((lat + 90.0) / 180.0 * (1 << lat_bits)).astype(np.int64), (1 << lat_bits) - 1)
+    lon_i = np.minimum(((lon + 180.0) / 360.0 * (1 << lon_bits)).astype(np.int64), (1 << lon_bits) - 1)
+    code = np.zeros(len(lat), dtype=np.int64)
+    for bit in range(precision * 5):
+        if bit % 2 == 0:
+            lon_bits -= 1
+            code = (code << 1) | ((lon_i >> lon_bits) & 1)
+        else:
+            lat_bits -= 1
+            code = (code << 1) | ((lat_i >> lat_bits) & 1)
+    return _digits(code, 5, precision, BASE32)
+
+
+def _quadkey_np(lat, lon, zoom):
+    n = 1 << zoom
+    lat = np.radians(np.clip(lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = np.clip(((lon + 180.0) / 360.0 * n).astype(np.int64), 0, n - 1)
+    y = np.clip(((1.0 - np.arcsinh(np.tan(lat)) / np.pi) / 2.0 * n).astype(np.int64), 0, n - 1)
+    code = np.zeros(len(x), dtype=np.int64)
+    for i in range(zoom - 1, -1, -1):
+        code = (code << 2) | (((y >> i) & 1) << 1) | ((x >> i) & 1)
+    return _digits(code, 2, zoom, '0123')
+
+
+def spatial_keys(coords, precision=GEOHASH_PRECISION, zoom=TILE_ZOOM):
+    """(geohash, tile_key) for every (latitude, longitude) pair of a batch
+
+    Pairs with a missing coordinate get (None, None).
+    """
+    coords = list(coords)
+    valid = [i for i, (lat, lon) in enumerate(coords) if lat is not None and lon is not None]
+    keys = [(None, None)] * len(coords)
+    if not valid:
+        return keys
+    if np is not None:
+        points = np.array([coords[i] for i in valid], dtype=np.float64)
+        lat, lon = points[:, 0], points[:, 1]
+        pairs = zip(_geohash_np(lat, lon, precision), _quadkey_np(lat, lon, zoom))
+    else:
+        pairs = ((_geohash_py(coords[i][0], coords[i][1], precision),
+                  _quadkey_py(coords[i][0], coords[i][1], zoom)) for i in valid)
+    for i, pair in zip(valid, pairs):
+        keys[i] = pair
+    return keys
+
+
+def event_spatial_keys(events):
+    """spatial_keys() for a batch of events (dicts or EventRecords)"""
+    return spatial_keys((event.get('latitude'), event.get('longitude')) for event in events)
+
+
+def tile_prefix(z, x, y):
+    """Quadkey prefix selecting the tile_key values inside XYZ tile z/x/y"""
+    return ''.join(str(((x >> i) & 1) + 2 * ((y >> i) & 1)) for i in range(z - 1, -1, -1))
+
+
+def bbox(conn, south, west, north, east):
+    """Events whose point lies inside the box, via events_rtree"""
+    return conn.execute(
+        'SELECT e.id, e.title, e.latitude, e.longitude FROM events_rtree r '
+        'JOIN events e ON e.id = r.id '
+        'WHERE r.min_lat >= ? AND r.max_lat <= ? AND r.min_lon >= ? AND r.max_lon <= ? '
+        'ORDER BY e.id',
+        (south, north, west, east),
+    ).fetchall()
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def nearby(conn, lat, lon, radius_km):
+    """Events within `radius_km`, nearest first: R*Tree box, then exact distance
+
+    The box is not split at the antimeridian, so lookups within the
+    radius of ±180° longitude miss the far side.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-9 else min(180.0, dlat / cos_lat)
+    hits = []
+    for event_id, title, elat, elon in bbox(conn, lat - dlat, lon - dlon, lat + dlat, lon + dlon):
+        distance = haversine_km(lat, lon, elat, elon)
+        if distance <= radius_km:
+            hits.append((distance, event_id, title))
+    return sorted(hits)
+
+
+def backfill(conn, batch_rows=500):
+    """Compute keys for rows where they are missing or stale; returns count"""
+    rows = conn.execute('SELECT id, latitude, longitude, geohash, tile_key FROM events').fetchall()
+    keys = spatial_keys((lat, lon) for _, lat, lon, _, _ in rows)
+    changed = [(gh, tk, row[0]) for row, (gh, tk) in zip(rows, keys) if (row[3], row[4]) != (gh, tk)]
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        for start in range(0, len(changed), batch_rows):
+            conn.executemany('UPDATE events SET geohash = ?, tile_key = ? WHERE id = ?',
+                             changed[start:start + batch_rows])
+        # Rows written before the triggers existed
+        conn.execute(
+            'INSERT INTO events_rtree (id, min_lat, max_lat, min_lon, max_lon) '
+            'SELECT id, latitude, latitude, longitude, longitude FROM events '
+            'WHERE id NOT IN (SELECT id FROM events_rtree)'
+        )
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+    return len(changed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spatial keys and R*Tree lookups for events')
+    parser.add_argument('--db', metavar='PATH',
+                        help='SQLite file (default: auto-detect under .wrangler/state)')
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--backfill', action='store_true',
+                        help='fill missing or stale geohash/tile_key values')
+    action.add_argument('--bbox', nargs=4, type=float, metavar=('SOUTH', 'WEST', 'NORTH', 'EAST'))
+    action.add_argument('--nearby', nargs=3, type=float, metavar=('LAT', 'LON', 'KM'))
+    args = parser.parse_args()
+
+    conn = connect_local(args.db)
+    try:
+        if args.backfill:
+            count = backfill(conn)
+            print(f"✅ Spatial keys updated for {count} events "
+                  f"({'numpy' if np is not None else 'python'} backend)")
+        elif args.bbox:
+            rows = bbox(conn, *args.bbox)
+            for event_id, title, lat, lon in rows:
+                print(f"📍 {event_id:>6}  {lat:>9.4f} {lon:>10.4f}  {title}")
+            print(f"\n🗺️  {len(rows)} events in box")
+        else:
+            hits = nearby(conn, *args.nearby)
+            for distance, event_id, title in hits:
+                print(f"📍 {event_id:>6}  {distance:>8.1f} km  {title}")
+            print(f"\n🗺️  {len(hits)} events within {args.nearby[2]} km")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
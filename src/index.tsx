@@ -15,6 +15,32 @@ app.use('/api/*', cors())
 // Serve static files
 app.use('/static/*', serveStatic({ root: './public' }))
 
+// Precomputed events aggregate from stats_materialized (see materialized_stats.py);
+// null when it has not been built yet, so callers fall back to the live query
+async function readMaterialized(c: any, name: string): Promise<{ payload: any, etag: string } | null> {
+  try {
+    const row: any = await c.env.DB.prepare(`
+      SELECT payload, version FROM stats_materialized WHERE name = ?
+    `).bind(name).first()
+    if (!row) return null
+    return { payload: JSON.parse(row.payload), etag: `"${name}-${row.version}"` }
+  } catch (error) {
+    return null
+  }
+}
+
+// Set the ETag of a response built only from `materialized`; returns a 304
+// response when the client's If-None-Match already names that version
+function notModified(c: any, materialized: { etag: string }): Response | null {
+  c.header('ETag', materialized.etag)
+  const match = c.req.header('If-None-Match') || ''
+  const tags = match.split(',').map((tag: string) => tag.trim().replace(/^W\//, ''))
+  if (match.trim() === '*' || tags.includes(materialized.etag)) {
+    return c.body(null, 304)
+  }
+  return null
+}
+
 // ===== Authentication API =====
 
 // Register new user (simplified: only username + password)
@@ -421,10 +447,15 @@ app.delete('/api/admin/users/:id', adminMiddleware, async (c) => {
 // Get admin stats (admin only)
 app.get('/api/admin/stats', adminMiddleware, async (c) => {
   try {
+    // users, chats and messages are written here, so they are counted live;
+    // only the events total (owned by the sync) comes from stats_materialized
     const userCount = await c.env.DB.prepare(`SELECT COUNT(*) as count FROM users`).first()
     const chatCount = await c.env.DB.prepare(`SELECT COUNT(*) as count FROM chats`).first()
     const messageCount = await c.env.DB.prepare(`SELECT COUNT(*) as count FROM messages`).first()
-    const eventCount = await c.env.DB.prepare(`SELECT COUNT(*) as count FROM events`).first()
+    const materialized = await readMaterialized(c, 'event_total')
+    const eventCount = materialized
+      ? { count: materialized.payload }
+      : await c.env.DB.prepare(`SELECT COUNT(*) as count FROM events`).first()
     
     return c.json({
       success: true,
@@ -453,7 +484,8 @@ app.get('/api/events', async (c) => {
 
     let sql = `
       SELECT id, title, description, latitude, longitude, category, 
-             event_type, year, date_text, icon_type, image_url, related_document_id
+             event_type, year, date_text, icon_type, image_url, image_thumbnail_url,
+             related_document_id
       FROM events 
       WHERE 1=1
     `
@@ -493,32 +525,37 @@ app.get('/api/events', async (c) => {
   }
 })
 
-// Get single event
-app.get('/api/events/:id', async (c) => {
-  const id = c.req.param('id')
-  
+// Get event counts per year for the timeline
+app.get('/api/events/timeline', async (c) => {
   try {
-    const result = await c.env.DB.prepare(`
-      SELECT e.*, d.title as document_title, d.file_path as document_path
-      FROM events e
-      LEFT JOIN documents d ON e.related_document_id = d.id
-      WHERE e.id = ?
-    `).bind(id).first()
-
-    if (!result) {
-      return c.json({ success: false, error: 'Event not found' }, 404)
+    const materialized = await readMaterialized(c, 'event_years')
+    if (materialized) {
+      return notModified(c, materialized) || c.json({ success: true, years: materialized.payload })
     }
 
-    return c.json({ success: true, event: result })
+    const result = await c.env.DB.prepare(`
+      SELECT year, COUNT(*) as count
+      FROM events 
+      WHERE year IS NOT NULL 
+      GROUP BY year 
+      ORDER BY year
+    `).all()
+    
+    return c.json({ success: true, years: result.results || [] })
   } catch (error) {
-    console.error('Error fetching event:', error)
-    return c.json({ success: false, error: 'Failed to fetch event' }, 500)
+    console.error('Error fetching timeline:', error)
+    return c.json({ success: false, years: [] }, 500)
   }
 })
 
 // Get event categories
 app.get('/api/events/categories', async (c) => {
   try {
+    const materialized = await readMaterialized(c, 'event_categories')
+    if (materialized) {
+      return notModified(c, materialized) || c.json({ success: true, categories: materialized.payload })
+    }
+
     const result = await c.env.DB.prepare(`
       SELECT DISTINCT category, COUNT(*) as count
       FROM events 
@@ -537,6 +574,11 @@ app.get('/api/events/categories', async (c) => {
 // Get event types
 app.get('/api/events/types', async (c) => {
   try {
+    const materialized = await readMaterialized(c, 'event_types')
+    if (materialized) {
+      return notModified(c, materialized) || c.json({ success: true, types: materialized.payload })
+    }
+
     const result = await c.env.DB.prepare(`
       SELECT DISTINCT event_type, COUNT(*) as count
       FROM events 
@@ -552,6 +594,29 @@ app.get('/api/events/types', async (c) => {
   }
 })
 
+// Get single event
+app.get('/api/events/:id', async (c) => {
+  const id = c.req.param('id')
+  
+  try {
+    const result = await c.env.DB.prepare(`
+      SELECT e.*, d.title as document_title, d.file_path as document_path
+      FROM events e
+      LEFT JOIN documents d ON e.related_document_id = d.id
+      WHERE e.id = ?
+    `).bind(id).first()
+
+    if (!result) {
+      return c.json({ success: false, error: 'Event not found' }, 404)
+    }
+
+    return c.json({ success: true, event: result })
+  } catch (error) {
+    console.error('Error fetching event:', error)
+    return c.json({ success: false, error: 'Failed to fetch event' }, 500)
+  }
+})
+
 // Update event view count (optional auth)
 app.put('/api/events/:id/view', optionalAuthMiddleware, async (c) => {
   const eventId = c.req.param('id')
@@ -562,6 +627,12 @@ app.put('/api/events/:id/view', optionalAuthMiddleware, async (c) => {
       SET view_count = view_count + 1 
       WHERE id = ?
     `).bind(eventId).run()
+
+    // Raw view row, rolled up daily by maintain_event_views.py
+    await c.env.DB.prepare(`
+      INSERT INTO event_views (event_id, user_id)
+      VALUES (?, ?)
+    `).bind(eventId, c.get('userId') ?? null).run()
     
     return c.json({ success: true })
   } catch (error) {
@@ -975,7 +1046,9 @@ app.get('/api/stats', async (c) => {
       SELECT COUNT(*) as count FROM documents
     `).first()
 
-    const totalEvents = await c.env.DB.prepare(`
+    // documents are not owned by the sync; only the events total is materialized
+    const materialized = await readMaterialized(c, 'event_total')
+    const totalEvents = materialized ? { count: materialized.payload } : await c.env.DB.prepare(`
       SELECT COUNT(*) as count FROM events
     `).first()
 
@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+Incremental event sync: only upsert events whose content changed
+
+Every synced row carries a content hash (migrations/0010). A sync reads
+the current (id, content_hash) set in one query, diffs it against the
+corpus locally and writes only the delta with
+INSERT ... ON CONFLICT(id) DO UPDATE. An unchanged corpus touches zero
+rows, so the events_au FTS trigger never fires for it.
+
+Changed rows also get their geohash/tile_key (migrations/0012), computed
+per batch by spatial_index; the events_rtree triggers follow the upsert.
+Whenever the sync changed anything, the optional follow-ups run:
+
+- --clusters re-clusters the cells of the marker-cluster pyramid
+  (cluster_pyramid) holding the old and new positions of changed events
+- --related recomputes related_events for the changed events and their
+  neighbours (related_events)
+- --snapshots refreshes the static JSON shards (export_snapshots)
+- --search-index refreshes the offline search index (search_index)
+
+--stats builds the materialized aggregates (materialized_stats). Once
+they are built, every sync applies its category/type/year delta to them
+in the same transaction, with or without --stats.
+
+With --watch --direct the sync stays resident: it keeps one connection,
+the parsed corpus files and the stored hashes in memory, polls the
+corpus and seed files every --interval seconds, and applies the records
+of changed files once no further change arrived for --debounce seconds,
+so a burst of saves becomes one transaction.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import nullcontext
+
+from cluster_pyramid import POSITIONS_SQL, cells_of, cells_sqlite
+from cluster_pyramid import update_sqlite as update_clusters_sqlite
+from cluster_pyramid import update_wrangler as update_clusters_wrangler
+from event_corpus import EventCorpus, default_corpus
+from event_loader import (
+    DEFAULT_BATCH_BYTES, DEFAULT_BATCH_ROWS, EVENT_COLUMNS, PROJECT_DIR,
+    connect_local, event_params, execute_sql_file, iter_batches, iter_chunks, load_batch,
+    query_json, sql_literal,
+)
+from export_snapshots import export as export_snapshots
+from export_snapshots import fetch_sqlite, fetch_wrangler
+from export_snapshots import print_stats as print_snapshot_stats
+from fts_bulk import deferred_fts, print_timings
+from load_metrics import add_metrics_arguments, instrumented, metrics
+from materialized_stats import FACETS_SQL, event_facets, new_delta, track
+from materialized_stats import built_sqlite as stats_built_sqlite
+from materialized_stats import built_wrangler as stats_built_wrangler
+from materialized_stats import apply_sqlite as apply_stats_sqlite
+from materialized_stats import apply_wrangler as apply_stats_wrangler
+from related_events import update_sqlite as update_related_sqlite
+from related_events import update_wrangler as update_related_wrangler
+from search_index import build as build_search_index
+from search_index import fetch_sqlite as fetch_search_rows_sqlite
+from search_index import fetch_wrangler as fetch_search_rows_wrangler
+from spatial_index import SPATIAL_COLUMNS, event_spatial_keys
+from validate_corpus import CorpusColumns, preflight, validate
+
+SYNC_COLUMNS = EVENT_COLUMNS + ('content_hash',) + SPATIAL_COLUMNS
+
+_MISSING = object()
+
+WATCH_INTERVAL = 0.2
+WATCH_DEBOUNCE = 0.3
+# A resident connection must not keep the exclusive lock of LOAD_PRAGMAS,
+# or wrangler dev could not read the database between syncs
+WATCH_PRAGMAS = (
+    'PRAGMA locking_mode = NORMAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA busy_timeout = 5000',
+)
+# What a watch cycle survives: the database, a bad record or a follow-up step failing
+WATCH_ERRORS = (sqlite3.Error, ValueError, KeyError, OSError)
+
+
+def content_hash(event):
+    """Stable hash over all synced columns of one event"""
+    payload = json.dumps(event_params(event), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _upsert_tail():
+    updates = ', '.join(f'{col} = excluded.{col}' for col in SYNC_COLUMNS if col != 'id')
+    return f"ON CONFLICT(id) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP"
+
+
+def upsert_sql():
+    """Parameterized single-row upsert"""
+    placeholders = ', '.join('?' for _ in SYNC_COLUMNS)
+    return (
+        f"INSERT INTO events ({', '.join(SYNC_COLUMNS)}) VALUES ({placeholders}) "
+        + _upsert_tail()
+    )
+
+
+def render_upsert_row(change):
+    event, digest, _, keys = change
+    return '(' + ', '.join(sql_literal(v) for v in event_params(event) + (digest,) + keys) + ')'
+
+
+def render_upsert(rows):
+    """Render VALUES tuples as one multi-row upsert"""
+    return (
+        f"INSERT INTO events ({', '.join(SYNC_COLUMNS)}) VALUES\n"
+        + ',\n'.join(rows)
+        + '\n' + _upsert_tail() + ';\n'
+    )
+
+
+def plan_changes(events, current, seen):
+    """Yield (event, hash, is_new) for every event that differs from `current`
+
+    `current` maps id -> stored hash; ids of all corpus events are added
+    to `seen` so the caller can derive deletions afterwards.
+    """
+    for event in events:
+        event_id = event['id']
+        seen.add(event_id)
+        digest = content_hash(event)
+        stored = current.get(event_id, _MISSING)
+        if stored == digest:
+            continue
+        yield event, digest, stored is _MISSING
+
+
+def with_spatial_keys(changes, batch_rows=DEFAULT_BATCH_ROWS):
+    """Append (geohash, tile_key) to each change, computed batch_rows at a time"""
+    for chunk in iter_chunks(changes, batch_rows):
+        for change, keys in zip(chunk, event_spatial_keys([c[0] for c in chunk])):
+            yield change + (keys,)
+
+
+def _new_stats():
+    return {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0, 'failed': 0}
+
+
+def _changed(stats):
+    return bool(stats['inserted'] or stats['updated'] or stats['deleted'])
+
+
+def _count(stats, change):
+    stats['inserted' if change[2] else 'updated'] += 1
+    return change
+
+
+def _current(rows):
+    """(id -> content_hash, id -> stats facets) from FACETS_SQL rows"""
+    current, facets = {}, {}
+    for row in rows:
+        current[row['id']] = row['content_hash']
+        facets[row['id']] = event_facets(row)
+    return current, facets
+
+
+def _track(delta, facets, change):
+    """Add the aggregate delta of one change to `delta`"""
+    event, _, is_new = change[:3]
+    track(delta, None if is_new else facets[event['id']], event_facets(event))
+
+
+def _tracked(changes, delta, facets):
+    """Pass changes through, adding each one's aggregate delta to `delta`"""
+    for change in changes:
+        _track(delta, facets, change)
+        yield change
+
+
+def _collected(changes, ids):
+    """Pass changes through, adding each event id to `ids`"""
+    for change in changes:
+        ids.add(change[0]['id'])
+        yield change
+
+
+def _execute_batch(conn, sql, batch):
+    start = time.perf_counter()
+    with metrics.stage('db_execute'):
+        conn.executemany(sql, batch)
+    metrics.batch(len(batch), None, time.perf_counter() - start, 'sqlite')
+
+
+def read_current_sqlite(conn):
+    cursor = conn.execute(FACETS_SQL)
+    columns = [d[0] for d in cursor.description]
+    return _current(dict(zip(columns, row)) for row in cursor)
+
+
+def sync_sqlite(events, conn, batch_rows=DEFAULT_BATCH_ROWS, prune=False, dry_run=False,
+                bulk=False, timings=None, clusters=False, aggregates=False, known=None,
+                stale=None):
+    """Apply the corpus delta to a SQLite connection in one transaction
+
+    With bulk=True the FTS triggers are suspended during the write and
+    events_fts is rebuilt once; phase timings go into `timings`. With
+    clusters=True the touched event_clusters cells are re-clustered and
+    with aggregates=True the materialized stats are updated, both in the
+    same transaction. Stats that were built before are always updated.
+
+    `known` is a (hashes, facets) pair from read_current_sqlite that the
+    caller keeps across syncs instead of re-reading it; it is updated
+    after the commit. `stale` lists the ids to delete when the caller
+    knows them (events is then only part of the corpus).
+    """
+    stats = _new_stats()
+    aggregates = aggregates or stats_built_sqlite(conn)
+    if known is not None:
+        current, facets = known
+    elif aggregates:
+        current, facets = read_current_sqlite(conn)
+    else:
+        current, facets = dict(conn.execute('SELECT id, content_hash FROM events')), None
+    delta = new_delta()
+    applied = []
+    seen = set()
+    sql = upsert_sql()
+    # Cells of the positions the changed events had before the write
+    old_cells, cluster_ids = set(), set()
+
+    def write(batch):
+        if clusters:
+            ids = [row[0] for row in batch]
+            old_cells.update(cells_sqlite(conn, ids))
+            cluster_ids.update(ids)
+        _execute_batch(conn, sql, batch)
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        with deferred_fts(conn, 'events', timings) if bulk else nullcontext():
+            batch = []
+            changes = (_count(stats, c) for c in plan_changes(events, current, seen))
+            if aggregates:
+                changes = _tracked(changes, delta, facets)
+            for event, digest, _, keys in with_spatial_keys(changes, batch_rows):
+                batch.append(event_params(event) + (digest,) + keys)
+                if known is not None:
+                    applied.append((event, digest))
+                if len(batch) >= batch_rows:
+                    write(batch)
+                    batch = []
+            if batch:
+                write(batch)
+
+            if stale is None:
+                stale = sorted(current.keys() - seen) if prune else []
+            if clusters:
+                old_cells.update(cells_sqlite(conn, stale))
+                cluster_ids.update(stale)
+            for start in range(0, len(stale), batch_rows):
+                conn.executemany('DELETE FROM events WHERE id = ?',
+                                 [(i,) for i in stale[start:start + batch_rows]])
+            stats['deleted'] = len(stale)
+        if clusters and _changed(stats):
+            stats['clusters'] = update_clusters_sqlite(conn, old_cells, cluster_ids,
+                                                       in_transaction=True)
+        if aggregates and _changed(stats):
+            for event_id in stale:
+                track(delta, facets[event_id], None)
+            stats['aggregates'] = apply_stats_sqlite(conn, delta, in_transaction=True)
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('ROLLBACK' if dry_run else 'COMMIT')
+
+    if known is not None and not dry_run:
+        for event, digest in applied:
+            current[event['id']] = digest
+            facets[event['id']] = event_facets(event)
+        for event_id in stale:
+            del current[event_id], facets[event_id]
+    stats['unchanged'] = len(seen) - stats['inserted'] - stats['updated']
+    return stats
+
+
+def sync_wrangler(events, local=True, cwd=PROJECT_DIR, batch_rows=DEFAULT_BATCH_ROWS,
+                  batch_bytes=DEFAULT_BATCH_BYTES, prune=False, dry_run=False, clusters=False,
+                  aggregates=False):
+    """Apply the corpus delta through wrangler, one process per batch
+
+    Only rows of batches that succeeded are counted and, when the
+    materialized stats are updated, tracked.
+    """
+    stats = _new_stats()
+    aggregates = aggregates or stats_built_wrangler(local, cwd)
+    current, facets = _current(query_json(FACETS_SQL if aggregates else
+                                          'SELECT id, content_hash FROM events', local, cwd))
+    delta = new_delta()
+    seen = set()
+    positions = query_json(POSITIONS_SQL, local, cwd) if clusters else []
+    cluster_ids = set()
+
+    changes = plan_changes(events, current, seen)
+    if clusters:
+        changes = _collected(changes, cluster_ids)
+    for batch in iter_batches(with_spatial_keys(changes, batch_rows), batch_rows, batch_bytes, render=render_upsert_row):
+        if dry_run:
+            loaded = [change for change, _ in batch]
+        else:
+            loaded, failed = load_batch(batch, local=local, cwd=cwd, render=render_upsert)
+            for (event, _, _, _), stderr in failed:
+                stats['failed'] += 1
+                print(f"❌ Error syncing event {event['id']}: {event['title']}")
+                print(f"   {stderr}")
+        # Only rows that reached the database count as inserted/updated
+        for change in loaded:
+            _count(stats, change)
+            if aggregates:
+                _track(delta, facets, change)
+
+    stale = sorted(current.keys() - seen) if prune else []
+    for start in range(0, len(stale), batch_rows):
+        ids = ', '.join(str(i) for i in stale[start:start + batch_rows])
+        if not dry_run:
+            result = execute_sql_file(f"DELETE FROM events WHERE id IN ({ids});\n", local, cwd)
+            if result.returncode != 0:
+                raise RuntimeError(f"Deleting stale events failed: {result.stderr.strip()}")
+    stats['deleted'] = len(stale)
+    if clusters and not dry_run and _changed(stats):
+        cluster_ids.update(stale)
+        old_cells = cells_of((r['id'], r['latitude'], r['longitude'])
+                             for r in positions if r['id'] in cluster_ids)
+        stats['clusters'] = update_clusters_wrangler(old_cells, cluster_ids, local, cwd)
+    if aggregates and not dry_run and _changed(stats):
+        for event_id in stale:
+            track(delta, facets[event_id], None)
+        apply_stats_wrangler(delta, local, cwd)
+        stats['aggregates'] = None
+
+    stats['unchanged'] = len(seen) - stats['inserted'] - stats['updated'] - stats['failed']
+    return stats
+
+
+def after_sync_sqlite(conn, args, stats):
+    """Run the --related/--snapshots/--search-index follow-ups; returns snapshot stats"""
+    if args.dry_run or not _changed(stats):
+        return None
+    snapshot_stats = None
+    if args.related:
+        print(f"🔗 related_events recomputed for {update_related_sqlite(conn)} events")
+    if args.snapshots:
+        snapshot_stats = export_snapshots(fetch_sqlite(conn))
+    if args.search_index:
+        build_search_index(lambda table: fetch_search_rows_sqlite(conn, table))
+        print("📚 Search index updated")
+    return snapshot_stats
+
+
+def _file_state(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class WatchedCorpus:
+    """Corpus files parsed once and kept in memory, re-read only when they change
+
+    `list_paths` returns the current file list in precedence order, so
+    new data/events_*.ndjson files are picked up while watching.
+    """
+
+    def __init__(self, list_paths):
+        self.list_paths = list_paths
+        self.paths = list_paths()
+        self.states = {}
+        self.records = {}
+
+    def poll(self):
+        """Paths that appeared, disappeared or changed since the last poll"""
+        self.paths = self.list_paths()
+        changed = self.states.keys() - set(self.paths)
+        for path in changed:
+            del self.states[path]
+        for path in self.paths:
+            state = _file_state(path)
+            if state != self.states.get(path, _MISSING):
+                self.states[path] = state
+                changed.add(path)
+        return changed
+
+    def refresh(self, paths):
+        """Re-read `paths`; a file that fails to parse keeps its previous records"""
+        for path in sorted(paths):
+            if path not in self.paths or self.states[path] is None:
+                self.records.pop(path, None)
+                continue
+            try:
+                self.records[path] = {record.id: record for record in EventCorpus(path)}
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Keeping the previous version of {os.path.basename(path)}: {e}")
+
+    def events(self):
+        """{id: record} over all files, earlier files winning"""
+        merged = {}
+        for path in self.paths:
+            for event_id, record in self.records.get(path, {}).items():
+                merged.setdefault(event_id, record)
+        return merged
+
+
+def invalid_records(records):
+    """{id: [problems]} of records that fail the validate_corpus checks"""
+    columns = CorpusColumns()
+    for record in records:
+        columns.add(record, str(record.get('id')))
+    problems = {}
+    for location, _, message in validate(columns, merged=True):
+        problems.setdefault(location, []).append(message)
+    return problems
+
+
+def _merge_stats(pending, stats):
+    if pending is None:
+        return stats
+    return {key: pending.get(key, 0) + value if isinstance(value, int) else value
+            for key, value in stats.items()}
+
+
+def watch_sqlite(conn, list_paths, args):
+    """Sync on every change of the corpus files until interrupted
+
+    The first pass is a full sync. After that only records from files
+    that changed are re-hashed, compared with the stored hashes held in
+    memory, and written. Saves within --debounce of each other are
+    applied as one transaction. PRAGMA data_version tells when another
+    connection wrote to the database, and the stored hashes are re-read.
+
+    Changed records that fail validation are reported and left out until
+    their file changes again. When the sync itself fails the transaction
+    is rolled back and the same change is retried after the next quiet
+    period; a failed follow-up (--related, --snapshots, --search-index)
+    is retried the same way without re-writing the events.
+    """
+    for pragma in WATCH_PRAGMAS:
+        conn.execute(pragma)
+    known = read_current_sqlite(conn)
+    version = conn.execute('PRAGMA data_version').fetchone()[0]
+    corpus = WatchedCorpus(list_paths)
+    synced = {}
+    # Stats of synced changes whose follow-ups have not completed yet
+    followup = None
+    pending, quiet_since = corpus.poll(), float('-inf')
+    print(f"👀 Watching {len(corpus.paths)} corpus files (Ctrl+C to stop)")
+    while True:
+        changed = corpus.poll()
+        if changed:
+            pending |= changed
+            quiet_since = time.monotonic()
+        if (pending or followup) and time.monotonic() - quiet_since >= args.debounce:
+            start = time.perf_counter()
+            try:
+                stats = _new_stats()
+                if pending:
+                    if conn.execute('PRAGMA data_version').fetchone()[0] != version:
+                        known = read_current_sqlite(conn)
+                        synced = {}
+                    corpus.refresh(pending)
+                    events = corpus.events()
+                    changes = [record for event_id, record in events.items()
+                               if synced.get(event_id) is not record]
+                    invalid = invalid_records(changes)
+                    for location, problems in sorted(invalid.items()):
+                        print(f"⚠️  Skipping event {location}: {'; '.join(problems)}")
+                    changes = [record for record in changes if str(record.get('id')) not in invalid]
+                    stale = sorted(known[0].keys() - events.keys()) if args.prune else []
+                    stats = sync_sqlite(changes, conn, args.batch_rows, dry_run=args.dry_run,
+                                        clusters=args.clusters, aggregates=args.stats, known=known,
+                                        stale=stale)
+                    if not args.dry_run:
+                        synced = events
+                    version = conn.execute('PRAGMA data_version').fetchone()[0]
+                    names = ', '.join(sorted(os.path.basename(path) for path in pending))
+                    print(f"⚡ {names}: {stats['inserted']} inserted, {stats['updated']} updated, "
+                          f"{stats['deleted']} deleted in {(time.perf_counter() - start) * 1000:.1f} ms")
+                    pending = set()
+                followup = _merge_stats(followup, stats)
+                snapshot_stats = after_sync_sqlite(conn, args, followup)
+                followup = None
+            except WATCH_ERRORS as e:
+                step = 'Follow-up' if not pending else 'Sync'
+                print(f"⚠️  {step} failed, retrying after the next quiet period: {e}")
+                quiet_since = time.monotonic()
+                time.sleep(args.interval)
+                continue
+            if snapshot_stats:
+                print_snapshot_stats(snapshot_stats)
+        time.sleep(args.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', nargs='+', metavar='FILE',
+                        help='NDJSON or seed SQL files, earlier files win on duplicate ids '
+                             '(default: data/events_*.ndjson)')
+    parser.add_argument('--seeds', action='store_true',
+                        help='also sync the seed_*.sql events (the NDJSON corpus wins on duplicate ids)')
+    parser.add_argument('--direct', action='store_true',
+                        help='write straight into the local D1 SQLite file (no wrangler)')
+    parser.add_argument('--db', metavar='PATH',
+                        help='SQLite file for --direct (default: auto-detect under .wrangler/state)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='with --direct: defer FTS maintenance and rebuild the index once')
+    parser.add_argument('--remote', action='store_true',
+                        help='sync the remote D1 database instead of --local')
+    parser.add_argument('--prune', action='store_true',
+                        help='delete events that are no longer in the corpus')
+    parser.add_argument('--clusters', action='store_true',
+                        help='update the marker-cluster pyramid where events changed')
+    parser.add_argument('--snapshots', action='store_true',
+                        help='refresh the static JSON shards in public/ when events changed')
+    parser.add_argument('--related', action='store_true',
+                        help='recompute related_events for changed events and their neighbours')
+    parser.add_argument('--stats', action='store_true',
+                        help='build the materialized aggregate tables (once built, every sync updates them)')
+    parser.add_argument('--search-index', action='store_true',
+                        help='update the offline search index when events changed')
+    parser.add_argument('--validate', action='store_true',
+                        help='validate the corpus first and abort without writing if it has problems')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='compute the delta without writing it')
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS)
+    parser.add_argument('--batch-bytes', type=int, default=DEFAULT_BATCH_BYTES)
+    parser.add_argument('--watch', action='store_true',
+                        help='with --direct: stay resident and sync every change of the corpus files')
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL,
+                        help='seconds between checks of the corpus files in --watch mode')
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE,
+                        help='seconds without further changes before a --watch sync runs')
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    events = EventCorpus(*args.corpus) if args.corpus else default_corpus(args.seeds)
+    if args.validate and not preflight(events.paths, merged=True):
+        sys.exit(1)
+
+    if args.watch:
+        if not args.direct:
+            sys.exit("❌ --watch needs --direct (it keeps one SQLite connection open)")
+        list_paths = ((lambda: events.paths) if args.corpus
+                      else (lambda: default_corpus(args.seeds).paths))
+        conn = connect_local(args.db)
+        try:
+            watch_sqlite(conn, list_paths, args)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+        finally:
+            conn.close()
+        return
+
+    snapshot_stats = None
+    print("🔄 Syncing events...\n")
+    with instrumented(args):
+        if args.direct:
+            timings = {}
+            conn = connect_local(args.db)
+            try:
+                stats = sync_sqlite(events, conn, args.batch_rows, args.prune, args.dry_run,
+                                    args.bulk, timings, args.clusters, args.stats)
+                snapshot_stats = after_sync_sqlite(conn, args, stats)
+            finally:
+                conn.close()
+            print_timings(timings)
+        else:
+            stats = sync_wrangler(events, not args.remote, batch_rows=args.batch_rows,
+                                  batch_bytes=args.batch_bytes, prune=args.prune,
+                                  dry_run=args.dry_run, clusters=args.clusters,
+                                  aggregates=args.stats)
+            if args.related and not args.dry_run and _changed(stats):
+                print(f"🔗 related_events recomputed for {update_related_wrangler(not args.remote)} events")
+            if args.snapshots and not args.dry_run and _changed(stats):
+                snapshot_stats = export_snapshots(fetch_wrangler(not args.remote))
+            if args.search_index and not args.dry_run and _changed(stats):
+                build_search_index(lambda table: fetch_search_rows_wrangler(table, not args.remote))
+                print("📚 Search index updated")
+
+    print(f"📊 {stats['inserted']} inserted, {stats['updated']} updated, "
+          f"{stats['deleted']} deleted, {stats['unchanged']} unchanged, {stats['failed']} failed")
+    if snapshot_stats:
+        print_snapshot_stats(snapshot_stats)
+    if 'clusters' in stats:
+        print(f"🗺️  {stats['clusters']} cluster rows rewritten")
+    if 'aggregates' in stats:
+        changed = 'all' if stats['aggregates'] is None else stats['aggregates']
+        print(f"📈 Materialized stats updated ({changed} payloads changed)")
+    if args.dry_run:
+        print("   (dry run, nothing written)")
+    if stats['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import glob
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def make_event(event_id, **fields):
+    """A minimal valid corpus record"""
+    event = {'id': event_id, 'title': f"Event {event_id}", 'description': 'd',
+             'latitude': 10.0 + event_id, 'longitude': 20.0 + event_id,
+             'category': 'c', 'event_type': 'mystery', 'year': 1900 + event_id}
+    event.update(fields)
+    return event
+
+
+def write_ndjson(path, events):
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """An empty database with every migration applied"""
+    path = str(tmp_path / 'd1.sqlite')
+    conn = sqlite3.connect(path)
+    try:
+        for migration in sorted(glob.glob(os.path.join(ROOT_DIR, 'migrations', '*.sql'))):
+            with open(migration, encoding='utf-8') as f:
+                conn.executescript(f.read())
+    finally:
+        conn.close()
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    yield conn
+    conn.close()
@@ -0,0 +1,74 @@
+import pytest
+
+import archive_messages
+from archive_messages import LocalStore, archive, archive_block, iter_archived
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalStore(str(tmp_path / 'archive'))
+
+
+def block(conn, store, ids, chat_id=1, month='2020-01'):
+    messages = [{'id': i, 'chat_id': chat_id, 'content': f"m{i}", 'is_deleted': 0,
+                 'archive_month': month} for i in ids]
+    archive_block(conn, store, chat_id, month, messages)
+
+
+def archived_ids(conn, store, chat_id=1, **kwargs):
+    return [[m['id'] for m in page] for page in iter_archived(conn, store, chat_id, **kwargs)]
+
+
+def test_blocks_are_paged_newest_first(conn, store):
+    block(conn, store, [1, 2, 3])
+    block(conn, store, [4, 5], month='2020-02')
+    block(conn, store, [6, 7, 8], month='2020-03')
+    assert archived_ids(conn, store, page_size=3) == [[8, 7, 6], [5, 4, 3], [2, 1]]
+    assert archived_ids(conn, store, before=5, page_size=10) == [[4, 3, 2, 1]]
+
+
+def test_deleted_messages_are_hidden_unless_asked(conn, store):
+    messages = [{'id': i, 'content': '', 'is_deleted': int(i == 2), 'archive_month': '2020-01'}
+                for i in (1, 2, 3)]
+    archive_block(conn, store, 1, '2020-01', messages)
+    assert archived_ids(conn, store) == [[3, 1]]
+    assert archived_ids(conn, store, include_deleted=True) == [[3, 2, 1]]
+
+
+def test_archive_moves_old_messages_and_keeps_replied_ones(conn, store):
+    conn.executescript("""
+        INSERT INTO users (id, username, email, password_hash) VALUES (1, 'u', 'u@x', 'x');
+        INSERT INTO chats (id, chat_type, title, creator_id) VALUES (1, 'group', 'c', 1);
+        INSERT INTO messages (id, chat_id, sender_id, content, created_at) VALUES
+            (1, 1, 1, 'old', datetime('now', '-400 days')),
+            (2, 1, 1, 'old, replied to', datetime('now', '-400 days')),
+            (3, 1, 1, 'new', datetime('now'));
+        UPDATE messages SET reply_to_message_id = 2 WHERE id = 3;
+        INSERT INTO message_reactions (message_id, user_id, reaction) VALUES (1, 1, '+1');
+    """)
+    stats = archive(conn, store, days=180)
+    assert (stats['blocks'], stats['messages']) == (1, 1)
+    assert [row[0] for row in conn.execute('SELECT id FROM messages ORDER BY id')] == [2, 3]
+    [[message]] = iter_archived(conn, store, 1)
+    assert message['content'] == 'old'
+    assert [r['reaction'] for r in message['reactions']] == ['+1']
+
+
+def test_overlapping_blocks_come_out_newest_first(conn, store):
+    # 5 stayed hot behind a reply and was archived after 6..11
+    block(conn, store, [1, 2, 3, 4, 6])
+    block(conn, store, [7, 8, 9, 10, 11])
+    block(conn, store, [5])
+    assert archived_ids(conn, store, page_size=100) == [[11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]]
+    assert archived_ids(conn, store, before=6, page_size=2) == [[5, 4], [3, 2], [1]]
+
+
+def test_rerun_drops_superseded_unindexed_objects(conn, store):
+    # An interrupted run stored 12-14 but never indexed it
+    store.put('messages/1/2020-01/12-14.ndjson.zlib', b'partial')
+    block(conn, store, [1, 2])
+    block(conn, store, [12, 13, 14, 15])
+    assert store.list('messages/1/2020-01/') == [
+        'messages/1/2020-01/1-2.ndjson.' + archive_messages.CODEC,
+        'messages/1/2020-01/12-15.ndjson.' + archive_messages.CODEC,
+    ]
@@ -0,0 +1,101 @@
+import sqlite3
+
+import pytest
+
+import backup_db
+from backup_db import SqliteSource, WranglerSource, export, restore
+from conftest import make_event
+from local_db import connect_readonly
+from materialized_stats import rebuild_sqlite
+from sync_events import sync_sqlite
+
+
+def rows(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def populated(db_path, conn):
+    sync_sqlite([make_event(i, title=f"Title {i} with 'quotes' and ?") for i in range(1, 26)], conn)
+    conn.executescript("""
+        INSERT INTO users (id, username, email, password_hash) VALUES (1, 'u', 'u@x', 'x');
+        INSERT INTO event_bookmarks (event_id, user_id) VALUES (3, 1);
+    """)
+    return db_path
+
+
+def export_from(path, out, **kwargs):
+    source = connect_readonly(path)
+    try:
+        return export(SqliteSource(source), out, **kwargs)
+    finally:
+        source.close()
+
+
+def test_export_restore_round_trip(populated, tmp_path):
+    out = str(tmp_path / 'backup')
+    manifest = export_from(populated, out, chunk_rows=10)
+    assert manifest['tables']['events']['rows'] == 25
+    assert len(manifest['tables']['events']['chunks']) == 3
+
+    target = str(tmp_path / 'restored.sqlite')
+    stats = restore(target, out, jobs=1)
+    assert stats['events'][0] == 25
+    for table in ('events', 'users', 'event_bookmarks'):
+        assert rows(target, table) == rows(populated, table)
+    # The FTS index is rebuilt from the restored rows
+    conn = sqlite3.connect(target)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM events_fts WHERE events_fts MATCH 'quotes'").fetchone()[0] == 25
+    finally:
+        conn.close()
+
+
+def test_restore_rejects_a_corrupted_chunk(populated, tmp_path):
+    out = tmp_path / 'backup'
+    manifest = export_from(populated, str(out), tables=['events'])
+    chunk = out / manifest['tables']['events']['chunks'][0]['file']
+    data = bytearray(chunk.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    chunk.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match='Checksum mismatch'):
+        restore(str(tmp_path / 'restored.sqlite'), str(out), jobs=1)
+
+
+def test_wrangler_source_inlines_params_once(monkeypatch):
+    seen = []
+    monkeypatch.setattr(backup_db, 'query_json', lambda sql, local, cwd: seen.append(sql) or [])
+    WranglerSource().query('SELECT * FROM t WHERE (a, b) > (?, ?) LIMIT ?', ("what?", "it's", 5))
+    assert seen == ["SELECT * FROM t WHERE (a, b) > ('what?', 'it''s') LIMIT 5"]
+
+
+def test_readonly_export_connection_does_not_block_writers(populated):
+    source = connect_readonly(populated)
+    try:
+        SqliteSource(source).query('SELECT COUNT(*) FROM events')
+        writer = sqlite3.connect(populated, timeout=0, isolation_level=None)
+        writer.execute('BEGIN IMMEDIATE')
+        writer.execute('ROLLBACK')
+        writer.close()
+        with pytest.raises(sqlite3.OperationalError):
+            source.execute('DELETE FROM events')
+    finally:
+        source.close()
+
+
+def test_restore_recounts_restored_stats_counters(populated, conn, tmp_path):
+    rebuild_sqlite(conn)
+    conn.execute("UPDATE stats_counters SET count = 999 WHERE stat = 'table_total'")
+    out = str(tmp_path / 'backup')
+    export_from(populated, out, tables=['events', 'stats_counters', 'stats_materialized'])
+    target = str(tmp_path / 'restored.sqlite')
+    restore(target, out, jobs=1)
+    restored = sqlite3.connect(target)
+    try:
+        assert restored.execute("SELECT count FROM stats_counters WHERE stat = 'table_total'").fetchall() == [(25,)]
+    finally:
+        restored.close()
@@ -0,0 +1,46 @@
+import pytest
+
+from conftest import make_event
+from event_loader import DEFAULT_BATCH_BYTES, inline_params, iter_batches, render_row, sql_literal
+
+
+@pytest.mark.parametrize('value, literal', [
+    (None, 'NULL'), (True, '1'), (3, '3'), (1.5, '1.5'), ("it's", "'it''s'"),
+    (float('nan'), 'NULL'), (float('inf'), 'NULL'), (float('-inf'), 'NULL'),
+])
+def test_sql_literal(value, literal):
+    assert sql_literal(value) == literal
+
+
+def test_batches_respect_row_and_byte_limits():
+    events = [make_event(i, description='x' * 200) for i in range(50)]
+    row_bytes = len(render_row(events[0]).encode('utf-8')) + 2
+    batches = list(iter_batches(events, max_rows=8, max_bytes=5 * row_bytes))
+    assert [event['id'] for batch in batches for event, _ in batch] == list(range(50))
+    assert all(len(batch) <= 5 for batch in batches)
+
+
+def test_oversized_row_gets_a_batch_of_its_own():
+    events = [make_event(1), make_event(2, description='x' * 10_000), make_event(3)]
+    batches = list(iter_batches(events, max_rows=10, max_bytes=2000))
+    assert [[event['id'] for event, _ in batch] for batch in batches] == [[1], [2], [3]]
+
+
+def test_inline_params_ignores_placeholders_inside_values():
+    assert inline_params('UPDATE t SET a = ? WHERE b = ?', ['x?', 'y']) == \
+        "UPDATE t SET a = 'x?' WHERE b = 'y'"
+    assert inline_params('SELECT ? + ?', [None, 2.5]) == 'SELECT NULL + 2.5'
+
+
+def test_inline_params_checks_the_placeholder_count():
+    with pytest.raises(ValueError):
+        inline_params('SELECT ?', [1, 2])
+    with pytest.raises(ValueError):
+        inline_params('SELECT ?, ?', [1])
+
+
+def test_default_batches_stay_under_the_d1_statement_limit():
+    assert DEFAULT_BATCH_BYTES < 100 * 1024
+    events = [make_event(i, full_description='x' * 4000) for i in range(100)]
+    for batch in iter_batches(events, max_rows=1000):
+        assert sum(len(row.encode('utf-8')) + 2 for _, row in batch) <= DEFAULT_BATCH_BYTES
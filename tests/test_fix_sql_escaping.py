@@ -0,0 +1,34 @@
+from fix_sql_escaping import QuoteFixer, fix_sql_file
+
+SQL = ("INSERT INTO events (id, title, description) VALUES\n"
+       "(1, 'Baalbek's temple', 'It''s old'),\n"
+       "(2, 'Plain', 'Ends with '';');\n"
+       "INSERT INTO documents (id, title) VALUES (1, 'Ain't touched');\n")
+
+
+def fix(text, chunk_size):
+    fixer = QuoteFixer()
+    out = ''.join(fixer.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size))
+    return out + fixer.finish(), fixer.fixed_quotes
+
+
+def test_doubles_stray_apostrophes_in_events_inserts_only():
+    out, fixed = fix(SQL, len(SQL))
+    assert "'Baalbek''s temple'" in out
+    assert "'It''s old'" in out
+    assert "'Ends with '';'" in out
+    assert "'Ain't touched'" in out
+    assert fixed == 1
+
+
+def test_chunk_boundaries_do_not_change_the_result():
+    expected = fix(SQL, len(SQL))
+    for chunk_size in (1, 2, 3, 7, 16):
+        assert fix(SQL, chunk_size) == expected
+
+
+def test_comments_pass_through(tmp_path):
+    src, dst = tmp_path / 'in.sql', tmp_path / 'out.sql'
+    src.write_text("-- don't touch\nINSERT INTO events VALUES (1, 'O'Brien');\n", encoding='utf-8')
+    assert fix_sql_file(str(src), str(dst), chunk_size=5) == 1
+    assert dst.read_text(encoding='utf-8') == "-- don't touch\nINSERT INTO events VALUES (1, 'O''Brien');\n"
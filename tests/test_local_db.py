@@ -0,0 +1,22 @@
+import sqlite3
+
+from local_db import connect_shared
+
+
+def test_shared_connection_releases_the_lock_after_each_transaction(db_path):
+    conn = connect_shared(db_path)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute("INSERT INTO events (id, title, description, latitude, longitude, category, "
+                     "event_type) VALUES (1, 't', 'd', 0, 0, 'c', 'mystery')")
+        conn.execute('COMMIT')
+        other = sqlite3.connect(db_path, timeout=0, isolation_level=None)
+        try:
+            other.execute('BEGIN IMMEDIATE')
+            other.execute('ROLLBACK')
+            assert other.execute('SELECT COUNT(*) FROM events').fetchone() == (1,)
+        finally:
+            other.close()
+        assert conn.execute('PRAGMA synchronous').fetchone() != (0,)
+    finally:
+        conn.close()
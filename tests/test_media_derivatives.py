@@ -0,0 +1,25 @@
+from conftest import make_event
+from export_snapshots import fetch_sqlite
+from media_derivatives import update_sqlite
+from sync_events import sync_sqlite
+
+
+def thumbnails(conn):
+    return dict(conn.execute('SELECT id, image_thumbnail_url FROM events ORDER BY id'))
+
+
+def test_changing_image_url_clears_the_thumbnail(conn):
+    sync_sqlite([make_event(1), make_event(2)], conn)
+    conn.execute("UPDATE events SET image_url = 'a.jpg' WHERE id IN (1, 2)")
+    assert update_sqlite(conn, {'a.jpg': 'derived/a-320.webp'})['events'] == 2
+
+    sync_sqlite([make_event(1, title='edited'), make_event(2)], conn)
+    conn.execute("UPDATE events SET image_url = 'b.jpg' WHERE id = 2")
+    assert thumbnails(conn) == {1: 'derived/a-320.webp', 2: None}
+
+
+def test_snapshots_carry_the_thumbnail(conn):
+    sync_sqlite([make_event(1)], conn)
+    conn.execute("UPDATE events SET image_url = 'a.jpg' WHERE id = 1")
+    update_sqlite(conn, {'a.jpg': 'derived/a-320.webp'})
+    assert fetch_sqlite(conn)[0]['image_thumbnail_url'] == 'derived/a-320.webp'
@@ -0,0 +1,32 @@
+from notify_fanout import fan_out_sqlite
+
+
+def notified(conn):
+    return conn.execute('SELECT user_id, body FROM notifications ORDER BY user_id').fetchall()
+
+
+def test_first_run_starts_at_the_current_end(conn):
+    conn.executescript("""
+        INSERT INTO users (id, username, email, password_hash) VALUES (1, 'a', 'a@x', 'x'), (2, 'b', 'b@x', 'x');
+        INSERT INTO chats (id, chat_type, title, creator_id) VALUES (1, 'group', 'G', 1);
+        INSERT INTO chat_members (chat_id, user_id) VALUES (1, 1), (1, 2);
+        INSERT INTO messages (chat_id, sender_id, content) VALUES (1, 1, 'old'), (1, 1, 'older');
+    """)
+    assert fan_out_sqlite(conn, 'messages')['digests'] == 0
+    assert notified(conn) == []
+
+    conn.execute("INSERT INTO messages (chat_id, sender_id, content) VALUES (1, 1, 'new')")
+    assert fan_out_sqlite(conn, 'messages')['source_rows'] == 1
+    assert notified(conn) == [(2, 'Neue Nachricht')]
+
+
+def test_first_run_on_an_empty_source_notifies_later_rows(conn):
+    conn.executescript("""
+        INSERT INTO users (id, username, email, password_hash) VALUES (1, 'a', 'a@x', 'x'), (2, 'b', 'b@x', 'x');
+        INSERT INTO chats (id, chat_type, title, creator_id) VALUES (1, 'group', 'G', 1);
+        INSERT INTO chat_members (chat_id, user_id) VALUES (1, 1), (1, 2);
+    """)
+    fan_out_sqlite(conn, 'messages')
+    conn.execute("INSERT INTO messages (chat_id, sender_id, content) VALUES (1, 2, 'hi')")
+    fan_out_sqlite(conn, 'messages')
+    assert notified(conn) == [(1, 'Neue Nachricht')]
@@ -0,0 +1,29 @@
+import json
+
+from related_events import feature_hash, plan_targets
+
+
+def stored(event_id, related, **fields):
+    """An event row as FEATURES_SQL returns it after a computation"""
+    event = {'id': event_id, 'title': f"Event {event_id}", 'keywords': None,
+             'full_description': None, 'latitude': 0.0, 'longitude': 0.0, 'year': 1900}
+    event.update(fields)
+    event['related_events'] = json.dumps(related)
+    event['related_hash'] = feature_hash(event)
+    return event
+
+
+def test_unchanged_events_with_empty_lists_are_not_recomputed():
+    events = [stored(1, [2]), stored(2, [1]), stored(3, [])]
+    assert plan_targets(events) == ([], set())
+
+
+def test_empty_lists_are_retried_when_an_event_changed():
+    events = [stored(1, [2]), stored(2, [1]), stored(3, [])]
+    events[0]['title'] = 'moved'
+    assert plan_targets(events) == ([1, 2, 3], {1})
+
+
+def test_lists_pointing_at_deleted_events_are_recomputed():
+    events = [stored(1, [2]), stored(3, [])]
+    assert plan_targets(events) == ([1], set())
@@ -0,0 +1,61 @@
+import glob
+import os
+
+import pytest
+
+from conftest import ROOT_DIR
+from seed_sql import SeedParseError, iter_rows
+
+
+def rows(tmp_path, sql, **kwargs):
+    path = tmp_path / 'seed.sql'
+    path.write_text(sql, encoding='utf-8')
+    return [(row.table, row.line, row.as_dict()) for row in iter_rows(str(path), **kwargs)]
+
+
+def test_parses_typed_values_and_lines(tmp_path):
+    sql = ("-- seed\nINSERT INTO events (id, title, year, lat, flag) VALUES\n"
+           "(1, 'It''s', -500, 1.5, NULL),\n(2, 'B', 3, 2e1, TRUE);\n")
+    assert rows(tmp_path, sql) == [
+        ('events', 3, {'id': 1, 'title': "It's", 'year': -500, 'lat': 1.5, 'flag': None}),
+        ('events', 4, {'id': 2, 'title': 'B', 'year': 3, 'lat': 20.0, 'flag': 1}),
+    ]
+
+
+def test_filters_tables_and_skips_other_statements(tmp_path):
+    sql = ("CREATE TABLE x (a);\nINSERT INTO docs (id) VALUES (7);\n"
+           "INSERT INTO events (id) VALUES (8);\n")
+    assert [r[2] for r in rows(tmp_path, sql, tables=('EVENTS',))] == [{'id': 8}]
+
+
+def test_tokens_split_across_chunks(tmp_path):
+    sql = "INSERT INTO events (id, title) VALUES (123456, 'a long ''quoted'' title');\n"
+    assert rows(tmp_path, sql, chunk_size=3) == rows(tmp_path, sql)
+
+
+@pytest.mark.parametrize('values', [
+    "(1, 'a') (2, 'b')",   # missing separator between tuples
+    "(1 'a')",             # missing separator inside a tuple
+    "(1, 'a'), (2)",       # wrong arity
+])
+def test_malformed_statement_raises(tmp_path, values):
+    with pytest.raises(SeedParseError):
+        rows(tmp_path, f"INSERT INTO events (id, title) VALUES {values};\n")
+
+
+def test_malformed_statement_yields_no_rows_and_parsing_resumes(tmp_path):
+    errors = []
+    sql = ("INSERT INTO events (id, title) VALUES (1, 'a'), (2, 'b') (3, 'c');\n"
+           "INSERT INTO events (id, title) VALUES (4, 'd');\n")
+    assert [r[2]['id'] for r in rows(tmp_path, sql, errors=errors)] == [4]
+    assert len(errors) == 1
+
+
+@pytest.mark.parametrize('chunk_size', [3, 7, 64])
+def test_seed_files_parse_the_same_at_any_chunk_size(chunk_size):
+    for path in sorted(glob.glob(os.path.join(ROOT_DIR, 'seed*.sql'))):
+        expected_errors, errors = [], []
+        expected = [(r.line, r.values) for r in iter_rows(path, errors=expected_errors)]
+        assert [(r.line, r.values) for r in iter_rows(path, errors=errors, chunk_size=chunk_size)] \
+            == expected
+        assert errors == expected_errors
@@ -0,0 +1,145 @@
+import argparse
+import os
+
+import pytest
+
+import sync_events
+from conftest import make_event, write_ndjson
+from event_corpus import EventCorpus
+from sync_events import content_hash, plan_changes, sync_sqlite, sync_wrangler
+
+
+def test_plan_changes_yields_new_and_changed_events_only():
+    same, changed, new = make_event(1), make_event(2), make_event(3)
+    current = {1: content_hash(same), 2: content_hash(make_event(2, title='old')), 4: 'gone'}
+    seen = set()
+    planned = [(event['id'], is_new) for event, _, is_new in plan_changes([same, changed, new], current, seen)]
+    assert planned == [(2, False), (3, True)]
+    assert seen == {1, 2, 3}
+
+
+def test_plan_changes_hash_matches_what_sync_stores(conn):
+    events = [make_event(i) for i in range(1, 4)]
+    stats = sync_sqlite(events, conn)
+    assert stats['inserted'] == 3
+    current = dict(conn.execute('SELECT id, content_hash FROM events'))
+    assert list(plan_changes(events, current, set())) == []
+
+
+def test_sync_prunes_only_when_asked(conn):
+    sync_sqlite([make_event(1), make_event(2)], conn)
+    assert sync_sqlite([make_event(1)], conn)['deleted'] == 0
+    assert sync_sqlite([make_event(1)], conn, prune=True)['deleted'] == 1
+    assert [row[0] for row in conn.execute('SELECT id FROM events')] == [1]
+
+
+def test_wrangler_sync_counts_only_rows_of_successful_batches(monkeypatch):
+    def load_batch(batch, **kwargs):
+        failed = [(change, 'boom') for change, _ in batch if change[0]['id'] == 2]
+        return [change for change, _ in batch if change[0]['id'] != 2], failed
+
+    monkeypatch.setattr(sync_events, 'query_json', lambda sql, local, cwd: [])
+    monkeypatch.setattr(sync_events, 'stats_built_wrangler', lambda local, cwd: True)
+    monkeypatch.setattr(sync_events, 'load_batch', load_batch)
+    applied = []
+    monkeypatch.setattr(sync_events, 'apply_stats_wrangler', lambda delta, local, cwd: applied.append(delta))
+    stats = sync_wrangler([make_event(1), make_event(2, category='lost'), make_event(3)], batch_rows=1)
+    assert (stats['inserted'], stats['failed'], stats['unchanged']) == (2, 1, 0)
+    # The failed row's category never reached the counters
+    assert applied[0][('table_total', 'events')] == 2
+    assert ('events_by_category', 'lost') not in applied[0]
+
+
+def test_built_stats_follow_every_sync(conn):
+    sync_sqlite([make_event(1), make_event(2)], conn, aggregates=True)
+    sync_sqlite([make_event(1), make_event(3, category='new')], conn, prune=True)
+    counters = dict(((stat, bucket), count) for stat, bucket, count in conn.execute(
+        "SELECT stat, bucket, count FROM stats_counters WHERE stat IN ('table_total', 'events_by_category')"))
+    assert counters == {('table_total', 'events'): 2, ('events_by_category', 'c'): 1,
+                        ('events_by_category', 'new'): 1}
+
+
+class Stop(Exception):
+    pass
+
+
+def watch_args(**overrides):
+    args = argparse.Namespace(debounce=0, interval=0, prune=False, batch_rows=100, dry_run=False,
+                              clusters=False, stats=False, related=False, snapshots=False,
+                              search_index=False)
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+def run_watch(monkeypatch, conn, path, steps, **overrides):
+    """Run watch_sqlite, calling steps[i]() on its i-th idle sleep, then stop"""
+    calls = iter(steps)
+
+    def sleep(_):
+        step = next(calls, None)
+        if step is None:
+            raise Stop
+        step()
+
+    monkeypatch.setattr(sync_events.time, 'sleep', sleep)
+    with pytest.raises(Stop):
+        sync_events.watch_sqlite(conn, lambda: [path], watch_args(**overrides))
+
+
+def titles(conn):
+    return dict(conn.execute('SELECT id, title FROM events ORDER BY id'))
+
+
+def rewrite(path, events):
+    def step():
+        write_ndjson(path, events)
+        # Make sure the change is visible even on coarse mtime clocks
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000_000))
+    return step
+
+
+def test_watch_syncs_every_saved_change(monkeypatch, conn, tmp_path):
+    path = str(tmp_path / 'events.ndjson')
+    write_ndjson(path, [make_event(1), make_event(2)])
+    run_watch(monkeypatch, conn, path, [
+        lambda: None,
+        rewrite(path, [make_event(1, title='edited'), make_event(2)]),
+        lambda: None,
+        rewrite(path, [make_event(1, title='edited')]),
+        lambda: None,
+    ], prune=True)
+    assert titles(conn) == {1: 'edited'}
+
+
+def test_watch_skips_invalid_records_and_keeps_running(monkeypatch, conn, tmp_path):
+    path = str(tmp_path / 'events.ndjson')
+    write_ndjson(path, [make_event(1), make_event(2)])
+    run_watch(monkeypatch, conn, path, [
+        rewrite(path, [make_event(1, title=None), make_event(2, title='fixed')]),
+        lambda: None,
+        rewrite(path, [make_event(1, title='back'), make_event(2, title='fixed')]),
+        lambda: None,
+    ])
+    assert titles(conn) == {1: 'back', 2: 'fixed'}
+
+
+def test_watch_retries_a_failed_sync(monkeypatch, conn, tmp_path, capsys):
+    path = str(tmp_path / 'events.ndjson')
+    write_ndjson(path, [make_event(1)])
+    # Without validation the NOT NULL violation reaches SQLite
+    monkeypatch.setattr(sync_events, 'invalid_records', lambda records: {})
+    run_watch(monkeypatch, conn, path, [
+        rewrite(path, [make_event(1, title=None), make_event(2)]),
+        lambda: None,
+        rewrite(path, [make_event(1, title='ok'), make_event(2)]),
+        lambda: None,
+    ])
+    assert 'Sync failed' in capsys.readouterr().out
+    assert titles(conn) == {1: 'ok', 2: 'Event 2'}
+
+
+def test_invalid_records_are_keyed_by_id(tmp_path):
+    path = str(tmp_path / 'events.ndjson')
+    write_ndjson(path, [make_event(1, title=None), make_event(2)])
+    assert list(sync_events.invalid_records(EventCorpus(path))) == ['1']
@@ -0,0 +1,68 @@
+import json
+
+from conftest import make_event
+from validate_corpus import run_validation
+
+
+def write(path, lines):
+    path.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+    return str(path)
+
+
+def checks(paths, **kwargs):
+    return sorted(check for _, check, _ in run_validation(paths, **kwargs)[1])
+
+
+def test_clean_corpus_has_no_problems(tmp_path):
+    path = write(tmp_path / 'a.ndjson', [json.dumps(make_event(i)) for i in range(1, 4)])
+    assert checks([path]) == []
+
+
+def test_every_column_check_reports(tmp_path):
+    path = write(tmp_path / 'a.ndjson', [
+        json.dumps(make_event(1, latitude=91.0)),
+        json.dumps(make_event(2, longitude=None)),
+        json.dumps(make_event(3, year=10_000_000)),
+        json.dumps(make_event(4, event_type='dragon')),
+        json.dumps(make_event(5, evidence_level='rumour')),
+        json.dumps(make_event(6, sources='[not json')),
+        json.dumps(make_event(7)),
+        json.dumps(make_event(7)),
+        json.dumps(make_event(8))[:-1] + ', "title": "again"}',
+        '{broken',
+    ])
+    found = {(location.rsplit(':', 1)[1], check) for location, check, _ in run_validation([path])[1]}
+    assert found == {('1', 'latitude'), ('2', 'longitude'), ('3', 'year'), ('4', 'event_type'),
+                     ('5', 'evidence_level'), ('6', 'json'), ('7', 'id'), ('9', 'duplicate_key'),
+                     ('10', 'json')}
+
+
+def test_title_must_be_a_non_empty_string(tmp_path):
+    path = write(tmp_path / 'a.ndjson', [json.dumps(make_event(1, title=None)),
+                                         json.dumps(make_event(2, title='  ')),
+                                         json.dumps(make_event(3))])
+    assert checks([path]) == ['title', 'title']
+
+
+def test_ids_are_unique_across_files(tmp_path):
+    a = write(tmp_path / 'a.ndjson', [json.dumps(make_event(1))])
+    b = write(tmp_path / 'b.ndjson', [json.dumps(make_event(1))])
+    assert checks([a, b]) == ['id']
+
+
+def test_seed_sql_rows_are_checked(tmp_path):
+    seed = tmp_path / 'seed_a.sql'
+    seed.write_text("INSERT INTO events (id, title, latitude, longitude, event_type, year) VALUES\n"
+                    "(1, 'A', 95.0, 1.0, 'mystery', 1900),\n(2, 'B', 1.0, 1.0, 'mystery', 1901);\n"
+                    "(3, 'orphan');\n", encoding='utf-8')
+    assert checks([str(seed)]) == ['latitude', 'seed_sql']
+
+
+def test_merged_corpus_only_reports_ids_repeated_within_a_file(tmp_path):
+    a = write(tmp_path / 'a.ndjson', [json.dumps(make_event(1))])
+    seed = tmp_path / 'seed_a.sql'
+    seed.write_text("INSERT INTO events (id, title, latitude, longitude, event_type, year) VALUES\n"
+                    "(1, 'A', 1.0, 1.0, 'mystery', 1900),\n(2, 'B', 1.0, 1.0, 'mystery', 1901),\n"
+                    "(2, 'B', 1.0, 1.0, 'mystery', 1901);\n", encoding='utf-8')
+    assert checks([a, str(seed)]) == ['id', 'id']
+    assert checks([a, str(seed)], merged=True) == ['id']
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Pre-flight validation of the whole event corpus before any write
+
+Loads every NDJSON corpus file and every INSERT INTO events tuple of the
+seed_*.sql files into columnar arrays, then runs each check over the full
+columns at once:
+
+- a non-empty title
+- latitude/longitude ranges
+- year sanity
+- event_type / evidence_level enum membership
+- id uniqueness across all sources (or within each file, for a merged
+  corpus where the first file wins)
+- JSON well-formedness of sources/keywords
+- repeated keys inside one NDJSON object
+- seed SQL that cannot be parsed
+
+Uses NumPy for the column checks when it is installed and falls back to
+the standard `array` module otherwise. Exits non-zero when anything fails.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from array import array
+
+from event_corpus import DATA_DIR
+from seed_sql import iter_rows
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+EVENT_TYPES = ('ancient', 'ufo', 'conspiracy', 'mystery', 'phenomenon', 'cryptid',
+               'paranormal', 'signal')
+EVIDENCE_LEVELS = ('speculative', 'documented', 'proven', 'military')
+JSON_COLUMNS = ('sources', 'keywords')
+
+MIN_YEAR = -100_000
+MAX_YEAR = time.gmtime().tm_year
+
+
+class CorpusColumns:
+    """Column-oriented view of all corpus rows plus their source locations"""
+
+    def __init__(self):
+        self.ids = array('q')
+        self.title_ok = array('b')
+        self.latitude = array('d')
+        self.longitude = array('d')
+        self.year = array('d')
+        self.event_type = []
+        self.evidence_level = []
+        self.json_ok = array('b')
+        self.locations = []
+        self.problems = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, row, location):
+        self.ids.append(_int(row.get('id'), -1))
+        self.title_ok.append(isinstance(row.get('title'), str) and bool(row.get('title').strip()))
+        self.latitude.append(_float(row.get('latitude')))
+        self.longitude.append(_float(row.get('longitude')))
+        self.year.append(_float(row.get('year')))
+        self.event_type.append(row.get('event_type'))
+        self.evidence_level.append(row.get('evidence_level'))
+        self.json_ok.append(all(_json_ok(row.get(col)) for col in JSON_COLUMNS))
+        self.locations.append(location)
+
+
+def _int(value, default):
+    return value if isinstance(value, int) and not isinstance(value, bool) else default
+
+
+def _float(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return float('nan')
+
+
+def _json_ok(value):
+    if value is None or not isinstance(value, str):
+        return value is None or isinstance(value, (list, dict))
+    try:
+        json.loads(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _pairs_hook(problems, location):
+    def hook(pairs):
+        seen = set()
+        for key, _ in pairs:
+            if key in seen:
+                problems.append((location, 'duplicate_key', f"key {key!r} repeated"))
+            seen.add(key)
+        return dict(pairs)
+    return hook
+
+
+def load_ndjson(columns, path):
+    name = os.path.relpath(path, ROOT_DIR)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            location = f"{name}:{line_no}"
+            try:
+                row = json.loads(line, object_pairs_hook=_pairs_hook(columns.problems, location))
+            except ValueError as e:
+                columns.problems.append((location, 'json', f"invalid NDJSON line: {e}"))
+                continue
+            columns.add(row, location)
+
+
+def load_seed_sql(columns, path):
+    name = os.path.relpath(path, ROOT_DIR)
+    errors = []
+    for row in iter_rows(path, tables=('events',), errors=errors):
+        columns.add(row.as_dict(), f"{name}:{row.line}")
+    for message in errors:
+        columns.problems.append((name, 'seed_sql', message))
+
+
+def _flagged(mask):
+    """Indexes where a boolean column is true"""
+    if np is not None:
+        return np.flatnonzero(mask).tolist()
+    return [i for i, bad in enumerate(mask) if bad]
+
+
+def _outside(values, low, high, allow_missing=False):
+    """Indexes of values outside [low, high]; NaN marks a missing value"""
+    if np is not None:
+        col = np.frombuffer(values, dtype=np.float64)
+        missing = np.isnan(col)
+        bad = (col < low) | (col > high)
+        return _flagged(bad if allow_missing else bad | missing)
+    return [i for i, v in enumerate(values)
+            if not (low <= v <= high) and not (allow_missing and v != v)]
+
+
+def _not_in(values, allowed):
+    codes = {v: i for i, v in enumerate(allowed)}
+    if np is not None:
+        col = np.fromiter((codes.get(v, -1) for v in values), dtype=np.int16, count=len(values))
+        return _flagged(col < 0)
+    return [i for i, v in enumerate(values) if v not in codes]
+
+
+def _duplicates(ids):
+    """Indexes of every row whose id occurs more than once (or is missing)"""
+    if np is not None:
+        col = np.frombuffer(ids, dtype=np.int64)
+        uniq, inverse, counts = np.unique(col, return_inverse=True, return_counts=True)
+        return _flagged((counts[inverse] > 1) | (col < 0))
+    counts = {}
+    for v in ids:
+        counts[v] = counts.get(v, 0) + 1
+    return [i for i, v in enumerate(ids) if counts[v] > 1 or v < 0]
+
+
+def _source(location):
+    return location.rsplit(':', 1)[0]
+
+
+def validate(columns, merged=False):
+    """Run every column check; returns a list of (location, check, message)
+
+    With merged=True an id repeated in different files is not a problem,
+    since EventCorpus keeps the first one; repeats within a file still are.
+    """
+    problems = list(columns.problems)
+
+    def report(indexes, check, describe):
+        for i in indexes:
+            problems.append((columns.locations[i], check, describe(i)))
+
+    report(_flagged([not ok for ok in columns.title_ok]), 'title',
+           lambda i: f"id {columns.ids[i]}: title is missing or empty")
+    report(_outside(columns.latitude, -90.0, 90.0), 'latitude',
+           lambda i: f"id {columns.ids[i]}: latitude {columns.latitude[i]} outside [-90, 90]")
+    report(_outside(columns.longitude, -180.0, 180.0), 'longitude',
+           lambda i: f"id {columns.ids[i]}: longitude {columns.longitude[i]} outside [-180, 180]")
+    report(_outside(columns.year, MIN_YEAR, MAX_YEAR, allow_missing=True), 'year',
+           lambda i: f"id {columns.ids[i]}: year {columns.year[i]} outside [{MIN_YEAR}, {MAX_YEAR}]")
+    report(_not_in(columns.event_type, EVENT_TYPES), 'event_type',
+           lambda i: f"id {columns.ids[i]}: unknown event_type {columns.event_type[i]!r}")
+    report(_not_in(columns.evidence_level, EVIDENCE_LEVELS + (None,)), 'evidence_level',
+           lambda i: f"id {columns.ids[i]}: unknown evidence_level {columns.evidence_level[i]!r}")
+    report(_flagged([not ok for ok in columns.json_ok]), 'json',
+           lambda i: f"id {columns.ids[i]}: sources/keywords is not valid JSON")
+
+    dup_locations = {}
+    for i in _duplicates(columns.ids):
+        key = (columns.ids[i], _source(columns.locations[i]) if merged else None)
+        dup_locations.setdefault(key, []).append(columns.locations[i])
+    for (event_id, _), locations in sorted(dup_locations.items()):
+        if len(locations) < 2 and event_id >= 0:
+            continue
+        label = 'missing id' if event_id < 0 else f"id {event_id}"
+        problems.append((locations[0], 'id', f"{label} used {len(locations)}x: {', '.join(locations)}"))
+    return problems
+
+
+def default_sources():
+    ndjson = sorted(glob.glob(os.path.join(DATA_DIR, '*.ndjson')))
+    seeds = sorted(glob.glob(os.path.join(ROOT_DIR, 'seed_*.sql')))
+    return ndjson + seeds
+
+
+def load_columns(paths):
+    columns = CorpusColumns()
+    for path in paths:
+        if path.endswith('.sql'):
+            load_seed_sql(columns, path)
+        else:
+            load_ndjson(columns, path)
+    return columns
+
+
+def run_validation(paths, merged=False):
+    """Load and check `paths`; returns (columns, problems, load_s, check_s)"""
+    start = time.perf_counter()
+    columns = load_columns(paths)
+    loaded = time.perf_counter()
+    problems = validate(columns, merged)
+    return columns, problems, loaded - start, time.perf_counter() - loaded
+
+
+def print_report(columns, problems, load_s, check_s):
+    for location, check, message in problems:
+        print(f"❌ [{check}] {location}: {message}")
+    print(f"🔍 {len(columns)} rows checked in {check_s * 1000:.1f} ms "
+          f"(loaded in {load_s * 1000:.1f} ms, {'numpy' if np is not None else 'array'} backend)")
+    print("✅ Corpus is valid" if not problems else f"⚠️  {len(problems)} problems found")
+
+
+def preflight(paths, merged=False):
+    """Validate the files a load is about to write; True when clean"""
+    result = run_validation(paths, merged)
+    print_report(*result)
+    print()
+    return not result[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate the event corpus before loading it')
+    parser.add_argument('paths', nargs='*',
+                        help='NDJSON corpus and seed SQL files (default: data/*.ndjson and seed_*.sql)')
+    parser.add_argument('--merged', action='store_true',
+                        help='only report ids repeated within one file (earlier files win, as in EventCorpus)')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    columns, problems, load_s, check_s = run_validation(args.paths or default_sources(), args.merged)
+
+    if args.json:
+        print(json.dumps({
+            'rows': len(columns),
+            'load_ms': round(load_s * 1000, 3),
+            'check_ms': round(check_s * 1000, 3),
+            'problems': [{'location': loc, 'check': check, 'message': msg}
+                         for loc, check, msg in problems],
+        }, ensure_ascii=False, indent=2))
+    else:
+        print_report(columns, problems, load_s, check_s)
+
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()